@@ -0,0 +1,63 @@
+"""
+Gunicorn configuratie voor APP_SERVER=gunicorn (start met `python manage.py serve`)
+
+Sync workers, standaard 2 × CPU kernen + 1, met de app vooraf geladen in de
+master zodat workers snel starten en geheugen (copy-on-write) delen.
+Alle waarden zijn te overschrijven via de omgeving of .env.
+
+Meer dan één worker vereist een gedeelde cache (REDIS_URL): met de lokale
+memory cache zou een invalidatie (pagina's, tellers, ...) enkel de worker
+bereiken die de wijziging verwerkte.
+"""
+import multiprocessing
+import os
+
+# Niet `from decouple import config`: gunicorn leest elke module variabele
+# met de naam van een instelling, en `config` is er één
+import decouple
+
+
+bind = decouple.config('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = decouple.config('WEB_CONCURRENCY', default=multiprocessing.cpu_count() * 2 + 1, cast=int)
+threads = decouple.config('GUNICORN_THREADS', default=1, cast=int)
+preload_app = True
+
+timeout = decouple.config('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = 30
+keepalive = 5
+
+# Workers periodiek vervangen tegen geheugengroei
+max_requests = decouple.config('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+max_requests_jitter = max_requests // 10
+
+# Heartbeat bestanden in het geheugen i.p.v. op de (overlay) schijf
+worker_tmp_dir = '/dev/shm'
+
+# Leeg = geen access log
+accesslog = decouple.config('GUNICORN_ACCESS_LOG', default='-') or None
+errorlog = '-'
+
+
+def check_shared_cache(workers):
+    """Weiger meerdere workers op een cache per proces (ook gebruikt door `serve`)"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+
+    backend = settings.CACHES['default']['BACKEND']
+    if workers > 1 and backend.endswith('.LocMemCache'):
+        raise ImproperlyConfigured(
+            f'{workers} gunicorn workers met een lokale memory cache: '
+            f'zet REDIS_URL (gedeelde cache) of WEB_CONCURRENCY=1'
+        )
+
+
+def on_starting(server):
+    check_shared_cache(server.cfg.workers)
+
+
+def post_fork(server, worker):
+    # Met preload_app draait Django al in de master: connecties die daar
+    # eventueel geopend werden mogen niet gedeeld worden met de workers
+    from django.db import connections
+    connections.close_all()
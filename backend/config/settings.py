@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -37,14 +39,21 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # Ook runserver laat statische bestanden aan StaticFilesMiddleware over
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Custom apps
     'workshops.apps.WorkshopsConfig',
 ]
 
 MIDDLEWARE = [
+    # Eerst, zodat de meting de volledige request omvat (zie PERF_SAMPLE_RATE)
+    'workshops.instrumentation.PerformanceMiddleware',
+    'workshops.querylog.QueryInspectionMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'workshops.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -77,6 +86,13 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Persistente connecties: een connectie wordt DB_CONN_MAX_AGE seconden
+# hergebruikt i.p.v. per request opnieuw opgezet (0 = oude gedrag).
+# Met health checks wordt een hergebruikte connectie eerst gecontroleerd.
+# DB_POOL schakelt over op een psycopg 3 connection pool per proces;
+# dat vereist `pip install "psycopg[binary,pool]"` en sluit CONN_MAX_AGE uit.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -85,9 +101,27 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='SecurePassword123!'),
         'HOST': config('DB_HOST', default='db'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': {
+            'connect_timeout': config('DB_CONNECT_TIMEOUT', default=10, cast=int),
+        },
     }
 }
 
+if DB_POOL:
+    # requirements.txt installeert enkel psycopg2: zonder psycopg 3 zou de
+    # pool optie pas bij de eerste connectie falen, niet bij het opstarten
+    if not (find_spec('psycopg') and find_spec('psycopg_pool')):
+        raise ImproperlyConfigured(
+            'DB_POOL vereist psycopg 3 met de pool extra: pip install "psycopg[binary,pool]"'
+        )
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -130,6 +164,114 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# App server: 'runserver' (ontwikkeling) of 'gunicorn' (productie, zie
+# config/gunicorn.conf.py). `python manage.py serve` start de gekozen server.
+APP_SERVER = config('APP_SERVER', default='runserver')
+
+# Statische bestanden en uploads worden geserveerd door
+# workshops.staticfiles.StaticFilesMiddleware (WhiteNoise). In productie
+# krijgen ze bij collectstatic een hash in de naam en een .gz variant.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'whitenoise.storage.CompressedManifestStaticFilesStorage'
+            if APP_SERVER == 'gunicorn'
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+MEDIA_CACHE_MAX_AGE = config('MEDIA_CACHE_MAX_AGE', default=60 * 60 * 24 * 30, cast=int)
+
+# Caching
+# Zonder REDIS_URL wordt een lokale (per proces) memory cache gebruikt.
+# Met REDIS_URL (bijv. redis://redis:6379/0) delen alle workers dezelfde cache;
+# gunicorn met meer dan één worker weigert te starten zonder (gunicorn.conf.py).
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'narhval-learning',
+        }
+    }
+
+# Hero tellers (webinars, categorieën, reviews, ...) worden zo lang gecached
+SITE_STATS_CACHE_TIMEOUT = config('SITE_STATS_CACHE_TIMEOUT', default=300, cast=int)
+
+# Publieke catalogus pagina's (0 = uitgeschakeld)
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=600, cast=int)
+
+# Performance instrumentatie (workshops.instrumentation)
+# Fractie van de requests die gemeten wordt: 0 = uit, 1 = elke request.
+# Resultaat: Server-Timing header + rapport op /prestaties/ (staff)
+PERF_SAMPLE_RATE = config('PERF_SAMPLE_RATE', default=0.0, cast=float)
+PERF_HISTORY_SIZE = config('PERF_HISTORY_SIZE', default=500, cast=int)
+PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default=True, cast=bool)
+
+# Slow query log en detectie van herhaalde queries (workshops.querylog)
+# Meldingen gaan als JSON naar de logger 'workshops.queries';
+# samenvatten met: python manage.py query_report <QUERY_LOG_FILE>
+QUERY_INSPECTION = config('QUERY_INSPECTION', default=False, cast=bool)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=100, cast=float)
+DUPLICATE_QUERY_THRESHOLD = config('DUPLICATE_QUERY_THRESHOLD', default=2, cast=int)
+SIMILAR_QUERY_THRESHOLD = config('SIMILAR_QUERY_THRESHOLD', default=5, cast=int)
+QUERY_LOG_FILE = config('QUERY_LOG_FILE', default='')
+
+# E-mail: boekingsmails gaan via de outbox (workshops.outbox) en worden
+# verstuurd door de worker: python manage.py process_outbox
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='webinars@localhost')
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=50, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+
+# Nieuwsbrief campagnes (workshops.campaigns): python manage.py send_campaign <id>
+NEWSLETTER_FROM_EMAIL = config('NEWSLETTER_FROM_EMAIL', default='')
+NEWSLETTER_BATCH_SIZE = config('NEWSLETTER_BATCH_SIZE', default=200, cast=int)
+NEWSLETTER_RATE_LIMIT = config('NEWSLETTER_RATE_LIMIT', default=0, cast=float)  # berichten/s, 0 = onbeperkt
+NEWSLETTER_SMTP_CONNECTIONS = config('NEWSLETTER_SMTP_CONNECTIONS', default=2, cast=int)
+SEGMENT_COUNT_CACHE_TIMEOUT = config('SEGMENT_COUNT_CACHE_TIMEOUT', default=300, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json_line': {
+            'format': '%(asctime)s %(message)s',
+        },
+    },
+    'handlers': {
+        'queries': {
+            'class': 'logging.FileHandler' if QUERY_LOG_FILE else 'logging.StreamHandler',
+            'formatter': 'json_line',
+            **({'filename': QUERY_LOG_FILE} if QUERY_LOG_FILE else {}),
+        },
+    },
+    'loggers': {
+        'workshops.queries': {
+            'handlers': ['queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -1,10 +1,22 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.db import transaction
+from django.db.models import Count
+from django.template.response import TemplateResponse
 from django.utils.html import format_html
-from django.shortcuts import redirect
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import path, reverse
 from django.utils import timezone
-from datetime import timedelta
-from .models import Category, Workshop, Booking, Review, NewsletterSubscriber, InhouseTrainingPage
+from .models import (
+    Category, Workshop, Booking, Review, NewsletterSubscriber, InhouseTrainingPage, OutboxMessage,
+    NewsletterCampaign, CampaignDelivery,
+)
+from .cache import invalidate_page_cache
+from .stats import invalidate_site_stats
+from .exports import EXPORTS, streaming_export
+from .forms import ExportForm, NewsletterSubscriberAdminForm, WebinarSeriesForm
+from .segments import interest_counts, invalidate_segment_counts, segment_count
+from .series import duplicate_workshops, generate_series
 
 
 @admin.register(Category)
@@ -13,10 +25,15 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ['name', 'description']
 
+    def get_queryset(self, request):
+        # Tel de webinars in SQL i.p.v. één COUNT query per rij
+        return super().get_queryset(request).annotate(num_webinars=Count('workshops'))
+
     def webinar_count(self, obj):
-        count = obj.workshops.count()
+        count = obj.num_webinars
         return format_html('<strong>{}</strong> webinars', count)
     webinar_count.short_description = 'Aantal webinars'
+    webinar_count.admin_order_field = 'num_webinars'
 
 
 @admin.register(Workshop)
@@ -38,6 +55,7 @@ class WorkshopAdmin(admin.ModelAdmin):
         'category',
         'start_datetime',
     ]
+    list_select_related = ['category']
     search_fields = ['title', 'description', 'instructor_name', 'meeting_url']
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'start_datetime'
@@ -78,7 +96,7 @@ class WorkshopAdmin(admin.ModelAdmin):
     # Alleen created_at en updated_at readonly
     readonly_fields = ['created_at', 'updated_at']
     
-    actions = ['duplicate_webinars']
+    actions = ['duplicate_webinars', 'create_series']
     
     def get_urls(self):
         urls = super().get_urls()
@@ -93,34 +111,10 @@ class WorkshopAdmin(admin.ModelAdmin):
     
     def duplicate_webinar_view(self, request, workshop_id):
         """View om een webinar te dupliceren"""
-        original = Workshop.objects.get(pk=workshop_id)
-        
-        # Maak een kopie van de webinar
-        duplicate = Workshop.objects.get(pk=workshop_id)
-        duplicate.pk = None  # Maak een nieuw object
-        duplicate.id = None
-        
-        # Update de titel en slug
-        duplicate.title = f"{original.title} (Kopie)"
-        duplicate.slug = f"{original.slug}-kopie-{timezone.now().strftime('%Y%m%d-%H%M%S')}"
-        
-        # Verschuif de datum met 1 week (als voorbeeld)
-        if original.start_datetime:
-            duplicate.start_datetime = original.start_datetime + timedelta(days=7)
-        if original.end_datetime:
-            duplicate.end_datetime = original.end_datetime + timedelta(days=7)
+        original = get_object_or_404(Workshop, pk=workshop_id)
         
-        # Reset status naar upcoming
-        duplicate.status = 'upcoming'
-        duplicate.featured = False
-        
-        # Reset meeting URL (nieuwe meeting nodig)
-        duplicate.meeting_url = ''
-        duplicate.meeting_id = ''
-        duplicate.meeting_password = ''
-        
-        # Sla de kopie op
-        duplicate.save()
+        # Kopie een week later, zonder meeting gegevens en status 'upcoming'
+        duplicate, = duplicate_workshops([original])
         
         # Redirect naar de edit pagina van de nieuwe webinar
         self.message_user(request, f'Webinar gedupliceerd! Pas nu de datum, meeting details en andere info aan.')
@@ -128,40 +122,50 @@ class WorkshopAdmin(admin.ModelAdmin):
     
     def duplicate_webinars(self, request, queryset):
         """Admin action om geselecteerde webinars te dupliceren"""
-        if queryset.count() == 1:
+        webinars = list(queryset)
+        if len(webinars) == 1:
             # Als er maar 1 geselecteerd is, ga direct naar de duplicate view
-            webinar = queryset.first()
-            return redirect('admin:workshops_workshop_duplicate', webinar.id)
-        else:
-            # Als er meerdere zijn, dupliceer ze allemaal
-            count = 0
-            for webinar in queryset:
-                duplicate = Workshop.objects.get(pk=webinar.id)
-                duplicate.pk = None
-                duplicate.id = None
-                duplicate.title = f"{webinar.title} (Kopie)"
-                duplicate.slug = f"{webinar.slug}-kopie-{timezone.now().strftime('%Y%m%d-%H%M%S')}-{count}"
-                
-                if webinar.start_datetime:
-                    duplicate.start_datetime = webinar.start_datetime + timedelta(days=7)
-                if webinar.end_datetime:
-                    duplicate.end_datetime = webinar.end_datetime + timedelta(days=7)
-                
-                duplicate.status = 'upcoming'
-                duplicate.featured = False
-                
-                # Reset meeting URLs
-                duplicate.meeting_url = ''
-                duplicate.meeting_id = ''
-                duplicate.meeting_password = ''
-                
-                duplicate.save()
-                count += 1
-            
-            self.message_user(request, f'{count} webinar(s) gedupliceerd met data verschoven met 1 week.')
+            return redirect('admin:workshops_workshop_duplicate', webinars[0].id)
+        
+        # Als er meerdere zijn, dupliceer ze allemaal in één INSERT
+        count = len(duplicate_workshops(webinars))
+        self.message_user(request, f'{count} webinar(s) gedupliceerd met data verschoven met 1 week.')
     
     duplicate_webinars.short_description = '📋 Dupliceer geselecteerde webinars'
     
+    def create_series(self, request, queryset):
+        """Admin action om een reeks sessies van één webinar in te plannen"""
+        selected = list(queryset[:2])
+        if len(selected) != 1:
+            self.message_user(request, 'Selecteer precies één webinar om een reeks te maken.', level=messages.WARNING)
+            return None
+        source = selected[0]
+        
+        form = WebinarSeriesForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            sessions = generate_series(
+                source,
+                form.cleaned_data['rule'],
+                form.cleaned_data['occurrences'],
+            )
+            self.message_user(
+                request,
+                f'{len(sessions)} sessie(s) van "{source.title}" ingepland, '
+                f'tot en met {timezone.localtime(sessions[-1].start_datetime):%d/%m/%Y}.'
+            )
+            return None
+        
+        return TemplateResponse(request, 'admin/workshops/workshop/create_series.html', {
+            **self.admin_site.each_context(request),
+            'title': 'Reeks inplannen',
+            'opts': self.model._meta,
+            'source': source,
+            'form': form,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+    
+    create_series.short_description = '🔁 Plan een reeks sessies in'
+    
     def change_view(self, request, object_id, form_url='', extra_context=None):
         """Voeg een 'Dupliceer' knop toe aan de change view"""
         extra_context = extra_context or {}
@@ -179,6 +183,10 @@ class WorkshopAdmin(admin.ModelAdmin):
         )
     meeting_status.short_description = 'Meeting'
     
+    def get_queryset(self, request):
+        # Geboekte en resterende plaatsen als annotatie (sorteerbaar, geen N+1)
+        return super().get_queryset(request).with_availability()
+    
     def participants_info(self, obj):
         available = obj.available_spots
         total = obj.max_participants
@@ -190,6 +198,7 @@ class WorkshopAdmin(admin.ModelAdmin):
             color, total - available, total
         )
     participants_info.short_description = 'Deelnemers'
+    participants_info.admin_order_field = 'booked_seats'
     
     def status_badge(self, obj):
         colors = {
@@ -223,8 +232,37 @@ class BookingInline(admin.TabularInline):
     can_delete = False
 
 
+class ExportActionMixin:
+    """Streaming CSV/XLSX export van de selectie, met keuze van kolommen"""
+    
+    export_spec = None
+    
+    def export_selected(self, request, queryset):
+        spec = EXPORTS[self.export_spec]
+        form = ExportForm(spec, request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            return streaming_export(
+                queryset,
+                spec,
+                form.cleaned_data['columns'],
+                form.cleaned_data['file_format'],
+            )
+        
+        return TemplateResponse(request, 'admin/workshops/export.html', {
+            **self.admin_site.each_context(request),
+            'title': f'{spec.model._meta.verbose_name_plural} exporteren',
+            'opts': self.model._meta,
+            'form': form,
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+    
+    export_selected.short_description = '📥 Exporteer selectie (CSV/Excel)'
+
+
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(ExportActionMixin, admin.ModelAdmin):
     list_display = [
         'booking_reference',
         'workshop',
@@ -288,7 +326,8 @@ class BookingAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['confirm_bookings', 'cancel_bookings', 'mark_as_paid']
+    actions = ['confirm_bookings', 'cancel_bookings', 'mark_as_paid', 'export_selected']
+    export_spec = 'bookings'
     
     def full_name(self, obj):
         return f"{obj.first_name} {obj.last_name}"
@@ -324,12 +363,14 @@ class BookingAdmin(admin.ModelAdmin):
     payment_badge.short_description = 'Betaling'
     
     def confirm_bookings(self, request, queryset):
-        updated = queryset.update(status='confirmed')
+        # Bulk UPDATE met timestamps, daarna plaatsen en status per webinar;
+        # transition() maakt ook de caches ongeldig
+        updated = queryset.transition('confirmed')
         self.message_user(request, f'{updated} boekingen bevestigd.')
     confirm_bookings.short_description = 'Bevestig geselecteerde boekingen'
     
     def cancel_bookings(self, request, queryset):
-        updated = queryset.update(status='cancelled')
+        updated = queryset.transition('cancelled')
         self.message_user(request, f'{updated} boekingen geannuleerd.')
     cancel_bookings.short_description = 'Annuleer geselecteerde boekingen'
     
@@ -361,18 +402,47 @@ class ReviewAdmin(admin.ModelAdmin):
     actions = ['approve_reviews', 'disapprove_reviews']
     
     def approve_reviews(self, request, queryset):
-        updated = queryset.update(is_approved=True)
+        updated = queryset.update(is_approved=True, updated_at=timezone.now())
+        # Pas na de COMMIT, zoals in signals.py
+        transaction.on_commit(invalidate_site_stats)
+        transaction.on_commit(invalidate_page_cache)
         self.message_user(request, f'{updated} reviews goedgekeurd.')
     approve_reviews.short_description = 'Keur geselecteerde reviews goed'
     
     def disapprove_reviews(self, request, queryset):
-        updated = queryset.update(is_approved=False)
+        updated = queryset.update(is_approved=False, updated_at=timezone.now())
+        # Pas na de COMMIT, zoals in signals.py
+        transaction.on_commit(invalidate_site_stats)
+        transaction.on_commit(invalidate_page_cache)
         self.message_user(request, f'{updated} reviews afgekeurd.')
     disapprove_reviews.short_description = 'Keur geselecteerde reviews af'
 
 
+class InterestFilter(admin.SimpleListFilter):
+    """Filter op interesse (GIN index); het aantal is het gecachte segment"""
+    title = 'interesse'
+    parameter_name = 'interest'
+
+    def lookups(self, request, model_admin):
+        # Alle tellers samen in één (gecachte) query
+        counts = interest_counts()
+        return [
+            (pk, f'{name} ({counts.get(pk, 0)} actief)')
+            for pk, name in Category.objects.order_by('name').values_list('pk', 'name')
+        ]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        if not value.isdigit():
+            return queryset.none()
+        return queryset.interested_in([int(value)])
+
+
 @admin.register(NewsletterSubscriber)
-class NewsletterSubscriberAdmin(admin.ModelAdmin):
+class NewsletterSubscriberAdmin(ExportActionMixin, admin.ModelAdmin):
+    form = NewsletterSubscriberAdminForm
     list_display = [
         'email',
         'full_name',
@@ -383,6 +453,7 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
     list_filter = [
         'is_active',
         'confirmed',
+        InterestFilter,
         'subscribed_at',
     ]
     search_fields = [
@@ -400,7 +471,7 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
         ('Status', {
             'fields': ('is_active', 'confirmed')
         }),
-        ('Interesses (optioneel)', {
+        ('Interesses (segmentatie)', {
             'fields': ('interests',),
             'classes': ('collapse',)
         }),
@@ -410,7 +481,8 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['activate_subscribers', 'deactivate_subscribers', 'export_emails']
+    actions = ['activate_subscribers', 'deactivate_subscribers', 'export_selected']
+    export_spec = 'newsletter'
     
     def full_name(self, obj):
         if obj.first_name or obj.last_name:
@@ -435,25 +507,85 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
     
     def activate_subscribers(self, request, queryset):
         updated = queryset.update(is_active=True, unsubscribed_at=None)
+        invalidate_segment_counts()
         self.message_user(request, f'{updated} inschrijvingen geactiveerd.')
     activate_subscribers.short_description = 'Activeer geselecteerde inschrijvingen'
     
     def deactivate_subscribers(self, request, queryset):
         updated = queryset.update(is_active=False, unsubscribed_at=timezone.now())
+        invalidate_segment_counts()
         self.message_user(request, f'{updated} inschrijvingen gedeactiveerd.')
     deactivate_subscribers.short_description = 'Deactiveer geselecteerde inschrijvingen'
-    
-    def export_emails(self, request, queryset):
-        """Export email adressen naar clipboard-friendly formaat"""
-        emails = queryset.filter(is_active=True).values_list('email', flat=True)
-        email_list = ', '.join(emails)
-        
-        self.message_user(
-            request,
-            f'Email adressen ({len(emails)}): {email_list}',
-            level='success'
+
+
+@admin.register(NewsletterCampaign)
+class NewsletterCampaignAdmin(admin.ModelAdmin):
+    """Campagnes; versturen met: python manage.py send_campaign <id>"""
+    list_display = [
+        'name', 'subject', 'segment_size', 'status', 'sent_count', 'failed_count', 'started_at', 'finished_at',
+    ]
+    list_filter = ['status', 'categories']
+    search_fields = ['name', 'subject']
+    filter_horizontal = ['categories']
+    readonly_fields = [
+        'segment_size', 'status', 'last_subscriber_id', 'sent_count', 'failed_count',
+        'created_at', 'started_at', 'finished_at',
+    ]
+    fieldsets = (
+        ('Inhoud', {
+            'fields': ('name', 'subject', 'body')
+        }),
+        ('Segment', {
+            'fields': ('categories', 'segment_size')
+        }),
+        ('Verzending', {
+            'fields': (
+                'status', 'sent_count', 'failed_count', 'last_subscriber_id',
+                'created_at', 'started_at', 'finished_at',
+            ),
+        }),
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('categories')
+
+    def segment_size(self, obj):
+        if obj.pk is None:
+            return '-'
+        return segment_count(obj.categories.all())
+    segment_size.short_description = 'Ontvangers'
+
+
+@admin.register(CampaignDelivery)
+class CampaignDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['email', 'campaign', 'status', 'attempts', 'updated_at']
+    list_filter = ['status', 'campaign']
+    search_fields = ['email']
+    list_select_related = ['campaign']
+    raw_id_fields = ['subscriber']
+    readonly_fields = ['campaign', 'subscriber', 'email', 'status', 'error', 'attempts', 'updated_at']
+    # Honderdduizenden rijen per campagne: geen COUNT(*) van de hele tabel
+    show_full_result_count = False
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Uitgaande e-mails (verstuurd door manage.py process_outbox)"""
+    list_display = ['created_at', 'kind', 'to', 'subject', 'status', 'attempts', 'available_at', 'sent_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['to', 'subject', 'booking__booking_reference']
+    list_select_related = ['booking']
+    raw_id_fields = ['booking']
+    readonly_fields = ['created_at', 'sent_at', 'attempts', 'last_error']
+    date_hierarchy = 'created_at'
+    actions = ['retry_messages']
+
+    def retry_messages(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, available_at=timezone.now(),
         )
-    export_emails.short_description = '📧 Exporteer email adressen'
+        self.message_user(request, f'{updated} e-mails opnieuw ingepland.')
+    retry_messages.short_description = 'Opnieuw versturen (niet verzonden e-mails)'
 
 
 @admin.register(InhouseTrainingPage)
@@ -5,3 +5,7 @@ class WorkshopsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'workshops'
     verbose_name = 'Workshops & Boekingen'
+
+    def ready(self):
+        # Registreer signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,107 @@
+"""
+Cache laag voor publieke catalogus pagina's
+
+Anonieme GET requests op homepage, webinarlijst, detail, over ons en
+inhouse trainingen worden volledig gecached. De cache key bevat het pad en
+de genormaliseerde filters (search, category, status, sort, page), plus een
+generatie token. Signals vervangen dat token zodra de inhoud wijzigt, zodat
+alle pagina's in één keer ongeldig worden, ongeacht de cache backend
+(locmem of Redis).
+"""
+import hashlib
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+
+
+PAGE_GENERATION_KEY = 'workshops:page_generation'
+
+# Query parameters die de inhoud van een pagina bepalen
+VARY_ON_PARAMS = ('search', 'category', 'status', 'sort', 'page')
+
+
+def normalized_params(request):
+    """Genormaliseerde filters: lege waarden weg, zoekterm in kleine letters"""
+    params = {}
+    for name in VARY_ON_PARAMS:
+        value = ' '.join(request.GET.get(name, '').split())
+        if name == 'search':
+            value = value.lower()
+        if name == 'page' and value == '1':
+            value = ''
+        if value:
+            params[name] = value
+    return params
+
+
+def page_generation():
+    """Huidig generatie token, wordt vervangen bij elke invalidatie"""
+    generation = cache.get(PAGE_GENERATION_KEY)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.add(PAGE_GENERATION_KEY, generation, None)
+        generation = cache.get(PAGE_GENERATION_KEY, generation)
+    return generation
+
+
+def page_cache_key(request):
+    raw = f'{request.path}?{urlencode(sorted(normalized_params(request).items()))}'
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'workshops:page:{page_generation()}:{digest}'
+
+
+def invalidate_page_cache():
+    """Maak alle gecachte pagina's ongeldig"""
+    cache.set(PAGE_GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def is_cacheable_request(request):
+    """
+    Enkel anonieme GET/HEAD requests zonder openstaande messages.
+    Pagina's met berichten of gebruikersinfo zijn persoonlijk.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    return len(get_messages(request)) == 0
+
+
+def is_cacheable_response(response):
+    return response.status_code == 200 and not response.cookies and not response.streaming
+
+
+def cache_public_page(view_func):
+    """
+    Decorator voor publieke views. Gebruik method_decorator(..., name='dispatch')
+    voor class-based views.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+        if not timeout or not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            # Validators worden per request opnieuw gezet (zie conditional.py)
+            for header in ('ETag', 'Last-Modified'):
+                if response.has_header(header):
+                    del response[header]
+            return response
+
+        response = view_func(request, *args, **kwargs)
+        if is_cacheable_response(response):
+            if hasattr(response, 'render') and not response.is_rendered:
+                # TemplateResponse: pas cachen na het renderen
+                response.add_post_render_callback(lambda r: cache.set(key, r, timeout))
+            else:
+                cache.set(key, response, timeout)
+        return response
+
+    return wrapper
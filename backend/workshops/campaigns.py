@@ -0,0 +1,266 @@
+"""
+Nieuwsbrief campagnes versturen naar alle actieve, bevestigde subscribers
+(of enkel een segment op interesses, zie segments.py)
+
+send_campaign() (via `manage.py send_campaign <id>`):
+
+- de ontvangers worden met een server-side cursor gestreamd
+  (values_list(...).iterator(chunk_size=...)) in volgorde van id, vanaf het
+  checkpoint van de campagne; er staat nooit meer dan één batch in het
+  geheugen, ook niet bij 100k subscribers;
+- onderwerp en tekst worden één keer gecompileerd en per ontvanger
+  gerenderd met de merge velden (first_name, last_name, name, email);
+- elke batch wordt verdeeld over een pool van SMTP connecties (één thread
+  per connectie, open zolang de verzending loopt) met een gedeelde rate
+  limit in berichten per seconde;
+- na elke batch worden in één transactie de CampaignDelivery rijen
+  (bulk_create) en het checkpoint en de tellers van de campagne bewaard.
+  Een onderbroken verzending gaat verder na de laatste volledige batch:
+  hoogstens één batch ontvangers krijgt de mail dan een tweede keer.
+
+retry_failed() verstuurt de mislukte afleveringen opnieuw (bulk_update).
+Verstuur een campagne nooit vanuit twee processen tegelijk.
+"""
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template import Context, Template
+from django.utils import timezone
+
+from .models import CampaignDelivery, NewsletterCampaign
+from .seeding import batched
+from .segments import segment
+
+
+# Aantal rijen per fetch van de server-side cursor
+CAMPAIGN_CHUNK_SIZE = 2000
+
+# Lengte waarop de foutmelding bewaard wordt
+ERROR_PREVIEW_LENGTH = 1000
+
+Recipient = namedtuple('Recipient', ['subscriber_id', 'email', 'first_name', 'last_name'])
+
+
+def batch_size():
+    return getattr(settings, 'NEWSLETTER_BATCH_SIZE', 200)
+
+
+def rate_limit():
+    return getattr(settings, 'NEWSLETTER_RATE_LIMIT', 0)
+
+
+def pool_size():
+    return getattr(settings, 'NEWSLETTER_SMTP_CONNECTIONS', 2)
+
+
+def from_email():
+    return getattr(settings, 'NEWSLETTER_FROM_EMAIL', '') or settings.DEFAULT_FROM_EMAIL
+
+
+class RateLimiter:
+    """Hoogstens `rate` berichten per seconde, over alle threads samen (0 = onbeperkt)"""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate and rate > 0 else 0
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.next_slot = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = self.clock()
+            slot = now if self.next_slot is None else max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            self.sleep(slot - now)
+
+
+class ConnectionPool:
+    """Een vaste set mail connecties; elke connectie wordt door één thread gebruikt"""
+
+    def __init__(self, size, factory=get_connection):
+        self.connections = [factory() for _ in range(max(size, 1))]
+        self.executor = ThreadPoolExecutor(max_workers=len(self.connections))
+
+    def __enter__(self):
+        for connection in self.connections:
+            connection.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.executor.shutdown()
+        for connection in self.connections:
+            connection.close()
+
+    def send(self, messages, limiter):
+        """
+        Verstuur (sleutel, EmailMessage) paren verdeeld over de connecties.
+        Geeft {sleutel: foutmelding} terug, met '' voor een geslaagde verzending.
+        """
+        count = len(self.connections)
+        parts = [messages[i::count] for i in range(count)]
+        results = {}
+        for part in self.executor.map(_send_all, self.connections, parts, [limiter] * count):
+            results.update(part)
+        return results
+
+
+def _send_all(connection, messages, limiter):
+    results = {}
+    reopen = False
+    for key, message in messages:
+        limiter.wait()
+        try:
+            if reopen:
+                connection.open()
+                reopen = False
+            connection.send_messages([message])
+        except Exception as error:  # SMTP fouten, time-outs, geweigerde ontvanger, ...
+            results[key] = f'{type(error).__name__}: {error}'[:ERROR_PREVIEW_LENGTH]
+            # Connectie in onbekende toestand: opnieuw openen voor het volgende bericht
+            connection.close()
+            reopen = True
+        else:
+            results[key] = ''
+    return results
+
+
+def recipients(campaign, chunk_size=CAMPAIGN_CHUNK_SIZE):
+    """Subscribers van het segment na het checkpoint, gestreamd in volgorde van id"""
+    rows = (
+        segment(campaign.categories.values_list('pk', flat=True))
+        .filter(pk__gt=campaign.last_subscriber_id)
+        .order_by('pk')
+        .values_list('pk', 'email', 'first_name', 'last_name')
+        .iterator(chunk_size=chunk_size)
+    )
+    return map(Recipient._make, rows)
+
+
+class CampaignRenderer:
+    """Onderwerp en tekst één keer gecompileerd, per ontvanger gerenderd"""
+
+    def __init__(self, campaign, sender=None):
+        self.subject = Template(campaign.subject)
+        self.body = Template(campaign.body)
+        self.sender = sender or from_email()
+
+    def message(self, recipient):
+        name = f'{recipient.first_name} {recipient.last_name}'.strip()
+        context = Context({
+            'first_name': recipient.first_name,
+            'last_name': recipient.last_name,
+            'name': name or recipient.email,
+            'email': recipient.email,
+        }, autoescape=False)
+        return EmailMessage(
+            ' '.join(self.subject.render(context).split()),
+            self.body.render(context),
+            self.sender,
+            [recipient.email],
+        )
+
+
+def send_campaign(campaign, size=None, rate=None, connections=None, progress=None):
+    """
+    Verstuur (of hervat) een campagne. `progress` wordt na elke batch
+    aangeroepen met de campagne. Geeft de campagne terug.
+    """
+    now = timezone.now()
+    if campaign.status == 'draft':
+        campaign.status = 'sending'
+        campaign.started_at = now
+        NewsletterCampaign.objects.filter(pk=campaign.pk).update(status='sending', started_at=now)
+
+    renderer = CampaignRenderer(campaign)
+    limiter = RateLimiter(rate_limit() if rate is None else rate)
+    with ConnectionPool(connections or pool_size()) as pool:
+        for batch in batched(recipients(campaign), size or batch_size()):
+            errors = pool.send([(r.subscriber_id, renderer.message(r)) for r in batch], limiter)
+            now = timezone.now()
+            deliveries = [
+                CampaignDelivery(
+                    campaign=campaign,
+                    subscriber_id=r.subscriber_id,
+                    email=r.email,
+                    status='failed' if errors[r.subscriber_id] else 'sent',
+                    error=errors[r.subscriber_id],
+                    updated_at=now,
+                )
+                for r in batch
+            ]
+            failed = sum(1 for error in errors.values() if error)
+            checkpoint = batch[-1].subscriber_id
+
+            # Afleveringen en checkpoint samen: een batch telt helemaal of niet
+            with transaction.atomic():
+                CampaignDelivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+                NewsletterCampaign.objects.filter(pk=campaign.pk).update(
+                    last_subscriber_id=checkpoint,
+                    sent_count=F('sent_count') + len(batch) - failed,
+                    failed_count=F('failed_count') + failed,
+                )
+            campaign.last_subscriber_id = checkpoint
+            campaign.sent_count += len(batch) - failed
+            campaign.failed_count += failed
+            if progress:
+                progress(campaign)
+
+    campaign.status = 'sent'
+    campaign.finished_at = timezone.now()
+    NewsletterCampaign.objects.filter(pk=campaign.pk).update(
+        status='sent', finished_at=campaign.finished_at,
+    )
+    return campaign
+
+
+def retry_failed(campaign, size=None, rate=None, connections=None, progress=None):
+    """Verstuur de mislukte afleveringen opnieuw (enkel nog actieve subscribers)"""
+    renderer = CampaignRenderer(campaign)
+    limiter = RateLimiter(rate_limit() if rate is None else rate)
+    deliveries = (
+        campaign.deliveries
+        .filter(status='failed', subscriber__is_active=True)
+        .select_related('subscriber')
+        .order_by('pk')
+        .iterator(chunk_size=CAMPAIGN_CHUNK_SIZE)
+    )
+    with ConnectionPool(connections or pool_size()) as pool:
+        for batch in batched(deliveries, size or batch_size()):
+            messages = []
+            for delivery in batch:
+                subscriber = delivery.subscriber
+                recipient = Recipient(subscriber.pk, subscriber.email, subscriber.first_name, subscriber.last_name)
+                messages.append((delivery.pk, renderer.message(recipient)))
+            errors = pool.send(messages, limiter)
+            now = timezone.now()
+            for delivery in batch:
+                delivery.error = errors[delivery.pk]
+                delivery.status = 'failed' if delivery.error else 'sent'
+                delivery.email = delivery.subscriber.email
+                delivery.attempts += 1
+                delivery.updated_at = now
+            recovered = sum(1 for error in errors.values() if not error)
+
+            with transaction.atomic():
+                CampaignDelivery.objects.bulk_update(
+                    batch, ['status', 'error', 'email', 'attempts', 'updated_at'],
+                )
+                NewsletterCampaign.objects.filter(pk=campaign.pk).update(
+                    sent_count=F('sent_count') + recovered,
+                    failed_count=F('failed_count') - recovered,
+                )
+            campaign.sent_count += recovered
+            campaign.failed_count -= recovered
+            if progress:
+                progress(campaign)
+    return campaign
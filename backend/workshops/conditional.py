@@ -0,0 +1,146 @@
+"""
+Conditional GET (ETag / Last-Modified) voor catalogus en detail pagina's
+
+De validators komen uit één query op geïndexeerde updated_at kolommen
+(telkens ORDER BY updated_at DESC LIMIT 1, geen scan van de tabel) en
+worden gecached zoals de pagina zelf (zie cache.py). Wijzigingen van de
+plaatsen zetten Workshop.updated_at mee. Het generatie token van de page
+cache zit in de ETag, zodat ook verwijderingen (die geen timestamp
+achterlaten) een nieuwe ETag opleveren. Voor
+ingelogde gebruikers of requests met openstaande messages worden geen
+validators berekend: die pagina's zijn persoonlijk.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Func, OuterRef, Subquery, Value
+
+from .cache import is_cacheable_request, normalized_params, page_cache_key, page_generation
+from .models import Booking, Category, InhouseTrainingPage, Review, Workshop
+
+
+def _latest(queryset):
+    """Meest recente updated_at van een queryset (gebruikt de updated_at index)"""
+    return Subquery(queryset.order_by('-updated_at').values('updated_at')[:1])
+
+
+def _count(queryset):
+    return Subquery(
+        queryset.order_by().annotate(n=Func(Value(1), function='COUNT')).values('n')[:1]
+    )
+
+
+def _etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _latest_of(*timestamps):
+    return max((ts for ts in timestamps if ts is not None), default=None)
+
+
+def _validators(request, compute):
+    """
+    Bereken de validators één keer per request (ETag + Last-Modified).
+    Ze worden bewaard naast de gecachte pagina, onder hetzelfde generatie
+    token, zodat een warme cache ook voor de validators geen query kost.
+    """
+    if hasattr(request, '_conditional_validators'):
+        return request._conditional_validators
+
+    validators = (None, None)
+    if is_cacheable_request(request):
+        timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+        key = f'{page_cache_key(request)}:validators'
+        validators = cache.get(key) if timeout else None
+        if validators is None:
+            validators = compute()
+            if timeout:
+                cache.set(key, validators, timeout)
+
+    request._conditional_validators = validators
+    return validators
+
+
+def _catalogue_validators(request):
+    # De nieuwste webinar via de updated_at index; de subqueries zonder
+    # OuterRef voert PostgreSQL één keer uit
+    state = (
+        Workshop.objects
+        .order_by('-updated_at')
+        .annotate(
+            categories_changed=_latest(Category.objects.all()),
+            reviews_changed=_latest(Review.objects.all()),
+        )
+        .values('updated_at', 'categories_changed', 'reviews_changed')
+        .first()
+    ) or {}
+    page = InhouseTrainingPage.get_instance()
+    last_modified = _latest_of(*state.values(), page.updated_at)
+    etag = _etag(
+        page_generation(),
+        *sorted(state.items()),
+        page.updated_at,
+        sorted(normalized_params(request).items()),
+    )
+    return etag, last_modified
+
+
+def catalogue_etag(request, *args, **kwargs):
+    return _validators(request, lambda: _catalogue_validators(request))[0]
+
+
+def catalogue_last_modified(request, *args, **kwargs):
+    return _validators(request, lambda: _catalogue_validators(request))[1]
+
+
+def _detail_validators(slug):
+    # Ook de categorie en de gerelateerde webinars (zelfde categorie) staan op de pagina
+    state = (
+        Workshop.objects
+        .filter(slug=slug)
+        .annotate(
+            bookings_changed=_latest(Booking.objects.filter(workshop=OuterRef('pk'))),
+            reviews_changed=_latest(Review.objects.filter(workshop=OuterRef('pk'))),
+            review_count=_count(Review.objects.filter(workshop=OuterRef('pk'))),
+            category_changed=F('category__updated_at'),
+            related_changed=_latest(
+                Workshop.objects.filter(category=OuterRef('category')).exclude(pk=OuterRef('pk'))
+            ),
+        )
+        .values(
+            'updated_at', 'confirmed_seats', 'status',
+            'bookings_changed', 'reviews_changed', 'review_count',
+            'category_changed', 'related_changed',
+        )
+        .first()
+    )
+    if state is None:
+        return None, None
+    last_modified = _latest_of(
+        state['updated_at'], state['bookings_changed'], state['reviews_changed'],
+        state['category_changed'], state['related_changed'],
+    )
+    return _etag(page_generation(), *sorted(state.items())), last_modified
+
+
+def detail_etag(request, slug, *args, **kwargs):
+    return _validators(request, lambda: _detail_validators(slug))[0]
+
+
+def detail_last_modified(request, slug, *args, **kwargs):
+    return _validators(request, lambda: _detail_validators(slug))[1]
+
+
+def _inhouse_validators():
+    # Komt uit de singleton cache: geen query
+    page = InhouseTrainingPage.get_instance()
+    return _etag(page.pk, page.updated_at), page.updated_at
+
+
+def inhouse_etag(request, *args, **kwargs):
+    return _validators(request, _inhouse_validators)[0]
+
+
+def inhouse_last_modified(request, *args, **kwargs):
+    return _validators(request, _inhouse_validators)[1]
@@ -0,0 +1,267 @@
+"""
+Streaming exports (CSV en XLSX) voor boekingen en nieuwsbriefinschrijvingen
+
+Rijen worden met een server-side cursor gelezen (iterator(chunk_size=...))
+en meteen als bytes doorgegeven, zodat het geheugengebruik constant blijft
+ongeacht het aantal rijen. XLSX wordt zonder extra dependency geschreven:
+een minimale SpreadsheetML werkmap, rij per rij gezipt naar de stream.
+"""
+import csv
+import re
+import zipfile
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Booking, NewsletterSubscriber
+
+
+# Aantal rijen per fetch van de server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+# Bytes die we bufferen voor we een stuk naar de client sturen
+FLUSH_SIZE = 64 * 1024
+
+FORMATS = [
+    ('csv', 'CSV (Excel, puntkomma)'),
+    ('xlsx', 'Excel werkmap (.xlsx)'),
+]
+
+Column = namedtuple('Column', ['label', 'path'])
+ExportSpec = namedtuple('ExportSpec', ['name', 'model', 'columns', 'default_columns'])
+
+
+EXPORTS = {
+    'newsletter': ExportSpec(
+        name='nieuwsbrief',
+        model=NewsletterSubscriber,
+        columns={
+            'email': Column('E-mailadres', 'email'),
+            'first_name': Column('Voornaam', 'first_name'),
+            'last_name': Column('Achternaam', 'last_name'),
+            'is_active': Column('Actief', 'is_active'),
+            'confirmed': Column('Bevestigd', 'confirmed'),
+            'subscribed_at': Column('Ingeschreven op', 'subscribed_at'),
+            'unsubscribed_at': Column('Uitgeschreven op', 'unsubscribed_at'),
+            'interests': Column('Interesses', 'interests'),
+        },
+        default_columns=['email', 'first_name', 'last_name'],
+    ),
+    'bookings': ExportSpec(
+        name='boekingen',
+        model=Booking,
+        columns={
+            'booking_reference': Column('Referentie', 'booking_reference'),
+            'workshop': Column('Webinar', 'workshop__title'),
+            'start_datetime': Column('Start webinar', 'workshop__start_datetime'),
+            'first_name': Column('Voornaam', 'first_name'),
+            'last_name': Column('Achternaam', 'last_name'),
+            'email': Column('E-mailadres', 'email'),
+            'phone': Column('Telefoon', 'phone'),
+            'number_of_participants': Column('Deelnemers', 'number_of_participants'),
+            'total_price': Column('Totaalprijs', 'total_price'),
+            'status': Column('Status', 'status'),
+            'payment_status': Column('Betaling', 'payment_status'),
+            'created_at': Column('Geboekt op', 'created_at'),
+            'confirmed_at': Column('Bevestigd op', 'confirmed_at'),
+            'cancelled_at': Column('Geannuleerd op', 'cancelled_at'),
+        },
+        default_columns=[
+            'booking_reference', 'workshop', 'first_name', 'last_name', 'email',
+            'number_of_participants', 'status', 'payment_status',
+        ],
+    ),
+}
+
+
+def export_rows(queryset, spec, columns):
+    """Waarden per rij via een server-side cursor, in vaste (pk) volgorde"""
+    paths = [spec.columns[key].path for key in columns]
+    return (
+        queryset
+        .order_by('pk')
+        .values_list(*paths)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+# Begintekens waarmee Excel een CSV cel als formule uitvoert (CSV injectie)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _text(value, for_csv=False):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'ja' if value else 'nee'
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(item) for item in value)
+    if for_csv and isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Vrije tekst van bezoekers: als tekst tonen, nooit uitvoeren
+        return "'" + value
+    return str(value)
+
+
+class _Buffer:
+    """Schrijfdoel dat alles bijhoudt tot het met take() wordt opgehaald"""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, data):
+        self.parts.append(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.parts)
+        self.parts, self.size = [], 0
+        return data
+
+
+class _Line:
+    """Pseudo-buffer voor csv.writer: geeft de geschreven regel terug"""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(headers, rows):
+    """CSV met BOM en puntkomma, zoals Excel het in een Belgische locale verwacht"""
+    writer = csv.writer(_Line(), delimiter=';')
+    buffer = _Buffer()
+    buffer.write('\ufeff'.encode())
+    buffer.write(writer.writerow(headers).encode())
+    for row in rows:
+        buffer.write(writer.writerow([_text(value, for_csv=True) for value in row]).encode())
+        if buffer.size >= FLUSH_SIZE:
+            yield buffer.take()
+    yield buffer.take()
+
+
+# Tekens die in XML 1.0 niet toegelaten zijn
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+        '<cellXfs count="2"><xf/><xf fontId="1" applyFont="1"/></cellXfs>'
+        '</styleSheet>'
+    ),
+}
+
+
+def _xlsx_cell(value, style=''):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c t="n"{style}><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML.sub('', _text(value)))
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values, style=''):
+    return ('<row>' + ''.join(_xlsx_cell(value, style) for value in values) + '</row>').encode()
+
+
+def xlsx_chunks(headers, rows):
+    """XLSX werkmap met één blad; strings inline, dus geen shared strings tabel"""
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(_xlsx_row(headers, style=' s="1"'))
+            for row in rows:
+                sheet.write(_xlsx_row(row))
+                if buffer.size >= FLUSH_SIZE:
+                    yield buffer.take()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.take()
+
+
+WRITERS = {
+    'csv': (csv_chunks, 'text/csv; charset=utf-8'),
+    'xlsx': (xlsx_chunks, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def export_chunks(queryset, spec, columns, file_format='csv'):
+    """Bytes van de export, stuk per stuk"""
+    writer, _ = WRITERS[file_format]
+    headers = [spec.columns[key].label for key in columns]
+    return writer(headers, export_rows(queryset, spec, columns))
+
+
+def streaming_export(queryset, spec, columns, file_format='csv'):
+    """StreamingHttpResponse met de export als download"""
+    _, content_type = WRITERS[file_format]
+    response = StreamingHttpResponse(
+        export_chunks(queryset, spec, columns, file_format),
+        content_type=content_type,
+    )
+    filename = f'{spec.name}-{timezone.localdate():%Y%m%d}.{file_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
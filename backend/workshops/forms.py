@@ -1,6 +1,8 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Booking, Workshop, NewsletterSubscriber
+from .models import Booking, Category, Workshop, NewsletterSubscriber
+from .exports import FORMATS as EXPORT_FORMATS
+from .series import MAX_OCCURRENCES, RECURRENCE_CHOICES
 
 
 class BookingForm(forms.ModelForm):
@@ -179,3 +181,78 @@ class NewsletterSubscribeForm(forms.ModelForm):
                 raise ValidationError('Dit email adres is al ingeschreven voor de nieuwsbrief.')
         
         return email
+
+
+class NewsletterSubscriberAdminForm(forms.ModelForm):
+    """
+    Admin form voor subscribers: interesses als keuzelijst van categorieën
+    (bewaard als JSON lijst met category ids, zie segments.py)
+    """
+
+    interests = forms.TypedMultipleChoiceField(
+        label='Interesses',
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple
+    )
+
+    class Meta:
+        model = NewsletterSubscriber
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['interests'].choices = Category.objects.values_list('pk', 'name')
+
+    def clean_interests(self):
+        return sorted(set(self.cleaned_data['interests'])) or None
+
+
+class WebinarSeriesForm(forms.Form):
+    """
+    Admin form om een reeks sessies van een webinar in te plannen
+    """
+    
+    rule = forms.ChoiceField(
+        label='Herhaling',
+        choices=RECURRENCE_CHOICES,
+        initial='weekly'
+    )
+    
+    occurrences = forms.IntegerField(
+        label='Aantal sessies',
+        min_value=1,
+        max_value=MAX_OCCURRENCES,
+        initial=10,
+        help_text=f'Aantal extra sessies na de geselecteerde webinar (max. {MAX_OCCURRENCES})'
+    )
+
+
+class ExportForm(forms.Form):
+    """
+    Admin form om kolommen en formaat van een export te kiezen
+    """
+    
+    columns = forms.MultipleChoiceField(
+        label='Kolommen',
+        widget=forms.CheckboxSelectMultiple
+    )
+    
+    file_format = forms.ChoiceField(
+        label='Formaat',
+        choices=EXPORT_FORMATS,
+        initial='csv',
+        widget=forms.RadioSelect
+    )
+    
+    def __init__(self, spec, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['columns'].choices = [
+            (key, column.label) for key, column in spec.columns.items()
+        ]
+        self.fields['columns'].initial = spec.default_columns
+    
+    def clean_columns(self):
+        # Volgorde van de spec aanhouden, niet die van de POST data
+        selected = set(self.cleaned_data['columns'])
+        return [key for key, _ in self.fields['columns'].choices if key in selected]
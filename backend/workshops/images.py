@@ -0,0 +1,211 @@
+"""
+Responsive renditions van Workshop.image
+
+Bij het uploaden (Workshop.save) wordt het origineel één keer verwerkt:
+
+- renditions op vaste breedtes (RENDITION_WIDTHS, nooit groter dan het
+  origineel) in WebP (en AVIF als Pillow het ondersteunt) plus JPEG als
+  fallback;
+- breedte en hoogte van het origineel, zodat de browser de ruimte vooraf
+  kan reserveren (geen layout shift);
+- een wazige placeholder van enkele honderden bytes als data URI.
+
+Renditions staan in media/workshops/renditions/<hash>/ met een hash van
+de inhoud van het origineel: dezelfde upload wordt niet opnieuw verwerkt
+en een URL verandert nooit van inhoud (lang cachebaar). Wordt de afbeelding
+vervangen of verwijderd, dan verdwijnt de oude map na de COMMIT, tenzij een
+andere webinar dezelfde afbeelding nog gebruikt. De template tag
+{% responsive_image %} (templatetags/workshop_images.py) gebruikt ze.
+Bestaande afbeeldingen: manage.py build_image_renditions.
+"""
+import base64
+import hashlib
+import os
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageFilter, ImageOps
+
+from .models import Workshop
+
+
+# Breedtes (px) van de renditions; kaarten zijn ±400px breed, de detail
+# pagina ±800px, telkens ook voor schermen met 2x pixeldichtheid
+RENDITION_WIDTHS = (320, 480, 640, 960, 1280, 1600)
+
+RENDITION_DIR = 'workshops/renditions'
+
+# Formaat -> (extensie, save opties); de volgorde is de voorkeur in <picture>
+_FORMATS = {
+    'avif': ('avif', {'quality': 60}),
+    'webp': ('webp', {'quality': 78, 'method': 4}),
+    'jpeg': ('jpg', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+FALLBACK_FORMAT = 'jpeg'
+
+# jsonb bewaart de volgorde van sleutels niet
+PREFERENCE = tuple(_FORMATS)
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+
+PLACEHOLDER_WIDTH = 16
+
+
+def rendition_formats():
+    """Formaten die deze Pillow build kan schrijven, JPEG altijd als laatste"""
+    Image.init()
+    return [name for name in _FORMATS if name.upper() in Image.SAVE]
+
+
+def rendition_widths(width):
+    """Vaste breedtes kleiner dan het origineel, plus het origineel (begrensd)"""
+    widths = [size for size in RENDITION_WIDTHS if size < width]
+    widths.append(min(width, RENDITION_WIDTHS[-1]))
+    return widths
+
+
+def _flatten(image):
+    """JPEG kent geen transparantie: op een witte achtergrond zetten"""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _encode(image, file_format):
+    _, options = _FORMATS[file_format]
+    if file_format == 'jpeg':
+        image = _flatten(image)
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, file_format.upper(), **options)
+    return buffer.getvalue()
+
+
+def placeholder(image):
+    """Kleine, wazige JPEG als data URI (enkele honderden bytes)"""
+    height = max(round(image.height * PLACEHOLDER_WIDTH / image.width), 1)
+    tiny = _flatten(image).resize((PLACEHOLDER_WIDTH, height), Image.Resampling.BILINEAR)
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    buffer = BytesIO()
+    tiny.save(buffer, 'JPEG', quality=40, optimize=True)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def build_renditions(content, storage=default_storage):
+    """
+    Verwerk de bytes van een origineel. Geeft de waarden voor de image_*
+    velden van Workshop terug.
+    """
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    with Image.open(BytesIO(content)) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    renditions = {}
+    for file_format in rendition_formats():
+        extension, _ = _FORMATS[file_format]
+        renditions[file_format] = []
+        for width in rendition_widths(image.width):
+            name = f'{RENDITION_DIR}/{digest}/{width}w.{extension}'
+            if not storage.exists(name):
+                height = max(round(image.height * width / image.width), 1)
+                resized = image if width == image.width else image.resize(
+                    (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+                )
+                name = storage.save(name, ContentFile(_encode(resized, file_format)))
+            renditions[file_format].append([width, name])
+
+    return {
+        'image_width': image.width,
+        'image_height': image.height,
+        'image_placeholder': placeholder(image),
+        'image_renditions': renditions,
+    }
+
+
+def empty_renditions():
+    return {
+        'image_width': None,
+        'image_height': None,
+        'image_placeholder': '',
+        'image_renditions': {},
+    }
+
+
+def read_image(field_file):
+    """Bytes van een ImageField bestand, ook als de upload nog niet bewaard is"""
+    if field_file._committed:
+        with field_file.storage.open(field_file.name, 'rb') as handle:
+            return handle.read()
+    upload = field_file.file
+    upload.seek(0)
+    content = upload.read()
+    # FileField.pre_save bewaart de upload hierna nog
+    upload.seek(0)
+    return content
+
+
+def rendition_dirs(renditions):
+    """Mappen (workshops/renditions/<hash>) waar renditions in staan"""
+    return {
+        posixpath.dirname(name)
+        for sizes in (renditions or {}).values()
+        for _, name in sizes
+    }
+
+
+def delete_rendition_dirs(directories, storage=default_storage):
+    """Verwijder rendition mappen die geen enkele webinar nog gebruikt"""
+    for directory in directories:
+        if Workshop.objects.filter(image_renditions__icontains=f'{directory}/').exists():
+            continue
+        try:
+            _, files = storage.listdir(directory)
+        except FileNotFoundError:
+            continue
+        for name in files:
+            storage.delete(f'{directory}/{name}')
+        # Object storage kent geen mappen; lokaal blijft er anders een lege over
+        try:
+            os.rmdir(storage.path(directory))
+        except (NotImplementedError, OSError):
+            pass
+
+
+def apply_renditions(workshop):
+    """
+    Zet de image_* velden van een webinar volgens zijn huidige afbeelding;
+    de renditions van de vorige afbeelding worden na de COMMIT opgeruimd
+    """
+    storage = workshop.image.storage
+    previous = rendition_dirs(workshop.image_renditions)
+    if workshop.image:
+        values = build_renditions(read_image(workshop.image), storage)
+    else:
+        values = empty_renditions()
+    for field, value in values.items():
+        setattr(workshop, field, value)
+    stale = previous - rendition_dirs(values['image_renditions'])
+    if stale:
+        transaction.on_commit(lambda: delete_rendition_dirs(stale, storage))
+    return values
+
+
+def preferred_formats(renditions):
+    """Formaten van een webinar in volgorde van voorkeur"""
+    return [file_format for file_format in PREFERENCE if file_format in renditions]
+
+
+def srcset(renditions, file_format, storage=default_storage):
+    return ', '.join(
+        f'{storage.url(name)} {width}w' for width, name in renditions.get(file_format, [])
+    )
+
@@ -0,0 +1,280 @@
+"""
+Performance instrumentatie per request
+
+PerformanceMiddleware meet voor een steekproef van de requests
+(PERF_SAMPLE_RATE) per view: totale tijd, aantal SQL queries en hun tijd
+(via connection.execute_wrapper), template render tijd en cache hits en
+misses. De resultaten gaan naar
+
+- een Server-Timing header (zichtbaar in de browser devtools),
+- een rolling histogram per view in dit proces (zie snapshot()).
+
+De staff-only view performance_report toont de traagste views en queries.
+Met PERF_SAMPLE_RATE = 0 wordt de middleware niet eens geladen; voor niet
+gemeten requests kost het enkel een random() en een contextvar lookup.
+"""
+import heapq
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.module_loading import import_string
+
+
+# Grenzen (ms) van de histogram buckets; de laatste bucket is alles erboven
+HISTOGRAM_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Aantal traagste queries dat per proces bijgehouden wordt
+SLOW_QUERY_LIMIT = 25
+
+# Lengte waarop SQL in het rapport wordt afgekapt
+SQL_PREVIEW_LENGTH = 500
+
+_current = ContextVar('workshops_request_metrics', default=None)
+
+
+def sample_rate():
+    return getattr(settings, 'PERF_SAMPLE_RATE', 0.0)
+
+
+def history_size():
+    return getattr(settings, 'PERF_HISTORY_SIZE', 500)
+
+
+def _percentile(ordered, pct):
+    """Nearest-rank percentiel van een gesorteerde, niet lege lijst"""
+    return ordered[max(math.ceil(pct / 100 * len(ordered)), 1) - 1]
+
+
+class RequestMetrics:
+    """Metingen van één (gesamplede) request"""
+
+    __slots__ = (
+        'started', 'sql_count', 'sql_time', 'template_time', 'template_depth',
+        'cache_hits', 'cache_misses', 'queries',
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.queries = []
+
+    def server_timing(self, total):
+        return ', '.join([
+            f'total;dur={total * 1000:.1f}',
+            f'sql;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f};desc="templates"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ])
+
+
+class PerformanceRegistry:
+    """Rolling vensters per view en de traagste queries, thread-safe"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = defaultdict(lambda: deque(maxlen=history_size()))
+        self.slow_queries = []  # min-heap op duur
+
+    def record(self, view, total, metrics):
+        sample = (
+            total * 1000,
+            metrics.sql_count,
+            metrics.sql_time * 1000,
+            metrics.template_time * 1000,
+            metrics.cache_hits,
+            metrics.cache_misses,
+        )
+        with self.lock:
+            self.views[view].append(sample)
+            for duration, sql in metrics.queries:
+                entry = (duration * 1000, sql[:SQL_PREVIEW_LENGTH], view)
+                if len(self.slow_queries) < SLOW_QUERY_LIMIT:
+                    heapq.heappush(self.slow_queries, entry)
+                elif entry[0] > self.slow_queries[0][0]:
+                    heapq.heapreplace(self.slow_queries, entry)
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+            self.slow_queries = []
+
+    def snapshot(self):
+        """Statistieken per view (traagste p95 eerst) en de traagste queries"""
+        with self.lock:
+            views = {view: list(samples) for view, samples in self.views.items()}
+            slow_queries = sorted(self.slow_queries, reverse=True)
+
+        report = []
+        for view, samples in views.items():
+            totals = sorted(sample[0] for sample in samples)
+            count = len(samples)
+            histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+            for value in totals:
+                histogram[next(
+                    (i for i, edge in enumerate(HISTOGRAM_BUCKETS) if value <= edge),
+                    len(HISTOGRAM_BUCKETS),
+                )] += 1
+            report.append({
+                'view': view,
+                'requests': count,
+                'p50_ms': round(_percentile(totals, 50), 2),
+                'p95_ms': round(_percentile(totals, 95), 2),
+                'p99_ms': round(_percentile(totals, 99), 2),
+                'max_ms': round(totals[-1], 2),
+                'sql_queries_mean': round(sum(s[1] for s in samples) / count, 2),
+                'sql_ms_mean': round(sum(s[2] for s in samples) / count, 2),
+                'template_ms_mean': round(sum(s[3] for s in samples) / count, 2),
+                'cache_hits': sum(s[4] for s in samples),
+                'cache_misses': sum(s[5] for s in samples),
+                'histogram': dict(zip(
+                    [f'<={edge}ms' for edge in HISTOGRAM_BUCKETS] + [f'>{HISTOGRAM_BUCKETS[-1]}ms'],
+                    histogram,
+                )),
+            })
+        report.sort(key=lambda row: row['p95_ms'], reverse=True)
+        return {
+            'sample_rate': sample_rate(),
+            'views': report,
+            'slow_queries': [
+                {'duration_ms': round(duration, 2), 'view': view, 'sql': sql}
+                for duration, sql, view in slow_queries
+            ],
+        }
+
+
+registry = PerformanceRegistry()
+
+
+def _sql_timer(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        metrics.sql_count += 1
+        metrics.sql_time += duration
+        metrics.queries.append((duration, sql))
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def _timed_render(render):
+    def wrapper(self, context):
+        metrics = _current.get()
+        if metrics is None:
+            return render(self, context)
+        # Enkel de buitenste template meten: {% include %} rendert genest
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - start
+    wrapper.__wrapped__ = render
+    return wrapper
+
+
+_MISSING = object()
+
+
+def _counted_get(get):
+    def wrapper(self, key, default=None, version=None):
+        metrics = _current.get()
+        if metrics is None:
+            return get(self, key, default, version)
+        value = get(self, key, _MISSING, version)
+        if value is _MISSING:
+            metrics.cache_misses += 1
+            return default
+        metrics.cache_hits += 1
+        return value
+    wrapper.__wrapped__ = get
+    return wrapper
+
+
+def _counted_get_many(get_many):
+    def wrapper(self, keys, version=None):
+        metrics = _current.get()
+        keys = list(keys)
+        found = get_many(self, keys, version)
+        if metrics is not None:
+            metrics.cache_hits += len(found)
+            metrics.cache_misses += len(keys) - len(found)
+        return found
+    wrapper.__wrapped__ = get_many
+    return wrapper
+
+
+def install():
+    """
+    Eénmalig: time Template.render en tel get/get_many van de geconfigureerde
+    cache backends. Buiten een gemeten request doen de wrappers niets extra.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from django.template.base import Template
+        Template.render = _timed_render(Template.render)
+
+        backends = {import_string(options['BACKEND']) for options in settings.CACHES.values()}
+        for backend in backends:
+            # Enkel eigen implementaties wrappen: BaseCache.get_many roept
+            # get() aan en zou anders dubbel tellen
+            for name, wrap in (('get', _counted_get), ('get_many', _counted_get_many)):
+                method = vars(backend).get(name)
+                if method is not None and not hasattr(method, '__wrapped__'):
+                    setattr(backend, name, wrap(method))
+        _installed = True
+
+
+class PerformanceMiddleware:
+    """Meet een steekproef van de requests; zie de module docstring"""
+
+    def __init__(self, get_response):
+        if sample_rate() <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        rate = sample_rate()
+        if rate < 1 and random.random() >= rate:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_sql_timer))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total = time.perf_counter() - metrics.started
+        match = getattr(request, 'resolver_match', None)
+        registry.record(match.view_name if match else 'unresolved', total, metrics)
+        if getattr(settings, 'PERF_SERVER_TIMING', True):
+            response['Server-Timing'] = metrics.server_timing(total)
+        return response
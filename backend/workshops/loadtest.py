@@ -0,0 +1,352 @@
+"""
+Synthetische load test van de boekingsflow
+
+Elke virtuele gebruiker doorloopt catalogus -> webinar detail ->
+boekingsformulier -> boeking (POST) -> bevestiging via Django's test
+client, in-process en in een eigen thread (dus met een eigen database
+connectie). Met een base_url gaan de requests via HTTP naar een draaiende
+server (runserver of gunicorn); queries en connecties worden dan in dat
+proces gemaakt en niet gemeten. Per endpoint worden latency, status codes en het aantal SQL
+queries bijgehouden (via connection.execute_wrapper). Het rapport is JSON
+met vaste sleutelvolgorde, zodat het tussen commits gediffed kan worden.
+"""
+import json
+import math
+import platform
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urljoin, urlsplit
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .models import Booking, OutboxMessage, Workshop
+
+
+# Herkenbaar adres voor boekingen die door de load test gemaakt worden
+LOADTEST_EMAIL_DOMAIN = 'loadtest.invalid'
+
+# Volgorde van de stappen in de flow (en in het rapport)
+FUNNEL = ('catalogue', 'detail', 'booking_form', 'booking_post', 'confirmation')
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentiel van een (niet lege) lijst"""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class QueryCounter:
+    """execute_wrapper die queries telt voor de huidige thread/connectie"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Recorder:
+    """Verzamelt metingen per endpoint, thread-safe"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.connections = 0
+
+    def connection_opened(self, sender, connection, **kwargs):
+        with self.lock:
+            self.connections += 1
+
+    def add(self, endpoint, seconds, queries, status):
+        with self.lock:
+            self.samples[endpoint].append((seconds, queries))
+            self.statuses[endpoint][str(status)] += 1
+
+    def summary(self, elapsed):
+        """Per endpoint; queries is None als ze niet gemeten werden (HTTP)"""
+        endpoints = {}
+        for endpoint in FUNNEL:
+            samples = self.samples.get(endpoint)
+            if not samples:
+                continue
+            latencies = [seconds * 1000 for seconds, _ in samples]
+            queries = [count for _, count in samples if count is not None]
+            endpoints[endpoint] = {
+                'requests': len(samples),
+                'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+                'latency_ms': {
+                    **{f'p{pct}': round(percentile(latencies, pct), 2) for pct in PERCENTILES},
+                    'mean': round(sum(latencies) / len(latencies), 2),
+                    'max': round(max(latencies), 2),
+                },
+                'queries': {
+                    'mean': round(sum(queries) / len(queries), 2),
+                    'max': max(queries),
+                } if queries else None,
+                'status_codes': dict(sorted(self.statuses[endpoint].items())),
+            }
+        return endpoints
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpResponse:
+    """Wat de flow van een response nodig heeft, zoals bij de test client"""
+
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+
+    def get(self, header, default=None):
+        return self.headers.get(header, default)
+
+
+class HttpClient:
+    """
+    Client voor een draaiende server: echte HTTP requests met cookies,
+    volgt geen redirects en stuurt het CSRF token mee bij een POST
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/') + '/'
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), _NoRedirect)
+
+    def get(self, url, data=None):
+        return self.open(Request(urljoin(self.base_url, url)))
+
+    def post(self, url, data):
+        token = next((c.value for c in self.cookies if c.name == settings.CSRF_COOKIE_NAME), '')
+        url = urljoin(self.base_url, url)
+        body = urlencode({**data, 'csrfmiddlewaretoken': token}).encode()
+        return self.open(Request(url, data=body, headers={'Referer': url}))
+
+    def open(self, request):
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                response.read()
+                return HttpResponse(response.status, response.headers)
+        except HTTPError as error:
+            # Ook redirects komen hier terecht (_NoRedirect)
+            error.read()
+            return HttpResponse(error.code, error.headers)
+
+
+class FunnelUser:
+    """Eén virtuele gebruiker met een eigen test client"""
+
+    def __init__(self, number, recorder, slugs, participants=1, base_url=None):
+        self.number = number
+        self.recorder = recorder
+        self.slugs = slugs
+        self.participants = participants
+        self.client = HttpClient(base_url) if base_url else Client(HTTP_HOST=_host())
+        self.counter = QueryCounter() if not base_url else None
+
+    def request(self, endpoint, method, url, data=None):
+        if self.counter is None:
+            start = time.perf_counter()
+            response = getattr(self.client, method)(url, data or {})
+            self.recorder.add(endpoint, time.perf_counter() - start, None, response.status_code)
+            return response
+
+        self.counter.count = 0
+        with connection.execute_wrapper(self.counter):
+            start = time.perf_counter()
+            response = getattr(self.client, method)(url, data or {})
+            # De test client laat connecties open; een WSGI server sluit ze
+            # na elke request als CONN_MAX_AGE verstreken is
+            close_old_connections()
+            elapsed = time.perf_counter() - start
+        self.recorder.add(endpoint, elapsed, self.counter.count, response.status_code)
+        return response
+
+    def run(self, iterations):
+        for iteration in range(iterations):
+            slug = self.slugs[(self.number + iteration) % len(self.slugs)]
+            self.funnel(slug, iteration)
+
+    def run_in_thread(self, iterations):
+        try:
+            self.run(iterations)
+        finally:
+            # Elke thread heeft een eigen connectie: niet laten openstaan
+            connection.close()
+
+    def funnel(self, slug, iteration):
+        self.request('catalogue', 'get', reverse('workshops:workshop_list'))
+        self.request('detail', 'get', reverse('workshops:workshop_detail', args=[slug]))
+        booking_url = reverse('workshops:workshop_booking', args=[slug])
+        self.request('booking_form', 'get', booking_url)
+        response = self.request('booking_post', 'post', booking_url, {
+            'name': f'Load Test {self.number}',
+            'email': f'user{self.number}-{iteration}@{LOADTEST_EMAIL_DOMAIN}',
+            'phone': '0470 12 34 56',
+            'num_participants': self.participants,
+            'accept_terms': 'on',
+        })
+        # Enkel een geslaagde boeking gaat door naar de bevestiging
+        location = response.get('Location', '') if response.status_code == 302 else ''
+        if location and resolve(urlsplit(location).path).url_name == 'booking_confirmation':
+            self.request('confirmation', 'get', location)
+
+
+def _host():
+    """Een host die door ALLOWED_HOSTS geaccepteerd wordt"""
+    for host in settings.ALLOWED_HOSTS:
+        if host and host != '*' and not host.startswith('.'):
+            return host
+    return 'testserver'
+
+
+def bookable_slugs(limit=50):
+    """Zichtbare, toekomstige webinars die nog niet volzet zijn"""
+    return list(
+        Workshop.objects
+        .visible()
+        .filter(start_datetime__gt=timezone.now())
+        .exclude(status='full')
+        .order_by('-max_participants', 'pk')
+        .values_list('slug', flat=True)[:limit]
+    )
+
+
+def cleanup_bookings():
+    """
+    Verwijder de load test boekingen met hun outbox mails en herbereken de
+    betrokken webinars
+    """
+    created = Booking.objects.filter(email__endswith=f'@{LOADTEST_EMAIL_DOMAIN}')
+    workshop_ids = set(created.values_list('workshop_id', flat=True))
+    # Ook mails die niet (meer) aan een boeking hangen: een draaiende worker
+    # mag geen berichten naar de synthetische adressen blijven proberen
+    OutboxMessage.objects.filter(to__endswith=f'@{LOADTEST_EMAIL_DOMAIN}').delete()
+    _, deleted = created.delete()
+    Workshop.objects.filter(pk__in=workshop_ids).refresh_capacity()
+    return deleted.get(Booking._meta.label, 0)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_load_test(concurrency=10, iterations=10, slugs=None, participants=1, warmup=1,
+                  base_url=None):
+    """
+    Draai de flow `iterations` keer per gebruiker met `concurrency`
+    gelijktijdige gebruikers, in-process of tegen `base_url`.
+    Geeft het rapport terug als dict.
+    """
+    slugs = slugs or bookable_slugs()
+    if not slugs:
+        raise ValueError('Geen boekbare webinars gevonden (draai eerst populate_data)')
+
+    # Opwarmen (caches, template loaders) telt niet mee in de metingen
+    if warmup:
+        FunnelUser(-1, Recorder(), slugs, participants, base_url).run(warmup)
+
+    recorder = Recorder()
+    users = [
+        FunnelUser(number, recorder, slugs, participants, base_url) for number in range(concurrency)
+    ]
+    connection_created.connect(recorder.connection_opened)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(user.run_in_thread, iterations) for user in users]:
+                future.result()
+    finally:
+        elapsed = time.perf_counter() - start
+        connection_created.disconnect(recorder.connection_opened)
+
+    endpoints = recorder.summary(elapsed)
+    completed = endpoints.get('confirmation', {}).get('requests', 0)
+    requests = sum(e['requests'] for e in endpoints.values())
+    connections = None if base_url else recorder.connections
+    return {
+        'meta': {
+            'target': base_url or 'in-process',
+            'revision': _git_revision(),
+            'started_at': timezone.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'conn_pool': 'pool' in connection.settings_dict['OPTIONS'],
+            'cache_backend': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+            'page_cache_timeout': getattr(settings, 'PAGE_CACHE_TIMEOUT', None),
+        },
+        'config': {
+            'concurrency': concurrency,
+            'iterations': iterations,
+            'participants': participants,
+            'webinars': len(slugs),
+        },
+        'totals': {
+            'elapsed_s': round(elapsed, 3),
+            'requests': requests,
+            'throughput_rps': round(requests / elapsed, 2),
+            'connections_opened': connections,
+            'requests_per_connection': round(requests / connections, 2) if connections else None,
+            'funnels_completed': completed,
+            'funnels_per_s': round(completed / elapsed, 2),
+        },
+        'endpoints': endpoints,
+    }
+
+
+def _mean_queries(endpoint):
+    return f'{endpoint["queries"]["mean"]:.1f}' if endpoint['queries'] else '?'
+
+
+def compare_reports(old, new):
+    """Regels met het verschil in p95 latency en queries per endpoint"""
+    lines = []
+    before, after = old.get('totals', {}), new.get('totals', {})
+    if 'throughput_rps' in before and 'throughput_rps' in after:
+        lines.append(
+            f'{"totaal":<14} {before["throughput_rps"]:>8.2f} -> {after["throughput_rps"]:>8.2f} req/s  '
+            f'connecties {before.get("connections_opened") or "?"} -> {after.get("connections_opened") or "?"}'
+        )
+    for endpoint in FUNNEL:
+        before = old.get('endpoints', {}).get(endpoint)
+        after = new.get('endpoints', {}).get(endpoint)
+        if not before or not after:
+            continue
+        p95_before, p95_after = before['latency_ms']['p95'], after['latency_ms']['p95']
+        change = (p95_after - p95_before) / p95_before * 100 if p95_before else 0
+        lines.append(
+            f'{endpoint:<14} p95 {p95_before:>8.2f} -> {p95_after:>8.2f} ms ({change:+.1f}%)  '
+            f'queries {_mean_queries(before)} -> {_mean_queries(after)}'
+        )
+    return lines
+
+
+def dump_report(report, path):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+        handle.write('\n')
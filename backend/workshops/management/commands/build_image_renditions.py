@@ -0,0 +1,68 @@
+"""
+Django Management Command om renditions te maken voor bestaande afbeeldingen
+
+Nieuwe uploads worden al verwerkt in Workshop.save(); dit command vult
+webinars aan die van vóór de rendition pipeline dateren.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from PIL import UnidentifiedImageError
+
+from workshops.cache import invalidate_page_cache
+from workshops.images import build_renditions, preferred_formats, read_image
+from workshops.models import Workshop
+
+
+# Rendition die een catalogus kaart op een gewoon scherm typisch laadt
+CARD_WIDTH = 480
+
+
+class Command(BaseCommand):
+    help = 'Maakt responsive renditions (WebP/JPEG), afmetingen en placeholders voor Workshop.image'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--slug',
+            type=str,
+            help='Verwerk enkel deze webinar'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Verwerk ook webinars die al renditions hebben'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Workshop.objects.exclude(image='').exclude(image__isnull=True).order_by('pk')
+        if options.get('slug'):
+            queryset = queryset.filter(slug=options['slug'])
+        if not options['force']:
+            queryset = queryset.filter(image_renditions={})
+
+        processed = original_bytes = card_bytes = 0
+        for workshop in queryset.only('pk', 'slug', 'image'):
+            try:
+                content = read_image(workshop.image)
+                values = build_renditions(content, workshop.image.storage)
+            except (OSError, UnidentifiedImageError) as error:
+                self.stdout.write(self.style.WARNING(f'⚠️  {workshop.slug}: {error}'))
+                continue
+
+            # updated_at mee, zodat de catalogus fragmenten vernieuwd worden
+            Workshop.objects.filter(pk=workshop.pk).update(**values, updated_at=timezone.now())
+            processed += 1
+            original_bytes += len(content)
+            card_bytes += self.card_size(values['image_renditions'], workshop.image.storage)
+
+        if processed:
+            invalidate_page_cache()
+            self.stdout.write(
+                f'📉 Kaartafbeeldingen: {original_bytes // 1024} KB origineel -> '
+                f'{card_bytes // 1024} KB ({CARD_WIDTH}w, voorkeursformaat)'
+            )
+        self.stdout.write(self.style.SUCCESS(f'✅ Renditions gemaakt voor {processed} webinar(s)'))
+
+    def card_size(self, renditions, storage):
+        preferred = renditions[preferred_formats(renditions)[0]]
+        name = next((name for width, name in preferred if width >= CARD_WIDTH), preferred[-1][1])
+        return storage.size(name)
@@ -0,0 +1,92 @@
+"""
+Django Management Command om boekingen of nieuwsbriefinschrijvingen te exporteren
+
+Gebruikt dezelfde streaming export als de admin actie, dus constant
+geheugengebruik, ook voor tienduizenden rijen.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from workshops.exports import EXPORTS, WRITERS, export_chunks
+
+
+class Command(BaseCommand):
+    help = 'Exporteert boekingen of nieuwsbriefinschrijvingen naar CSV of XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'export',
+            choices=sorted(EXPORTS),
+            help='Wat exporteren: bookings of newsletter'
+        )
+        parser.add_argument(
+            '--columns',
+            type=str,
+            help='Komma-gescheiden kolommen (standaard: de basiskolommen). Gebruik --list-columns voor een overzicht'
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(WRITERS),
+            default='csv',
+            help='Bestandsformaat (standaard: csv)'
+        )
+        parser.add_argument(
+            '--output', '-o',
+            type=str,
+            help='Doelbestand (standaard: stdout, enkel voor csv)'
+        )
+        parser.add_argument(
+            '--active-only',
+            action='store_true',
+            help='Enkel actieve inschrijvingen (newsletter)'
+        )
+        parser.add_argument(
+            '--status',
+            type=str,
+            help='Enkel boekingen met deze status (bookings)'
+        )
+        parser.add_argument(
+            '--list-columns',
+            action='store_true',
+            help='Toon de beschikbare kolommen en stop'
+        )
+
+    def handle(self, *args, **options):
+        spec = EXPORTS[options['export']]
+
+        if options['list_columns']:
+            for key, column in spec.columns.items():
+                marker = '*' if key in spec.default_columns else ' '
+                self.stdout.write(f'{marker} {key:<24} {column.label}')
+            return
+
+        columns = spec.default_columns
+        if options.get('columns'):
+            columns = [key.strip() for key in options['columns'].split(',') if key.strip()]
+            unknown = [key for key in columns if key not in spec.columns]
+            if unknown:
+                raise CommandError(f'Onbekende kolom(men): {", ".join(unknown)}')
+
+        queryset = spec.model.objects.all()
+        field_names = {field.name for field in spec.model._meta.fields}
+        if options['active_only']:
+            if 'is_active' not in field_names:
+                raise CommandError('--active-only is enkel geldig voor newsletter')
+            queryset = queryset.filter(is_active=True)
+        if options.get('status'):
+            if 'status' not in field_names:
+                raise CommandError('--status is enkel geldig voor bookings')
+            queryset = queryset.filter(status=options['status'])
+
+        chunks = export_chunks(queryset, spec, columns, options['format'])
+        output = options.get('output')
+
+        if output:
+            with open(output, 'wb') as handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f'✅ Export geschreven naar {output}'))
+        elif options['format'] == 'csv':
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
+        else:
+            raise CommandError('Binaire formaten vereisen --output')
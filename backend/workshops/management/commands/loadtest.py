@@ -0,0 +1,159 @@
+"""
+Django Management Command voor een load test van de boekingsflow
+
+Voorbeeld:
+    python manage.py populate_data --scale 10
+    python manage.py loadtest --concurrency 20 --iterations 25 --output loadtest.json
+    python manage.py loadtest --output nieuw.json --compare loadtest.json
+
+Kost van het opzetten van connecties meten:
+    DB_CONN_MAX_AGE=0 python manage.py loadtest -c 20 -o zonder.json
+    DB_CONN_MAX_AGE=60 python manage.py loadtest -c 20 --compare zonder.json
+
+Tegen een draaiende server (bv. runserver vs. APP_SERVER=gunicorn):
+    python manage.py loadtest --base-url http://127.0.0.1:8000 -o runserver.json
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from workshops.loadtest import (
+    FUNNEL,
+    bookable_slugs,
+    cleanup_bookings,
+    compare_reports,
+    dump_report,
+    run_load_test,
+)
+
+
+class Command(BaseCommand):
+    help = 'Load test van catalogus -> detail -> boeking -> bevestiging met p50/p95/p99 per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', '-c',
+            type=int,
+            default=10,
+            help='Aantal gelijktijdige gebruikers (threads, standaard: 10)'
+        )
+        parser.add_argument(
+            '--iterations', '-n',
+            type=int,
+            default=10,
+            help='Aantal keer dat elke gebruiker de volledige flow doorloopt (standaard: 10)'
+        )
+        parser.add_argument(
+            '--webinars',
+            type=int,
+            default=50,
+            help='Verdeel de boekingen over maximaal zoveel boekbare webinars (standaard: 50)'
+        )
+        parser.add_argument(
+            '--slug',
+            action='append',
+            help='Gebruik enkel deze webinar(s); mag herhaald worden'
+        )
+        parser.add_argument(
+            '--participants',
+            type=int,
+            default=1,
+            help='Deelnemers per boeking (standaard: 1)'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=1,
+            help='Aantal niet gemeten opwarm-rondes (standaard: 1)'
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Test een draaiende server via HTTP i.p.v. in-process (zelfde database)'
+        )
+        parser.add_argument(
+            '--output', '-o',
+            type=str,
+            help='Schrijf het JSON rapport naar dit bestand'
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            help='Vergelijk met een eerder JSON rapport'
+        )
+        parser.add_argument(
+            '--keep-bookings',
+            action='store_true',
+            help='Laat de aangemaakte testboekingen staan'
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['iterations'] < 1:
+            raise CommandError('--concurrency en --iterations moeten minstens 1 zijn')
+
+        slugs = options.get('slug') or bookable_slugs(options['webinars'])
+        if not slugs:
+            raise CommandError('Geen boekbare webinars gevonden. Draai eerst populate_data.')
+
+        self.stdout.write(
+            f'🚀 Load test: {options["concurrency"]} gebruikers × {options["iterations"]} rondes '
+            f'over {len(slugs)} webinar(s)...'
+        )
+        try:
+            report = run_load_test(
+                concurrency=options['concurrency'],
+                iterations=options['iterations'],
+                slugs=slugs,
+                participants=options['participants'],
+                warmup=options['warmup'],
+                base_url=options.get('base_url'),
+            )
+        finally:
+            if not options['keep_bookings']:
+                deleted = cleanup_bookings()
+                self.stdout.write(f'🧹 {deleted} testboekingen opgeruimd')
+
+        self.write_summary(report)
+
+        if options.get('output'):
+            dump_report(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Rapport geschreven naar {options["output"]}'))
+
+        if options.get('compare'):
+            try:
+                with open(options['compare'], encoding='utf-8') as handle:
+                    previous = json.load(handle)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Kan {options["compare"]} niet lezen: {error}')
+            self.stdout.write('')
+            self.stdout.write(self.style.SUCCESS(f'📊 Vergelijking met {previous["meta"].get("revision") or options["compare"]}:'))
+            for line in compare_reports(previous, report):
+                self.stdout.write(f'  {line}')
+
+    def write_summary(self, report):
+        totals = report['totals']
+        self.stdout.write('')
+        self.stdout.write(f'  {"endpoint":<14}{"reqs":>7}{"p50":>9}{"p95":>9}{"p99":>9}{"req/s":>9}{"queries":>9}')
+        for endpoint in FUNNEL:
+            data = report['endpoints'].get(endpoint)
+            if not data:
+                continue
+            latency = data['latency_ms']
+            queries = f'{data["queries"]["mean"]:>9.1f}' if data['queries'] else f'{"-":>9}'
+            self.stdout.write(
+                f'  {endpoint:<14}{data["requests"]:>7}{latency["p50"]:>9.1f}{latency["p95"]:>9.1f}'
+                f'{latency["p99"]:>9.1f}{data["throughput_rps"]:>9.1f}{queries}'
+            )
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {totals["requests"]} requests in {totals["elapsed_s"]}s '
+            f'({totals["throughput_rps"]} req/s, {totals["funnels_completed"]} boekingen, '
+            f'{totals["funnels_per_s"]} flows/s)'
+        ))
+        meta = report['meta']
+        if totals['connections_opened'] is None:
+            return
+        reuse = 'pool' if meta['conn_pool'] else f'CONN_MAX_AGE={meta["conn_max_age"]}'
+        self.stdout.write(
+            f'🔌 {totals["connections_opened"]} database connecties geopend ({reuse}, '
+            f'{totals["requests_per_connection"]} requests per connectie)'
+        )
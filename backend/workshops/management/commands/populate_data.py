@@ -1,52 +1,117 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import connection, transaction
 from django.utils import timezone
 from datetime import timedelta, datetime
 from decimal import Decimal
 import random
 
+from workshops.cache import invalidate_page_cache
 from workshops.models import Category, Workshop, Booking, Review
+from workshops.seeding import batched, bulk_insert, bulk_upsert
+from workshops.stats import invalidate_site_stats
+
+
+# Synthetische data per extra --scale stap: een kopie van elke webinar
+# met zoveel boekingen. --scale 1000 geeft ~10k webinars en ~1M boekingen.
+BOOKINGS_PER_SYNTHETIC_WEBINAR = 100
+
+# Webinars per batch bij het genereren van synthetische data
+SYNTHETIC_WEBINAR_BATCH = 500
+
+REVIEWS_DATA = [
+    {'rating': 5, 'title': 'Zeer waardevolle online webinar!', 'comment': 'Christophe legt alles heel duidelijk uit en ik kan het direct toepassen in mijn werk. De online formule werkt perfect!'},
+    {'rating': 5, 'title': 'Precies wat ik nodig had', 'comment': 'Praktische voorbeelden en hands-on oefeningen. Kon vanuit mijn kantoor meedoen, super handig!'},
+    {'rating': 4, 'title': 'Goede online introductie', 'comment': 'Duidelijke uitleg via Teams, alleen had ik graag wat meer tijd gehad voor de oefeningen.'},
+    {'rating': 5, 'title': 'Top instructeur online!', 'comment': 'Laura kent haar vakgebied door en door. Veel geleerd over M365 Copilot via de webinar.'},
+    {'rating': 5, 'title': 'Zeer aan te raden online sessie', 'comment': 'Concrete tips die ik meteen kon gebruiken. Vanuit huis kunnen volgen is een groot pluspunt!'},
+    {'rating': 4, 'title': 'Interessante online workshop', 'comment': 'Goede inhoud, alleen het tempo was soms wat hoog. Maar de opname kon ik later terug bekijken.'},
+    {'rating': 5, 'title': 'Fantastische online opleiding', 'comment': 'Ik heb nu veel meer vertrouwen in het gebruik van AI tools. De interactie via Teams was uitstekend.'},
+    {'rating': 5, 'title': 'Absolute aanrader!', 'comment': 'De combinatie van theorie en praktijk was perfect. Online format spaart veel reistijd!'},
+    {'rating': 4, 'title': 'Prima webinar', 'comment': 'Nuttige informatie, zou graag een vervolg webinar willen volgen.'},
+    {'rating': 5, 'title': 'Erg leerzaam online', 'comment': 'Thomas geeft heel praktische voorbeelden en beantwoordt alle vragen uitgebreid via de chat.'},
+]
 
 
 class Command(BaseCommand):
     help = 'Vult de database met GenAI webinars voor Narhval Learning'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=1,
+            help='Genereer N× synthetische data voor load tests (1000 ≈ 10k webinars, 1M boekingen)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Seed voor de random generator, zodat herhaalde runs dezelfde data geven'
+        )
+        parser.add_argument(
+            '--flush',
+            action='store_true',
+            help='Verwijder eerst alle bestaande webinars, boekingen, reviews en gewone users'
+        )
+
+    def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('🚀 Start met GenAI webinars genereren...'))
+        self.random = random.Random(options['seed'])
+        scale = max(options['scale'], 1)
         
-        # Verwijder oude data
-        self.stdout.write('🗑️  Verwijderen oude data...')
-        Review.objects.all().delete()
-        Booking.objects.all().delete()
-        Workshop.objects.all().delete()
-        Category.objects.all().delete()
-        User.objects.filter(is_superuser=False).delete()
-        
-        # Maak categorieën
-        self.stdout.write('📁 Categorieën aanmaken...')
-        categories = self.create_categories()
-        
-        # Maak users
-        self.stdout.write('👥 Users aanmaken...')
-        users = self.create_users()
-        
-        # Maak webinars
-        self.stdout.write('🎓 Webinars aanmaken...')
-        webinars = self.create_webinars(categories)
+        if options['flush']:
+            # Verwijder oude data
+            self.stdout.write('🗑️  Verwijderen oude data...')
+            # TRUNCATE i.p.v. delete(): het post_delete signaal van Booking laat
+            # de ORM anders elke boeking apart inladen
+            tables = [model._meta.db_table for model in (Review, Booking, Workshop, Category)]
+            connection.ops.execute_sql_flush(
+                connection.ops.sql_flush(no_style(), tables, allow_cascade=True)
+            )
+            User.objects.filter(is_superuser=False).delete()
         
-        # Maak boekingen
-        self.stdout.write('📅 Boekingen aanmaken...')
-        bookings = self.create_bookings(webinars, users)
+        # Alles via bulk_create op unieke sleutels: opnieuw draaien is veilig
+        with transaction.atomic():
+            # Maak categorieën
+            self.stdout.write('📁 Categorieën aanmaken...')
+            categories = self.create_categories()
+            
+            # Maak users
+            self.stdout.write('👥 Users aanmaken...')
+            users = self.create_users()
+            
+            # Maak webinars
+            self.stdout.write('🎓 Webinars aanmaken...')
+            webinars = self.create_webinars(categories)
+            
+            # Maak boekingen
+            self.stdout.write('📅 Boekingen aanmaken...')
+            bookings = self.create_bookings(webinars, users)
+            
+            # Maak reviews
+            self.stdout.write('⭐ Reviews aanmaken...')
+            self.create_reviews(webinars, users, bookings)
+            
+            if scale > 1:
+                self.stdout.write(f'📈 Synthetische data aanmaken (scale {scale})...')
+                self.create_synthetic(webinars, scale)
+            
+            # bulk_create slaat save() en signalen over: tellers en zoekindex in bulk
+            self.stdout.write('🔄 Plaatsentellers en zoekindex herberekenen...')
+            Workshop.objects.all().refresh_capacity()
+            Workshop.objects.all().update_search_vector()
         
-        # Maak reviews
-        self.stdout.write('⭐ Reviews aanmaken...')
-        self.create_reviews(webinars, users, bookings)
+        invalidate_site_stats()
+        invalidate_page_cache()
         
         self.stdout.write(self.style.SUCCESS('\n✅ Klaar! GenAI webinars succesvol aangemaakt!'))
-        self.stdout.write(self.style.SUCCESS(f'   📊 {len(categories)} categorieën'))
-        self.stdout.write(self.style.SUCCESS(f'   🎓 {len(webinars)} webinars'))
-        self.stdout.write(self.style.SUCCESS(f'   👥 {len(users)} users'))
-        self.stdout.write(self.style.SUCCESS(f'   📅 {len(bookings)} boekingen'))
+        self.stdout.write(self.style.SUCCESS(f'   📊 {Category.objects.count()} categorieën'))
+        self.stdout.write(self.style.SUCCESS(f'   🎓 {Workshop.objects.count()} webinars'))
+        self.stdout.write(self.style.SUCCESS(f'   👥 {User.objects.filter(is_superuser=False).count()} users'))
+        self.stdout.write(self.style.SUCCESS(f'   📅 {Booking.objects.count()} boekingen'))
         self.stdout.write(self.style.SUCCESS(f'   ⭐ {Review.objects.count()} reviews'))
         self.stdout.write(self.style.SUCCESS('\n🎨 Ga naar http://localhost:8000/admin/ om alles te bekijken!'))
 
@@ -96,13 +161,13 @@ class Command(BaseCommand):
             },
         ]
         
-        categories = []
-        for cat_data in categories_data:
-            category, created = Category.objects.get_or_create(**cat_data)
-            categories.append(category)
-            if created:
-                self.stdout.write(f'   ✅ {category.name}')
-        
+        categories = bulk_upsert(
+            Category,
+            [Category(**cat_data) for cat_data in categories_data],
+            unique_fields=['slug'],
+            update_fields=['name', 'description', 'icon'],
+        )
+        self.stdout.write(f'   ✅ {len(categories)} categorieën')
         return categories
 
     def create_users(self):
@@ -115,32 +180,21 @@ class Command(BaseCommand):
             {'username': 'nina', 'first_name': 'Nina', 'last_name': 'Van Damme', 'email': 'nina@bedrijf.be'},
         ]
         
-        users = []
-        for user_data in users_data:
-            user, created = User.objects.get_or_create(
-                username=user_data['username'],
-                defaults={
-                    'first_name': user_data['first_name'],
-                    'last_name': user_data['last_name'],
-                    'email': user_data['email']
-                }
-            )
-            if created:
-                user.set_password('testpass123')
-                user.save()
-                self.stdout.write(f'   ✅ {user.get_full_name()}')
-            users.append(user)
-        
+        # Eén hash voor alle testusers: PBKDF2 per user kost honderden ms
+        password = make_password('testpass123')
+        bulk_insert(User, [User(password=password, **user_data) for user_data in users_data])
+        users = list(User.objects.filter(username__in=[u['username'] for u in users_data]).order_by('pk'))
+        self.stdout.write(f'   ✅ {len(users)} users')
         return users
     
     def generate_teams_url(self):
         """Genereer een realistische Teams meeting URL"""
-        meeting_code = f"{''.join([str(random.randint(0, 9)) for _ in range(19)])}"
+        meeting_code = f"{''.join([str(self.random.randint(0, 9)) for _ in range(19)])}"
         return f"https://teams.microsoft.com/l/meetup-join/19%3ameeting_{meeting_code}%40thread.v2/0"
     
     def generate_meeting_id(self):
         """Genereer een meeting ID"""
-        return f"{random.randint(100, 999)} {random.randint(100, 999)} {random.randint(100, 999)}"
+        return f"{self.random.randint(100, 999)} {self.random.randint(100, 999)} {self.random.randint(100, 999)}"
 
     def create_webinars(self, categories):
         now = timezone.now()
@@ -331,7 +385,10 @@ class Command(BaseCommand):
             },
         ]
         
-        webinars = []
+        # De eerste 4 webinars worden als afgelopen gemarkeerd (zie create_bookings)
+        for ws_data in webinars_data[:4]:
+            ws_data['status'] = 'completed'
+        
         for ws_data in webinars_data:
             # Calculate end datetime
             start = ws_data['start_datetime']
@@ -342,120 +399,186 @@ class Command(BaseCommand):
             ws_data['end_datetime'] = end
             ws_data['meeting_url'] = self.generate_teams_url()
             ws_data['meeting_id'] = self.generate_meeting_id()
-            ws_data['meeting_password'] = f"WB{random.randint(1000, 9999)}"
+            ws_data['meeting_password'] = f"WB{self.random.randint(1000, 9999)}"
             ws_data['is_active'] = True
-            
-            # Create webinar
-            webinar, created = Workshop.objects.get_or_create(
-                slug=ws_data['slug'],
-                defaults=ws_data
-            )
-            webinars.append(webinar)
-            if created:
-                self.stdout.write(f'   ✅ {webinar.title}')
         
+        # Bestaande webinars (zelfde slug) worden bijgewerkt
+        update_fields = sorted({key for ws_data in webinars_data for key in ws_data} - {'slug'})
+        webinars = bulk_upsert(
+            Workshop,
+            [Workshop(**ws_data) for ws_data in webinars_data],
+            unique_fields=['slug'],
+            update_fields=update_fields,
+        )
+        self.stdout.write(f'   ✅ {len(webinars)} webinars')
         return webinars
 
+    def booking(self, webinar, reference, user=None, **fields):
+        """Boeking zonder save(): prijs en referentie worden hier ingevuld"""
+        return Booking(
+            workshop=webinar,
+            user=user,
+            booking_reference=reference,
+            number_of_participants=1,
+            first_name=user.first_name if user else 'Test',
+            last_name=user.last_name if user else f'Deelnemer {reference[-6:]}',
+            email=user.email if user else f'{reference.lower()}@example.com',
+            phone=f'+32 47{self.random.randint(1000000, 9999999)}',
+            total_price=webinar.price,
+            **fields
+        )
+
     def create_bookings(self, webinars, users):
         """Maak realistische boekingen voor de webinars"""
         bookings = []
         
-        # Voor de eerste 4 webinars (die in het verleden liggen), maak completed bookings
+        # Voor de eerste 4 webinars (afgelopen), maak completed bookings
         past_webinars = webinars[:4]
-        for webinar in past_webinars:
-            # Maak deze webinars "completed"
-            webinar.status = 'completed'
-            webinar.save()
-            
+        for w, webinar in enumerate(past_webinars):
             # 8-15 deelnemers per webinar (meer omdat het online is)
-            num_bookings = random.randint(8, 15)
+            num_bookings = self.random.randint(8, 15)
             for i in range(num_bookings):
-                user = random.choice(users)
-                booking = Booking.objects.create(
-                    workshop=webinar,
-                    user=user,
-                    number_of_participants=1,
-                    first_name=user.first_name,
-                    last_name=user.last_name,
-                    email=user.email,
-                    phone=f'+32 47{random.randint(1000000, 9999999)}',
-                    total_price=webinar.price,
+                bookings.append(self.booking(
+                    webinar,
+                    f'WBD{w:03d}{i:03d}',
+                    user=self.random.choice(users),
                     payment_status='paid',
-                    status='completed'
-                )
-                bookings.append(booking)
+                    status='completed',
+                ))
         
         # Voor de upcoming webinars, maak enkele confirmed bookings
         upcoming_webinars = webinars[4:]
-        for webinar in upcoming_webinars:
-            num_bookings = random.randint(3, 8)
+        for w, webinar in enumerate(upcoming_webinars, start=len(past_webinars)):
+            num_bookings = self.random.randint(3, 8)
             for i in range(num_bookings):
-                user = random.choice(users)
-                booking = Booking.objects.create(
-                    workshop=webinar,
-                    user=user,
-                    number_of_participants=1,
-                    first_name=user.first_name,
-                    last_name=user.last_name,
-                    email=user.email,
-                    phone=f'+32 47{random.randint(1000000, 9999999)}',
-                    total_price=webinar.price,
-                    payment_status=random.choice(['paid', 'paid', 'unpaid']),
-                    status=random.choice(['confirmed', 'confirmed', 'pending'])
-                )
-                bookings.append(booking)
+                bookings.append(self.booking(
+                    webinar,
+                    f'WBD{w:03d}{i:03d}',
+                    user=self.random.choice(users),
+                    payment_status=self.random.choice(['paid', 'paid', 'unpaid']),
+                    status=self.random.choice(['confirmed', 'confirmed', 'pending']),
+                ))
         
+        # Vaste referenties: bij een tweede run worden bestaande boekingen overgeslagen
+        bulk_insert(Booking, bookings)
         self.stdout.write(f'   ✅ {len(bookings)} boekingen aangemaakt')
         return bookings
 
-    def create_reviews(self, webinars, users, bookings):
-        """Maak reviews voor afgelopen webinars"""
-        completed_bookings = [b for b in bookings if b.status == 'completed']
+    def create_synthetic(self, webinars, scale):
+        """
+        (scale - 1) kopieën van elke webinar, elk met
+        BOOKINGS_PER_SYNTHETIC_WEBINAR gastboekingen. Alles in batches,
+        dus het geheugengebruik hangt niet af van de scale.
+        """
+        copies = (
+            (copy, webinar)
+            for copy in range(1, scale)
+            for webinar in webinars
+        )
+        total_webinars = total_bookings = 0
         
-        reviews_data = [
-            {'rating': 5, 'title': 'Zeer waardevolle online webinar!', 'comment': 'Christophe legt alles heel duidelijk uit en ik kan het direct toepassen in mijn werk. De online formule werkt perfect!'},
-            {'rating': 5, 'title': 'Precies wat ik nodig had', 'comment': 'Praktische voorbeelden en hands-on oefeningen. Kon vanuit mijn kantoor meedoen, super handig!'},
-            {'rating': 4, 'title': 'Goede online introductie', 'comment': 'Duidelijke uitleg via Teams, alleen had ik graag wat meer tijd gehad voor de oefeningen.'},
-            {'rating': 5, 'title': 'Top instructeur online!', 'comment': 'Laura kent haar vakgebied door en door. Veel geleerd over M365 Copilot via de webinar.'},
-            {'rating': 5, 'title': 'Zeer aan te raden online sessie', 'comment': 'Concrete tips die ik meteen kon gebruiken. Vanuit huis kunnen volgen is een groot pluspunt!'},
-            {'rating': 4, 'title': 'Interessante online workshop', 'comment': 'Goede inhoud, alleen het tempo was soms wat hoog. Maar de opname kon ik later terug bekijken.'},
-            {'rating': 5, 'title': 'Fantastische online opleiding', 'comment': 'Ik heb nu veel meer vertrouwen in het gebruik van AI tools. De interactie via Teams was uitstekend.'},
-            {'rating': 5, 'title': 'Absolute aanrader!', 'comment': 'De combinatie van theorie en praktijk was perfect. Online format spaart veel reistijd!'},
-            {'rating': 4, 'title': 'Prima webinar', 'comment': 'Nuttige informatie, zou graag een vervolg webinar willen volgen.'},
-            {'rating': 5, 'title': 'Erg leerzaam online', 'comment': 'Thomas geeft heel praktische voorbeelden en beantwoordt alle vragen uitgebreid via de chat.'},
-        ]
+        for batch in batched(copies, SYNTHETIC_WEBINAR_BATCH):
+            synthetic = bulk_upsert(
+                Workshop,
+                [self.synthetic_webinar(webinar, copy) for copy, webinar in batch],
+                unique_fields=['slug'],
+                update_fields=['start_datetime', 'end_datetime', 'status'],
+            )
+            total_bookings += self.insert_synthetic_bookings([webinar.pk for webinar in synthetic])
+            total_webinars += len(synthetic)
+            self.stdout.write(f'   … {total_webinars} webinars, {total_bookings} boekingen')
         
-        # Track welke combinaties we al hebben gebruikt (webinar + user)
-        created_reviews = set()
+        self.stdout.write(f'   ✅ {total_webinars} synthetische webinars, {total_bookings} boekingen')
+
+    def insert_synthetic_bookings(self, webinar_ids):
+        """
+        Gastboekingen die PostgreSQL zelf genereert (INSERT ... SELECT met
+        generate_series). Zelfs bulk_create kost ~0.3 ms per rij aan SQL
+        compilatie in Python; dit blijft bij een miljoen boekingen in seconden.
+        Vaste referenties + ON CONFLICT DO NOTHING houden het idempotent.
+        """
+        values = {
+            'workshop': 'w.id',
+            'user': 'NULL',
+            'number_of_participants': '1',
+            'first_name': "'Test'",
+            'last_name': "'Deelnemer ' || i",
+            'email': "'wbs' || w.id || '-' || i || '@example.com'",
+            'phone': "'+32 47' || lpad((w.id * 1000 + i)::text, 7, '0')",
+            'participants_details': 'NULL',
+            'total_price': 'w.price',
+            'payment_status': "CASE WHEN i %% 2 = 0 THEN 'paid' ELSE 'unpaid' END",
+            'status': "(ARRAY['confirmed', 'confirmed', 'pending', 'cancelled'])[i %% 4 + 1]",
+            'notes': "''",
+            'dietary_requirements': "''",
+            'booking_reference': "'WBS' || lpad(w.id::text, 8, '0') || lpad(i::text, 3, '0')",
+            'created_at': 'now()',
+            'updated_at': 'now()',
+            'confirmed_at': 'CASE WHEN i %% 4 < 2 THEN now() END',
+            'cancelled_at': 'CASE WHEN i %% 4 = 3 THEN now() END',
+        }
+        booking_fields = {f.name: f.column for f in Booking._meta.concrete_fields if not f.primary_key}
+        if set(values) != set(booking_fields):
+            raise CommandError('Booking velden gewijzigd: pas insert_synthetic_bookings aan')
         
-        # Maak 8-10 reviews voor random completed bookings
-        num_reviews = min(len(completed_bookings), 10)
-        attempts = 0
-        max_attempts = num_reviews * 3  # Probeer maximaal 3x zoveel keer
+        sql = (
+            f'INSERT INTO {Booking._meta.db_table} '
+            f'({", ".join(booking_fields[name] for name in values)}) '
+            f'SELECT {", ".join(values.values())} '
+            f'FROM {Workshop._meta.db_table} w CROSS JOIN generate_series(0, %s - 1) AS i '
+            f'WHERE w.id = ANY(%s) '
+            f'ON CONFLICT (booking_reference) DO NOTHING'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [BOOKINGS_PER_SYNTHETIC_WEBINAR, list(webinar_ids)])
+        return len(webinar_ids) * BOOKINGS_PER_SYNTHETIC_WEBINAR
+
+    def synthetic_webinar(self, source, copy):
+        start = source.start_datetime + timedelta(days=copy)
+        return Workshop(
+            title=f'{source.title} #{copy}',
+            slug=f'{source.slug}-{copy:05d}',
+            description=source.description,
+            short_description=source.short_description,
+            category_id=source.category_id,
+            start_datetime=start,
+            end_datetime=start + (source.end_datetime - source.start_datetime),
+            duration_hours=source.duration_hours,
+            max_participants=500,
+            min_participants=source.min_participants,
+            price=source.price,
+            instructor_name=source.instructor_name,
+            instructor_bio=source.instructor_bio,
+            status='upcoming',
+            is_active=True,
+        )
+
+    def create_reviews(self, webinars, users, bookings):
+        """Maak reviews voor afgelopen webinars"""
+        completed_bookings = list(
+            Booking.objects
+            .filter(workshop__in=webinars, status='completed', user__isnull=False)
+            .order_by('booking_reference')
+        )
         
-        while len(created_reviews) < num_reviews and attempts < max_attempts:
-            attempts += 1
-            booking = random.choice(completed_bookings)
-            
-            # Check of we al een review hebben voor deze webinar + user combinatie
-            review_key = (booking.workshop.id, booking.user.id)
-            if review_key in created_reviews:
-                continue
-            
-            # Check of er al een review bestaat in de database
-            if Review.objects.filter(workshop=booking.workshop, user=booking.user).exists():
+        # Maak tot 10 reviews voor random completed bookings, één per webinar + user
+        reviews = {}
+        num_reviews = min(len(completed_bookings), 10)
+        for booking in self.random.sample(completed_bookings, len(completed_bookings)):
+            if len(reviews) >= num_reviews:
+                break
+            review_key = (booking.workshop_id, booking.user_id)
+            if review_key in reviews:
                 continue
-            
-            review_data = random.choice(reviews_data)
-            Review.objects.create(
-                workshop=booking.workshop,
+            review_data = self.random.choice(REVIEWS_DATA)
+            reviews[review_key] = Review(
+                workshop_id=booking.workshop_id,
                 booking=booking,
-                user=booking.user,
-                rating=review_data['rating'],
-                title=review_data['title'],
-                comment=review_data['comment'],
-                is_approved=True
+                user_id=booking.user_id,
+                is_approved=True,
+                **review_data
             )
-            created_reviews.add(review_key)
         
+        # unique_together (workshop, user): bestaande reviews blijven staan
+        bulk_insert(Review, reviews.values())
         self.stdout.write(f'   ✅ {Review.objects.count()} reviews aangemaakt')
@@ -2,13 +2,37 @@
 Django Management Command om test nieuwsbrief subscribers aan te maken
 """
 from django.core.management.base import BaseCommand
-from workshops.models import NewsletterSubscriber
+from workshops.models import Category, NewsletterSubscriber
+from workshops.seeding import bulk_insert
+from workshops.segments import invalidate_segment_counts
+
+
+# Synthetische subscribers per --scale stap (1000 ≈ 100k subscribers)
+SUBSCRIBERS_PER_SCALE = 100
+
+
+def interests_for(n, category_ids):
+    """Eén of twee categorieën per subscriber, deterministisch verspreid"""
+    if not category_ids:
+        return None
+    interests = {category_ids[n % len(category_ids)]}
+    if n % 3 == 0:
+        interests.add(category_ids[(n * 7 + 3) % len(category_ids)])
+    return sorted(interests)
 
 
 class Command(BaseCommand):
     help = 'Voegt test nieuwsbrief subscribers toe aan de database'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=1,
+            help=f'Voeg ook (N-1)×{SUBSCRIBERS_PER_SCALE} synthetische subscribers toe voor load tests'
+        )
+
+    def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('🚀 Start met aanmaken test nieuwsbrief subscribers...'))
 
         # Test subscribers data
@@ -71,32 +95,38 @@ class Command(BaseCommand):
             },
         ]
 
-        created_count = 0
-        existing_count = 0
-
-        for data in subscribers_data:
-            subscriber, created = NewsletterSubscriber.objects.get_or_create(
+        # Eén INSERT ... ON CONFLICT DO NOTHING: bestaande adressen blijven ongewijzigd
+        before = NewsletterSubscriber.objects.count()
+        category_ids = list(Category.objects.order_by('pk').values_list('pk', flat=True))
+        bulk_insert(NewsletterSubscriber, (
+            NewsletterSubscriber(
                 email=data['email'],
-                defaults={
-                    'first_name': data['first_name'],
-                    'last_name': data.get('last_name', ''),
-                    'is_active': data.get('is_active', True),
-                    'confirmed': data.get('confirmed', True),
-                }
+                first_name=data['first_name'],
+                last_name=data.get('last_name', ''),
+                is_active=data.get('is_active', True),
+                confirmed=data.get('confirmed', True),
+                interests=interests_for(n, category_ids),
             )
-
-            if created:
-                created_count += 1
-                status = "✓ Actief" if subscriber.is_active else "✗ Inactief"
-                confirmed = "✓ Bevestigd" if subscriber.confirmed else "⏳ Niet bevestigd"
-                self.stdout.write(
-                    f'  ✅ {subscriber.email} - {status} - {confirmed}'
-                )
-            else:
-                existing_count += 1
-                self.stdout.write(
-                    f'  ⚠️  {subscriber.email} - Bestaat al'
+            for n, data in enumerate(subscribers_data)
+        ))
+        
+        scale = max(options['scale'], 1)
+        if scale > 1:
+            bulk_insert(NewsletterSubscriber, (
+                NewsletterSubscriber(
+                    email=f'lid{n:07d}@example.com',
+                    first_name=f'Lid {n}',
+                    is_active=n % 10 != 0,  # 10% uitgeschreven
+                    confirmed=n % 4 != 0,
+                    interests=interests_for(n, category_ids),
                 )
+                for n in range((scale - 1) * SUBSCRIBERS_PER_SCALE)
+            ))
+        
+        # bulk_create stuurt geen signals
+        invalidate_segment_counts()
+        created_count = NewsletterSubscriber.objects.count() - before
+        existing_count = len(subscribers_data) + (scale - 1) * SUBSCRIBERS_PER_SCALE - created_count
 
         self.stdout.write('')
         self.stdout.write(self.style.SUCCESS(f'✅ {created_count} nieuwsbrief subscribers aangemaakt'))
@@ -0,0 +1,64 @@
+"""
+Django Management Command: worker voor de e-mail outbox
+
+Verstuurt wachtende OutboxMessages per batch over één SMTP connectie en
+wacht daarna --interval seconden op nieuw werk. Meerdere workers naast
+elkaar kan (SKIP LOCKED); zie workshops/outbox.py.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from workshops import outbox
+
+
+class Command(BaseCommand):
+    help = 'Verstuurt de wachtende e-mails uit de outbox (met retry en backoff)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Eén keer leegmaken en stoppen (bv. vanuit cron)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconden wachten wanneer de outbox leeg is (standaard: 5)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Berichten per batch/transactie (standaard: OUTBOX_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            help='Pogingen voor een bericht als mislukt geldt (standaard: OUTBOX_MAX_ATTEMPTS)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                self.drain(options)
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                # Lang draaiend proces: verlopen of verbroken DB connecties opruimen
+                close_old_connections()
+        except KeyboardInterrupt:
+            self.stdout.write('\n🛑 Worker gestopt')
+
+    def drain(self, options):
+        try:
+            sent, failed = outbox.drain(options['batch_size'], options['max_attempts'])
+        except OSError as error:
+            # SMTP server onbereikbaar: berichten blijven wachten
+            self.stderr.write(self.style.WARNING(f'⚠️  Geen verbinding met de mailserver: {error}'))
+            return
+        if sent or failed:
+            self.stdout.write(
+                f'📧 {sent} verzonden' + (self.style.WARNING(f', {failed} mislukt') if failed else '')
+            )
@@ -0,0 +1,69 @@
+"""
+Django Management Command om het slow/duplicate query log samen te vatten
+
+Leest de JSON meldingen van workshops.querylog (QUERY_LOG_FILE of stdin)
+en toont per view en herkomst de queries met de meeste totale tijd.
+"""
+import json
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from workshops.querylog import summarize
+
+
+class Command(BaseCommand):
+    help = 'Vat het query log samen (trage, dubbele en N+1 queries)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'logfile',
+            nargs='?',
+            help='Logbestand (standaard: QUERY_LOG_FILE, "-" voor stdin)'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Aantal regels in het rapport (standaard: 20)'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Schrijf het rapport als JSON'
+        )
+
+    def handle(self, *args, **options):
+        path = options.get('logfile') or settings.QUERY_LOG_FILE
+        if not path:
+            raise CommandError('Geef een logbestand op of stel QUERY_LOG_FILE in')
+
+        if path == '-':
+            groups = summarize(sys.stdin)
+        else:
+            try:
+                with open(path, encoding='utf-8') as handle:
+                    groups = summarize(handle)
+            except OSError as error:
+                raise CommandError(f'Kan {path} niet lezen: {error}')
+
+        groups = groups[:options['limit']]
+        if options['json']:
+            self.stdout.write(json.dumps(groups, indent=2, sort_keys=True))
+            return
+
+        if not groups:
+            self.stdout.write(self.style.SUCCESS('✅ Geen trage of herhaalde queries gevonden'))
+            return
+
+        for group in groups:
+            where = group['origin'] or '?'
+            if group['template']:
+                where += f' (template {group["template"]})'
+            self.stdout.write(self.style.WARNING(
+                f'{group["event"]:<16} {group["total_ms"]:>9.1f} ms  '
+                f'{group["occurrences"]}× in {group["view"]}, {group["queries"]} queries'
+            ))
+            self.stdout.write(f'    {where}')
+            self.stdout.write(f'    {group["sql"][:200]}')
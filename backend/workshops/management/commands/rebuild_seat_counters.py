@@ -0,0 +1,30 @@
+"""
+Django Management Command om de confirmed_seats tellers te herbouwen
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from workshops.models import Workshop
+
+
+class Command(BaseCommand):
+    help = 'Herberekent Workshop.confirmed_seats vanuit de bevestigde boekingen'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--slug',
+            type=str,
+            help='Herbouw enkel de teller van deze webinar'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Workshop.objects.all()
+        if options.get('slug'):
+            queryset = queryset.filter(slug=options['slug'])
+
+        with transaction.atomic():
+            updated = queryset.rebuild_confirmed_seats()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Plaatsentellers herbouwd voor {updated} webinar(s)')
+        )
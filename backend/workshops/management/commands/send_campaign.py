@@ -0,0 +1,94 @@
+"""
+Django Management Command om een nieuwsbrief campagne te versturen
+
+Een onderbroken verzending (Ctrl+C, crash, deploy) hervat door hetzelfde
+command opnieuw te draaien; zie workshops/campaigns.py.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from workshops import campaigns
+from workshops.models import NewsletterCampaign
+
+
+# Voortgang tonen na elke zoveel verwerkte ontvangers
+PROGRESS_EVERY = 5000
+
+
+class Command(BaseCommand):
+    help = 'Verstuurt een nieuwsbrief campagne naar alle actieve, bevestigde subscribers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign', type=int, help='Id van de campagne')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Ontvangers per batch/checkpoint (standaard: NEWSLETTER_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help='Maximum berichten per seconde, 0 = onbeperkt (standaard: NEWSLETTER_RATE_LIMIT)'
+        )
+        parser.add_argument(
+            '--connections',
+            type=int,
+            help='Aantal SMTP connecties in parallel (standaard: NEWSLETTER_SMTP_CONNECTIONS)'
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Verstuur enkel de mislukte afleveringen opnieuw'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            campaign = NewsletterCampaign.objects.get(pk=options['campaign'])
+        except NewsletterCampaign.DoesNotExist:
+            raise CommandError(f"Campagne {options['campaign']} bestaat niet")
+
+        settings = {
+            'size': options['batch_size'],
+            'rate': options['rate'],
+            'connections': options['connections'],
+            'progress': self.progress,
+        }
+        self.reported = campaign.sent_count + campaign.failed_count
+        started = time.perf_counter()
+        before = self.reported
+
+        if options['retry_failed']:
+            self.stdout.write(f'🔁 Mislukte afleveringen van "{campaign}" opnieuw versturen...')
+            campaigns.retry_failed(campaign, **settings)
+        elif campaign.status == 'sent':
+            raise CommandError(f'Campagne "{campaign}" is al verzonden (gebruik --retry-failed)')
+        else:
+            if campaign.status == 'sending':
+                self.stdout.write(
+                    f'⏯️  "{campaign}" hervatten na subscriber {campaign.last_subscriber_id} '
+                    f'({campaign.sent_count} al verzonden)'
+                )
+            else:
+                self.stdout.write(f'🚀 "{campaign}" versturen...')
+            try:
+                campaigns.send_campaign(campaign, **settings)
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING(
+                    f'\n🛑 Onderbroken na subscriber {campaign.last_subscriber_id}; '
+                    f'opnieuw draaien om te hervatten'
+                ))
+                return
+
+        elapsed = time.perf_counter() - started
+        processed = campaign.sent_count + campaign.failed_count - before
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {campaign.sent_count} verzonden, {campaign.failed_count} mislukt'
+            + (f' ({processed / elapsed:.0f} berichten/s)' if processed and elapsed else '')
+        ))
+
+    def progress(self, campaign):
+        done = campaign.sent_count + campaign.failed_count
+        if done - self.reported >= PROGRESS_EVERY:
+            self.reported = done
+            self.stdout.write(f'📧 {campaign.sent_count} verzonden, {campaign.failed_count} mislukt')
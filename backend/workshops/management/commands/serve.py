@@ -0,0 +1,72 @@
+"""
+Django Management Command om de app server te starten
+
+APP_SERVER (settings / .env) kiest de server, bv. `APP_SERVER=gunicorn
+python manage.py serve`:
+    runserver  ontwikkelserver met autoreload (standaard)
+    gunicorn   productie: collectstatic en gunicorn met meerdere workers,
+               zie config/gunicorn.conf.py
+"""
+import os
+import runpy
+import sys
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+
+APP_SERVERS = ('runserver', 'gunicorn')
+
+
+class Command(BaseCommand):
+    help = 'Start runserver of gunicorn, volgens APP_SERVER'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bind', '-b',
+            help='Adres en poort (standaard: 0.0.0.0:8000 of GUNICORN_BIND)'
+        )
+        parser.add_argument(
+            '--workers', '-w',
+            type=int,
+            help='Aantal gunicorn workers (standaard: WEB_CONCURRENCY of 2 × kernen + 1)'
+        )
+        parser.add_argument(
+            '--skip-collectstatic',
+            action='store_true',
+            help='Sla collectstatic over (gunicorn)'
+        )
+
+    def handle(self, *args, **options):
+        # Eén bron van waarheid: ook STORAGES hangt af van APP_SERVER
+        server = settings.APP_SERVER
+        if server not in APP_SERVERS:
+            raise CommandError(f'Onbekende APP_SERVER {server!r}, kies uit: {", ".join(APP_SERVERS)}')
+
+        if server == 'runserver':
+            call_command('runserver', options.get('bind') or '0.0.0.0:8000')
+            return
+
+        # Vóór collectstatic: meerdere workers vereisen een gedeelde cache
+        gunicorn_conf = settings.BASE_DIR / 'config' / 'gunicorn.conf.py'
+        conf = runpy.run_path(str(gunicorn_conf))
+        conf['check_shared_cache'](options.get('workers') or conf['workers'])
+
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING('⚠️  gunicorn met DEBUG=True: zet DEBUG=False in productie'))
+        if not options['skip_collectstatic']:
+            call_command('collectstatic', interactive=False, verbosity=0)
+            self.stdout.write(self.style.SUCCESS('✅ Statische bestanden verzameld en gecomprimeerd'))
+
+        command = [
+            sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+            '--config', str(gunicorn_conf),
+        ]
+        if options.get('bind'):
+            command += ['--bind', options['bind']]
+        if options.get('workers'):
+            command += ['--workers', str(options['workers'])]
+        self.stdout.write(f'🚀 {" ".join(command[2:])}')
+        sys.stdout.flush()
+        os.execv(sys.executable, command)
@@ -0,0 +1,41 @@
+# Generated manually for denormalized seat counter
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_confirmed_seats(apps, schema_editor):
+    """Vul de teller met de huidige bevestigde boekingen"""
+    Workshop = apps.get_model('workshops', 'Workshop')
+    Booking = apps.get_model('workshops', 'Booking')
+
+    confirmed = (
+        Booking.objects
+        .filter(workshop=OuterRef('pk'), status='confirmed')
+        .order_by()
+        .values('workshop')
+        .annotate(total=Sum('number_of_participants'))
+        .values('total')
+    )
+    Workshop.objects.update(confirmed_seats=Coalesce(Subquery(confirmed), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0007_simplify_inhouse_training_page'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workshop',
+            name='confirmed_seats',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                verbose_name='Bevestigde plaatsen'
+            ),
+        ),
+        migrations.RunPython(populate_confirmed_seats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated manually for full-text search
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import ProgrammingError, migrations, transaction
+
+
+def populate_search_vectors(apps, schema_editor):
+    """Vul de zoekindex voor bestaande webinars"""
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models import OuterRef, Subquery
+
+    Workshop = apps.get_model('workshops', 'Workshop')
+    Category = apps.get_model('workshops', 'Category')
+
+    category_name = Subquery(
+        Category.objects.filter(pk=OuterRef('category_id')).values('name')[:1]
+    )
+    Workshop.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='dutch')
+        + SearchVector('short_description', weight='B', config='dutch')
+        + SearchVector(category_name, weight='B', config='dutch')
+        + SearchVector('description', weight='C', config='dutch')
+    ))
+
+
+def enable_trigram_search(apps, schema_editor):
+    """
+    Activeer pg_trgm en een trigram index op de titel voor tikfouten.
+    Optioneel: zonder de extensie of zonder CREATE rechten (bijv. beperkte
+    managed database) valt het zoeken terug op enkel full-text.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    try:
+        # Savepoint: een geweigerde CREATE mag de migratie niet afbreken
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            schema_editor.execute(
+                'CREATE INDEX IF NOT EXISTS workshop_title_trgm '
+                'ON workshops_workshop USING gin (title gin_trgm_ops)'
+            )
+    except ProgrammingError:
+        return
+
+
+def disable_trigram_search(apps, schema_editor):
+    schema_editor.execute('DROP INDEX IF EXISTS workshop_title_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0008_workshop_confirmed_seats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workshop',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                null=True,
+                verbose_name='Zoekindex'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='workshop',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'],
+                name='workshop_search_vector_gin'
+            ),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+        migrations.RunPython(enable_trigram_search, disable_trigram_search),
+    ]
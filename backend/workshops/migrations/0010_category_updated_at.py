@@ -0,0 +1,24 @@
+# Generated manually for fragment cache versioning
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0009_workshop_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name='Geüpdatet op'
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-17 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0010_category_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['updated_at'], name='workshops_b_updated_7cae1b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['workshop', 'updated_at'], name='workshops_b_worksho_6cdf67_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['updated_at'], name='workshops_c_updated_4d45f4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['workshop', 'updated_at'], name='workshops_r_worksho_2d2c64_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workshop',
+            index=models.Index(fields=['updated_at'], name='workshops_w_updated_23e074_idx'),
+        ),
+    ]
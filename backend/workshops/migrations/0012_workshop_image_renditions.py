@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-17 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0011_conditional_get_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workshop',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Hoogte afbeelding'),
+        ),
+        migrations.AddField(
+            model_name='workshop',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Placeholder afbeelding'),
+        ),
+        migrations.AddField(
+            model_name='workshop',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Renditions'),
+        ),
+        migrations.AddField(
+            model_name='workshop',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Breedte afbeelding'),
+        ),
+    ]
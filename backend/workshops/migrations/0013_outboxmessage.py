@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-17 18:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0012_workshop_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='Soort')),
+                ('to', models.EmailField(max_length=254, verbose_name='Aan')),
+                ('subject', models.CharField(max_length=255, verbose_name='Onderwerp')),
+                ('body', models.TextField(verbose_name='Tekst')),
+                ('status', models.CharField(choices=[('pending', 'Wachtend'), ('sent', 'Verzonden'), ('failed', 'Mislukt')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Pogingen')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Versturen vanaf')),
+                ('last_error', models.TextField(blank=True, verbose_name='Laatste fout')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Aangemaakt op')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Verzonden op')),
+                ('booking', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_messages', to='workshops.booking', verbose_name='Boeking')),
+            ],
+            options={
+                'verbose_name': 'Uitgaande e-mail',
+                'verbose_name_plural': 'Uitgaande e-mails',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['available_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1 on 2026-10-17 18:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0013_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Naam')),
+                ('subject', models.CharField(max_length=255, verbose_name='Onderwerp')),
+                ('body', models.TextField(help_text='Merge velden: {{ first_name }}, {{ last_name }}, {{ name }}, {{ email }}', verbose_name='Tekst')),
+                ('status', models.CharField(choices=[('draft', 'Concept'), ('sending', 'Bezig met versturen'), ('sent', 'Verzonden')], default='draft', max_length=20, verbose_name='Status')),
+                ('last_subscriber_id', models.BigIntegerField(default=0, help_text='Hoogste subscriber id dat verwerkt is; een onderbroken verzending gaat hier verder', verbose_name='Checkpoint')),
+                ('sent_count', models.PositiveIntegerField(default=0, verbose_name='Verzonden')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Mislukt')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Aangemaakt op')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Gestart op')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Afgerond op')),
+            ],
+            options={
+                'verbose_name': 'Nieuwsbrief Campagne',
+                'verbose_name_plural': 'Nieuwsbrief Campagnes',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CampaignDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email adres')),
+                ('status', models.CharField(choices=[('sent', 'Verzonden'), ('failed', 'Mislukt')], max_length=20, verbose_name='Status')),
+                ('error', models.TextField(blank=True, verbose_name='Fout')),
+                ('attempts', models.PositiveIntegerField(default=1, verbose_name='Pogingen')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Geüpdatet op')),
+                ('subscriber', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='workshops.newslettersubscriber', verbose_name='Subscriber')),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='workshops.newslettercampaign', verbose_name='Campagne')),
+            ],
+            options={
+                'verbose_name': 'Campagne Aflevering',
+                'verbose_name_plural': 'Campagne Afleveringen',
+                'indexes': [models.Index(fields=['campaign', 'status'], name='workshops_c_campaig_8c2fd0_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'subscriber'), name='unique_campaign_delivery')],
+            },
+        ),
+    ]
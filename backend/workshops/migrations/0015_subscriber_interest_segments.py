@@ -0,0 +1,45 @@
+# Generated by Django 5.1 on 2026-10-17 18:37
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+def normalize_interests(apps, schema_editor):
+    """Interesses als lijst van category ids (vroeger vrije JSON: slugs of namen)"""
+    Category = apps.get_model('workshops', 'Category')
+    NewsletterSubscriber = apps.get_model('workshops', 'NewsletterSubscriber')
+    lookup = {}
+    for pk, slug, name in Category.objects.values_list('pk', 'slug', 'name'):
+        lookup.update({pk: pk, str(pk): pk, slug.lower(): pk, name.lower(): pk})
+
+    changed = []
+    for subscriber in NewsletterSubscriber.objects.exclude(interests=None).only('pk', 'interests').iterator():
+        values = subscriber.interests if isinstance(subscriber.interests, list) else [subscriber.interests]
+        ids = sorted({
+            lookup[key] for key in (value.lower() if isinstance(value, str) else value for value in values)
+            if isinstance(key, (int, str)) and key in lookup
+        })
+        if ids != subscriber.interests:
+            subscriber.interests = ids or None
+            changed.append(subscriber)
+    NewsletterSubscriber.objects.bulk_update(changed, ['interests'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0014_newsletter_campaigns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newslettercampaign',
+            name='categories',
+            field=models.ManyToManyField(blank=True, help_text='Enkel subscribers met interesse in één van deze categorieën; leeg = iedereen', related_name='campaigns', to='workshops.category', verbose_name='Segment'),
+        ),
+        migrations.RunPython(normalize_interests, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='newslettersubscriber',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['interests'], name='subscriber_interests_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-17 19:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0015_subscriber_interest_segments'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['updated_at'], name='workshops_r_updated_17b2c5_idx'),
+        ),
+    ]
@@ -1,8 +1,18 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+import uuid
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
-from django.db.models import Sum
+from django.utils.functional import cached_property
+from django.utils.safestring import mark_safe
+from django.db.models import Case, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import invalidate_page_cache
 
 
 class Category(models.Model):
@@ -17,16 +27,128 @@ class Category(models.Model):
         help_text='Bootstrap icon class (bijv. bi-cpu, bi-gear, bi-rocket). Zie https://icons.getbootstrap.com/'
     )
     created_at = models.DateTimeField('Aangemaakt op', auto_now_add=True)
+    # Versie voor fragment caching van webinar kaarten
+    updated_at = models.DateTimeField('Geüpdatet op', auto_now=True)
 
     class Meta:
         verbose_name = 'Categorie'
         verbose_name_plural = 'Categorieën'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return self.name
 
 
+# Boekingen met deze status houden plaatsen bezet: de enige definitie van
+# capaciteit, voor de catalogus, Workshop.save, refresh_capacity en
+# reservations.reserve_seats
+HOLDING_STATUSES = ('pending', 'confirmed')
+
+
+def held_seats_subquery():
+    """Bezette plaatsen (openstaand + bevestigd) van de webinar OuterRef('pk')"""
+    return Coalesce(Subquery(
+        Booking.objects
+        .filter(workshop=OuterRef('pk'))
+        .holding()
+        .order_by()
+        .values('workshop')
+        .annotate(total=Sum('number_of_participants'))
+        .values('total')
+    ), Value(0))
+
+
+class WorkshopQuerySet(models.QuerySet):
+    """Queryset helpers voor webinars"""
+
+    def visible(self):
+        """Actieve webinars die niet geannuleerd of afgelopen zijn"""
+        return self.filter(is_active=True).exclude(status__in=['cancelled', 'completed'])
+
+    def with_availability(self):
+        """
+        Annoteer bezette en resterende plaatsen in SQL (openstaande boekingen
+        tellen mee, zie HOLDING_STATUSES). Workshop.available_spots gebruikt
+        remaining_spots als die aanwezig is.
+        """
+        return self.annotate(
+            booked_seats=held_seats_subquery(),
+            remaining_spots=Greatest(F('max_participants') - F('booked_seats'), Value(0)),
+        )
+
+    def for_catalogue(self):
+        """Zichtbare webinars met categorie en beschikbaarheid voor lijstweergaves"""
+        return self.visible().select_related('category').with_availability()
+
+    def search(self, query):
+        """Full-text zoeken (Nederlandse stemming), annoteert search_rank"""
+        from .search import search_workshops
+        return search_workshops(self, query)
+
+    def update_search_vector(self):
+        """Herbereken search_vector in één UPDATE"""
+        from .search import workshop_search_vector
+        return self.update(search_vector=workshop_search_vector())
+
+    def adjust_confirmed_seats(self, delta):
+        """
+        Verhoog of verlaag de bevestigde plaatsen in één UPDATE (nooit onder 0).
+        updated_at gaat mee: de ETags (conditional.py) lezen enkel timestamps.
+        """
+        if not delta:
+            return 0
+        return self.update(
+            confirmed_seats=Greatest(F('confirmed_seats') + delta, Value(0)),
+            updated_at=timezone.now(),
+        )
+
+    def rebuild_confirmed_seats(self):
+        """Herbereken de bevestigde plaatsen vanuit de boekingen in één UPDATE"""
+        confirmed = (
+            Booking.objects
+            .filter(workshop=OuterRef('pk'), status='confirmed')
+            .order_by()
+            .values('workshop')
+            .annotate(total=Sum('number_of_participants'))
+            .values('total')
+        )
+        return self.update(
+            confirmed_seats=Coalesce(Subquery(confirmed), Value(0)),
+            updated_at=timezone.now(),
+        )
+
+    def refresh_capacity(self):
+        """
+        Herbereken bevestigde plaatsen én de 'full' status in één UPDATE.
+
+        Vol betekent: bezette plaatsen (held_seats_subquery) >= maximum.
+        Een volle webinar met terug vrije plaatsen wordt weer 'upcoming';
+        geannuleerde en afgelopen webinars blijven zo.
+        """
+        confirmed = Coalesce(Subquery(
+            Booking.objects
+            .filter(workshop=OuterRef('pk'), status='confirmed')
+            .order_by()
+            .values('workshop')
+            .annotate(total=Sum('number_of_participants'))
+            .values('total')
+        ), Value(0))
+        held = held_seats_subquery()
+        return self.update(
+            confirmed_seats=confirmed,
+            updated_at=timezone.now(),
+            status=Case(
+                When(status__in=['cancelled', 'completed'], then=F('status')),
+                When(max_participants__lte=held, then=Value('full')),
+                When(status='full', then=Value('upcoming')),
+                default=F('status'),
+            ),
+        )
+
+
 class Workshop(models.Model):
     """Webinar model voor alle online webinar informatie"""
     
@@ -38,6 +160,12 @@ class Workshop(models.Model):
         ('completed', 'Afgelopen'),
     ]
 
+    # Velden die in search_vector zitten
+    SEARCH_FIELDS = {'title', 'short_description', 'description', 'category'}
+
+    # Velden die images.apply_renditions() invult
+    RENDITION_FIELDS = {'image_width', 'image_height', 'image_placeholder', 'image_renditions'}
+
     # Basis informatie
     title = models.CharField('Titel', max_length=200)
     slug = models.SlugField('Slug', max_length=200, unique=True)
@@ -94,6 +222,13 @@ class Workshop(models.Model):
         default=1,
         validators=[MinValueValidator(1)]
     )
+    # Gedenormaliseerde teller, bijgehouden door Booking.save() en het
+    # post_delete signaal. Herbouwen: manage.py rebuild_seat_counters
+    confirmed_seats = models.PositiveIntegerField(
+        'Bevestigde plaatsen',
+        default=0,
+        editable=False
+    )
     
     # Prijzen
     price = models.DecimalField(
@@ -110,6 +245,11 @@ class Workshop(models.Model):
     
     # Media
     image = models.ImageField('Afbeelding', upload_to='workshops/', blank=True, null=True)
+    # Afgeleid van image bij het uploaden (zie images.py)
+    image_width = models.PositiveIntegerField('Breedte afbeelding', null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField('Hoogte afbeelding', null=True, blank=True, editable=False)
+    image_placeholder = models.TextField('Placeholder afbeelding', blank=True, editable=False)
+    image_renditions = models.JSONField('Renditions', default=dict, blank=True, editable=False)
     
     # Status en zichtbaarheid
     status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='upcoming')
@@ -124,6 +264,11 @@ class Workshop(models.Model):
     created_at = models.DateTimeField('Aangemaakt op', auto_now_add=True)
     updated_at = models.DateTimeField('Geüpdatet op', auto_now=True)
 
+    # Full-text zoekindex, bijgewerkt in save() (zie search.py)
+    search_vector = SearchVectorField('Zoekindex', null=True, editable=False)
+
+    objects = WorkshopQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Webinar'
         verbose_name_plural = 'Webinars'
@@ -132,6 +277,8 @@ class Workshop(models.Model):
             models.Index(fields=['start_datetime']),
             models.Index(fields=['status']),
             models.Index(fields=['is_active']),
+            models.Index(fields=['updated_at']),
+            GinIndex(fields=['search_vector'], name='workshop_search_vector_gin'),
         ]
 
     def __str__(self):
@@ -145,23 +292,25 @@ class Workshop(models.Model):
     def available_spots(self):
         """
         Aantal beschikbare plaatsen.
-        Werkt ook wanneer de instance nog niet is opgeslagen (pk is None).
+        Leest de remaining_spots annotatie (with_availability); zonder
+        annotatie kost het één query, zie held_seats.
         """
+        annotated = getattr(self, 'remaining_spots', None)
+        if annotated is not None:
+            return annotated
+
         total = self.max_participants or 0
-        
-        # Als de webinar nog geen PK heeft, kunnen we geen relaties opvragen
-        if not self.pk:
-            return total
-        
-        confirmed = (
-            self.bookings
-            .filter(status="confirmed")
-            .aggregate(total=Sum("number_of_participants"))
-            .get("total") or 0
-        )
-        
-        remaining = total - confirmed
-        return max(remaining, 0)
+        return max(total - self.held_seats, 0)
+
+    @property
+    def held_seats(self):
+        """Plaatsen bezet door openstaande en bevestigde boekingen"""
+        annotated = getattr(self, 'booked_seats', None)
+        if annotated is not None:
+            return annotated
+        if self.pk is None:
+            return 0
+        return Booking.objects.filter(workshop=self).held_seats()
 
     @property
     def is_full(self):
@@ -173,12 +322,101 @@ class Workshop(models.Model):
         """Check of webinar in de toekomst is"""
         return self.start_datetime > timezone.now()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Onthoud de geïndexeerde velden, zodat save() de zoekindex enkel
+        # bijwerkt als er één van wijzigt
+        if {'title', 'short_description', 'description', 'category_id'} <= set(field_names):
+            instance._stored_search_state = instance.search_state
+        return instance
+
+    @property
+    def search_state(self):
+        return self.title, self.short_description, self.description, self.category_id
+
     def save(self, *args, **kwargs):
         # Auto-update status als vol
         if self.is_full and self.status != 'full':
             self.status = 'full'
+
+        # Renditions voor een nieuwe upload (nog niet bewaard, zoals in
+        # FileField.pre_save) of opruimen als de afbeelding weg is
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'image' in update_fields:
+            if (self.image and not self.image._committed) or (not self.image and self.image_renditions):
+                from .images import apply_renditions
+                apply_renditions(self)
+                if update_fields is not None:
+                    kwargs['update_fields'] = update_fields = {*update_fields, *self.RENDITION_FIELDS}
+
         super().save(*args, **kwargs)
 
+        # Zoekindex bijwerken (gebruikt ook de categorienaam), enkel als een
+        # geïndexeerd veld (mogelijk) gewijzigd is
+        if update_fields is None:
+            changed = getattr(self, '_stored_search_state', None) != self.search_state
+        else:
+            changed = bool(self.SEARCH_FIELDS.intersection(update_fields))
+        if changed:
+            Workshop.objects.filter(pk=self.pk).update_search_vector()
+        if update_fields is None or changed:
+            self._stored_search_state = self.search_state
+
+
+class BookingQuerySet(models.QuerySet):
+    """Queryset helpers voor boekingen"""
+
+    def holding(self):
+        """Boekingen die plaatsen bezetten (HOLDING_STATUSES)"""
+        return self.filter(status__in=HOLDING_STATUSES)
+
+    def held_seats(self):
+        """Som van de bezette plaatsen"""
+        return self.holding().aggregate(total=Sum('number_of_participants'))['total'] or 0
+
+    def transition(self, status, batch_size=1000):
+        """
+        Zet de status van alle boekingen in bulk, zonder Booking.save().
+
+        Per batch één UPDATE die ook confirmed_at/cancelled_at en updated_at
+        zet zoals save() dat doet. Daarna worden plaatsen en 'full' status
+        van enkel de betrokken webinars in één UPDATE herberekend. De webinars
+        worden eerst gelockt, net als bij reserve_seats, zodat een
+        gelijktijdige boeking geen verouderde telling ziet. Er gaan geen
+        signals uit: de pagina cache en hero tellers worden hier zelf (na de
+        COMMIT) ongeldig gemaakt.
+        Geeft het aantal gewijzigde boekingen terug.
+        """
+        # Lokaal: stats.py importeert de modellen
+        from .stats import invalidate_site_stats
+
+        now = timezone.now()
+        changes = {'status': status, 'updated_at': now}
+        if status == 'confirmed':
+            changes['confirmed_at'] = Coalesce(F('confirmed_at'), Value(now))
+        elif status == 'cancelled':
+            changes['cancelled_at'] = Coalesce(F('cancelled_at'), Value(now))
+
+        changing = self.exclude(status=status).order_by()
+        with transaction.atomic():
+            workshop_ids = list(
+                Workshop.objects
+                .select_for_update()
+                .filter(pk__in=changing.values('workshop_id'))
+                .order_by('pk')
+                .values_list('pk', flat=True)
+            )
+            pks = list(changing.values_list('pk', flat=True))
+            updated = 0
+            for start in range(0, len(pks), batch_size):
+                updated += Booking.objects.filter(pk__in=pks[start:start + batch_size]).update(**changes)
+            Workshop.objects.filter(pk__in=workshop_ids).refresh_capacity()
+            if updated:
+                transaction.on_commit(invalidate_site_stats)
+                transaction.on_commit(invalidate_page_cache)
+        return updated
+
 
 class Booking(models.Model):
     """Boeking/Reservering voor een webinar"""
@@ -270,6 +508,8 @@ class Booking(models.Model):
     confirmed_at = models.DateTimeField('Bevestigd op', null=True, blank=True)
     cancelled_at = models.DateTimeField('Geannuleerd op', null=True, blank=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Boeking'
         verbose_name_plural = 'Boekingen'
@@ -278,11 +518,77 @@ class Booking(models.Model):
             models.Index(fields=['booking_reference']),
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['workshop', 'updated_at']),
         ]
 
     def __str__(self):
         return f"Boeking {self.booking_reference} - {self.workshop.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Onthoud welke plaatsen deze boeking bezet zoals ze in de database staat
+        if {'workshop_id', 'status', 'number_of_participants'} <= set(field_names):
+            instance._stored_seat_claim = instance.seat_claim
+            instance._stored_held_claim = instance.held_claim
+        return instance
+
+    @property
+    def seat_claim(self):
+        """(workshop_id, aantal plaatsen) dat deze boeking bezet"""
+        seats = self.number_of_participants if self.status == 'confirmed' else 0
+        return self.workshop_id, seats
+
+    @property
+    def held_claim(self):
+        """(workshop_id, aantal plaatsen) dat deze boeking vasthoudt, ook als ze nog openstaat"""
+        seats = self.number_of_participants if self.status in HOLDING_STATUSES else 0
+        return self.workshop_id, seats
+
+    def _get_stored_claims(self):
+        """(seat_claim, held_claim) zoals de boeking in de database staat"""
+        if self._state.adding:
+            return (None, 0), (None, 0)
+        if hasattr(self, '_stored_seat_claim') and hasattr(self, '_stored_held_claim'):
+            return self._stored_seat_claim, self._stored_held_claim
+        row = (
+            Booking.objects
+            .filter(pk=self.pk)
+            .values_list('workshop_id', 'status', 'number_of_participants')
+            .first()
+        )
+        if row is None:
+            return (None, 0), (None, 0)
+        workshop_id, status, participants = row
+        return (
+            (workshop_id, participants if status == 'confirmed' else 0),
+            (workshop_id, participants if status in HOLDING_STATUSES else 0),
+        )
+
+    def release_seat_claim(self):
+        """
+        Geef de bezette plaatsen vrij, bijv. na het verwijderen van de boeking.
+        Hield de boeking plaatsen vast, dan wordt ook de 'full' status herberekend.
+        """
+        workshop_id, held = getattr(self, '_stored_held_claim', self.held_claim)
+        if held:
+            Workshop.objects.filter(pk=workshop_id).refresh_capacity()
+        self._stored_seat_claim = self._stored_held_claim = (workshop_id, 0)
+
+    def _shift_seats(self, workshop_id, delta):
+        if not workshop_id or not delta:
+            return
+        Workshop.objects.filter(pk=workshop_id).adjust_confirmed_seats(delta)
+        self._shift_cached_seats(workshop_id, delta)
+
+    def _shift_cached_seats(self, workshop_id, delta):
+        # Houd een reeds geladen webinar instance in sync met de database
+        if delta and Booking.workshop.is_cached(self) and self.workshop.pk == workshop_id:
+            self.workshop.confirmed_seats = max(
+                (self.workshop.confirmed_seats or 0) + delta, 0
+            )
+
     def save(self, *args, **kwargs):
         # Generate booking reference als nieuw (WB voor Webinar Booking)
         if not self.booking_reference:
@@ -301,7 +607,27 @@ class Booking(models.Model):
         if self.status == 'cancelled' and not self.cancelled_at:
             self.cancelled_at = timezone.now()
         
-        super().save(*args, **kwargs)
+        # Geen savepoint: een fout rolt de omringende transactie toch terug
+        with transaction.atomic(savepoint=False):
+            (old_workshop_id, old_seats), old_held = self._get_stored_claims()
+            super().save(*args, **kwargs)
+            new_workshop_id, new_seats = self.seat_claim
+
+            if old_held != self.held_claim:
+                # Bezette plaatsen gewijzigd: teller én 'full' status herberekenen,
+                # ook een openstaande boeking die vervalt maakt plaats vrij
+                workshop_ids = {old_held[0], new_workshop_id} - {None}
+                Workshop.objects.filter(pk__in=workshop_ids).refresh_capacity()
+                self._shift_cached_seats(old_workshop_id, -old_seats)
+                self._shift_cached_seats(new_workshop_id, new_seats)
+            # Houd de bevestigde plaatsen van de webinar(s) in sync
+            elif old_workshop_id == new_workshop_id:
+                self._shift_seats(new_workshop_id, new_seats - old_seats)
+            else:
+                self._shift_seats(old_workshop_id, -old_seats)
+                self._shift_seats(new_workshop_id, new_seats)
+            self._stored_seat_claim = (new_workshop_id, new_seats)
+            self._stored_held_claim = self.held_claim
 
 
 class Review(models.Model):
@@ -346,11 +672,34 @@ class Review(models.Model):
         verbose_name_plural = 'Reviews'
         ordering = ['-created_at']
         unique_together = ['workshop', 'user']
+        indexes = [
+            models.Index(fields=['workshop', 'updated_at']),
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.rating}★ - {self.workshop.title} door {self.user.get_full_name()}"
 
 
+class NewsletterSubscriberQuerySet(models.QuerySet):
+    """Queryset helpers voor nieuwsbrief subscribers"""
+
+    def mailable(self):
+        """Actieve, bevestigde subscribers"""
+        return self.filter(is_active=True, confirmed=True)
+
+    def interested_in(self, categories):
+        """
+        Subscribers met minstens één van deze categorieën (ids of Category
+        objecten) in hun interesses. Per categorie een `interests @> '[id]'`
+        conditie: die operator gebruikt de GIN index (jsonb_path_ops).
+        """
+        condition = Q()
+        for category in categories:
+            condition |= Q(interests__contains=[getattr(category, 'pk', category)])
+        return self.filter(condition) if condition else self.none()
+
+
 class NewsletterSubscriber(models.Model):
     """Nieuwsbrief inschrijvingen"""
     
@@ -366,7 +715,7 @@ class NewsletterSubscriber(models.Model):
     subscribed_at = models.DateTimeField('Ingeschreven op', auto_now_add=True)
     unsubscribed_at = models.DateTimeField('Uitgeschreven op', null=True, blank=True)
     
-    # Preferences (optioneel voor later)
+    # Interesses: JSON lijst met de ids van categorieën, bv. [3, 7] (zie segments.py)
     interests = models.JSONField(
         'Interesses',
         blank=True,
@@ -374,6 +723,8 @@ class NewsletterSubscriber(models.Model):
         help_text='Categorieën waar de subscriber in geïnteresseerd is'
     )
 
+    objects = NewsletterSubscriberQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Nieuwsbrief Inschrijving'
         verbose_name_plural = 'Nieuwsbrief Inschrijvingen'
@@ -381,6 +732,7 @@ class NewsletterSubscriber(models.Model):
         indexes = [
             models.Index(fields=['email']),
             models.Index(fields=['is_active']),
+            GinIndex(fields=['interests'], opclasses=['jsonb_path_ops'], name='subscriber_interests_gin'),
         ]
 
     def __str__(self):
@@ -388,9 +740,108 @@ class NewsletterSubscriber(models.Model):
         return f"{name} - {'Actief' if self.is_active else 'Inactief'}"
 
 
+class NewsletterCampaign(models.Model):
+    """
+    Nieuwsbrief campagne, verstuurd met `manage.py send_campaign` (zie campaigns.py)
+
+    Onderwerp en tekst zijn Django templates met per ontvanger de merge
+    velden {{ first_name }}, {{ last_name }}, {{ name }} en {{ email }}.
+    """
+
+    STATUS_CHOICES = [
+        ('draft', 'Concept'),
+        ('sending', 'Bezig met versturen'),
+        ('sent', 'Verzonden'),
+    ]
+
+    name = models.CharField('Naam', max_length=200)
+    subject = models.CharField('Onderwerp', max_length=255)
+    body = models.TextField(
+        'Tekst',
+        help_text='Merge velden: {{ first_name }}, {{ last_name }}, {{ name }}, {{ email }}'
+    )
+    categories = models.ManyToManyField(
+        Category,
+        blank=True,
+        related_name='campaigns',
+        verbose_name='Segment',
+        help_text='Enkel subscribers met interesse in één van deze categorieën; leeg = iedereen'
+    )
+
+    # Voortgang
+    status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='draft')
+    last_subscriber_id = models.BigIntegerField(
+        'Checkpoint',
+        default=0,
+        help_text='Hoogste subscriber id dat verwerkt is; een onderbroken verzending gaat hier verder'
+    )
+    sent_count = models.PositiveIntegerField('Verzonden', default=0)
+    failed_count = models.PositiveIntegerField('Mislukt', default=0)
+
+    # Metadata
+    created_at = models.DateTimeField('Aangemaakt op', auto_now_add=True)
+    started_at = models.DateTimeField('Gestart op', null=True, blank=True)
+    finished_at = models.DateTimeField('Afgerond op', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Nieuwsbrief Campagne'
+        verbose_name_plural = 'Nieuwsbrief Campagnes'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.name
+
+
+class CampaignDelivery(models.Model):
+    """Afleverstatus van een campagne per ontvanger"""
+
+    STATUS_CHOICES = [
+        ('sent', 'Verzonden'),
+        ('failed', 'Mislukt'),
+    ]
+
+    campaign = models.ForeignKey(
+        NewsletterCampaign,
+        on_delete=models.CASCADE,
+        related_name='deliveries',
+        verbose_name='Campagne'
+    )
+    subscriber = models.ForeignKey(
+        NewsletterSubscriber,
+        on_delete=models.CASCADE,
+        related_name='deliveries',
+        verbose_name='Subscriber'
+    )
+    email = models.EmailField('Email adres')
+    status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES)
+    error = models.TextField('Fout', blank=True)
+    attempts = models.PositiveIntegerField('Pogingen', default=1)
+    updated_at = models.DateTimeField('Geüpdatet op', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Campagne Aflevering'
+        verbose_name_plural = 'Campagne Afleveringen'
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'subscriber'], name='unique_campaign_delivery'),
+        ]
+        indexes = [
+            models.Index(fields=['campaign', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign} - {self.email} ({self.get_status_display()})"
+
+
 class InhouseTrainingPage(models.Model):
     """Singleton model voor Inhouse Training pagina content"""
 
+    # Gedeelde cache (alle workers) + kopie per proces, zie get_instance()
+    CACHE_KEY = 'workshops:inhouse_page'
+    VERSION_CACHE_KEY = 'workshops:inhouse_page:version'
+    # Eindig: een token dat toch verouderd raakt, verloopt vanzelf
+    CACHE_TIMEOUT = 60 * 60
+    _local = None
+
     # HTML content veld voor de hele pagina
     content = models.TextField(
         'Pagina Inhoud',
@@ -428,6 +879,11 @@ class InhouseTrainingPage(models.Model):
     def __str__(self):
         return 'Inhouse Training Pagina Content'
 
+    @cached_property
+    def rendered_content(self):
+        """De HTML content, klaar om in de template te tonen"""
+        return mark_safe(self.content)
+
     def save(self, *args, **kwargs):
         # Singleton pattern - er mag maar 1 instance zijn
         self.pk = 1
@@ -579,9 +1035,97 @@ class InhouseTrainingPage(models.Model):
 '''
 
         super().save(*args, **kwargs)
+        self.__dict__.pop('rendered_content', None)
+        # Pas na de COMMIT: een gelijktijdige request zou anders de oude rij
+        # lezen en onder een nieuw versie token opnieuw cachen
+        transaction.on_commit(type(self).clear_cache)
 
     @classmethod
     def get_instance(cls):
-        """Haal de singleton instance op, of maak deze aan"""
-        obj, created = cls.objects.get_or_create(pk=1)
+        """
+        Haal de singleton instance op, of maak deze aan.
+
+        Eerst de kopie in dit proces (als het versie token in de gedeelde
+        cache nog klopt), dan de gedeelde cache, en pas dan de database.
+        Een geldige hit kost dus één cache lookup en geen query.
+        """
+        version = cache.get(cls.VERSION_CACHE_KEY)
+        local = cls._local
+        if version is not None and local is not None and local[0] == version:
+            return local[1]
+
+        cached = cache.get(cls.CACHE_KEY) if version is not None else None
+        if cached is not None and cached[0] == version:
+            obj = cached[1]
+        else:
+            obj, created = cls.objects.get_or_create(pk=1)
+            obj.rendered_content  # vooraf renderen, zit mee in de cache
+            version = uuid.uuid4().hex
+            cache.set_many(
+                {cls.VERSION_CACHE_KEY: version, cls.CACHE_KEY: (version, obj)},
+                cls.CACHE_TIMEOUT,
+            )
+
+        cls._local = (version, obj)
         return obj
+
+    @classmethod
+    def clear_cache(cls):
+        """Vergeet de gecachte instance (in alle processen via het versie token)"""
+        cache.delete_many([cls.VERSION_CACHE_KEY, cls.CACHE_KEY])
+        cls._local = None
+
+
+class OutboxMessage(models.Model):
+    """
+    Transactionele outbox voor e-mails
+
+    Wordt geschreven in dezelfde transactie als de wijziging die de mail
+    veroorzaakt (een boeking zonder mail of een mail zonder boeking kan dus
+    niet) en verstuurd door `manage.py process_outbox` (zie outbox.py).
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Wachtend'),
+        ('sent', 'Verzonden'),
+        ('failed', 'Mislukt'),
+    ]
+
+    kind = models.CharField('Soort', max_length=50)
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name='outbox_messages',
+        verbose_name='Boeking',
+        null=True,
+        blank=True
+    )
+    to = models.EmailField('Aan')
+    subject = models.CharField('Onderwerp', max_length=255)
+    body = models.TextField('Tekst')
+
+    # Verzending
+    status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField('Pogingen', default=0)
+    available_at = models.DateTimeField('Versturen vanaf', default=timezone.now)
+    last_error = models.TextField('Laatste fout', blank=True)
+
+    # Metadata
+    created_at = models.DateTimeField('Aangemaakt op', auto_now_add=True)
+    sent_at = models.DateTimeField('Verzonden op', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Uitgaande e-mail'
+        verbose_name_plural = 'Uitgaande e-mails'
+        ordering = ['-created_at']
+        indexes = [
+            # De worker zoekt enkel wachtende berichten die aan de beurt zijn
+            models.Index(
+                fields=['available_at'],
+                name='outbox_pending_idx',
+                condition=Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} aan {self.to} ({self.get_status_display()})"
@@ -0,0 +1,152 @@
+"""
+Transactionele outbox voor e-mails
+
+De view schrijft de mail als OutboxMessage in dezelfde transaction.atomic()
+als de boeking: rolt de boeking terug, dan verdwijnt ook de mail, en een
+trage of onbereikbare SMTP server houdt de request niet meer op.
+
+`manage.py process_outbox` (de worker) verstuurt de wachtende berichten
+per batch over één SMTP connectie die open blijft zolang er werk is:
+
+- rijen worden geclaimd met SELECT ... FOR UPDATE SKIP LOCKED, zodat
+  meerdere workers naast elkaar kunnen draaien zonder dubbele mails;
+- een mislukte verzending wordt later opnieuw geprobeerd met exponentiële
+  backoff (RETRY_BASE_SECONDS, verdubbeld per poging, tot RETRY_MAX_SECONDS);
+  na OUTBOX_MAX_ATTEMPTS pogingen krijgt het bericht status 'failed'
+  (opnieuw proberen kan via de admin actie);
+- na een fout wordt de connectie gesloten en voor het volgende bericht
+  opnieuw geopend.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 60 * 60
+
+# Lengte waarop de foutmelding bewaard wordt
+ERROR_PREVIEW_LENGTH = 1000
+
+
+def batch_size():
+    return getattr(settings, 'OUTBOX_BATCH_SIZE', 50)
+
+
+def max_attempts():
+    return getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def enqueue(kind, to, subject, body, booking=None):
+    """Zet een mail in de outbox; roep dit op binnen de transactie van de wijziging"""
+    return OutboxMessage.objects.create(
+        kind=kind,
+        to=to,
+        subject=subject,
+        body=body,
+        booking=booking,
+    )
+
+
+def enqueue_booking_received(booking):
+    """Ontvangstbevestiging van een nieuwe boeking"""
+    context = {'booking': booking, 'workshop': booking.workshop}
+    subject = render_to_string('workshops/emails/booking_received_subject.txt', context)
+    body = render_to_string('workshops/emails/booking_received.txt', context)
+    return enqueue(
+        'booking_received',
+        booking.email,
+        ' '.join(subject.split()),
+        body,
+        booking=booking,
+    )
+
+
+def retry_delay(attempts):
+    """Wachttijd na de zoveelste mislukte poging"""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def _email(message, connection):
+    return EmailMessage(
+        message.subject,
+        message.body,
+        settings.DEFAULT_FROM_EMAIL,
+        [message.to],
+        connection=connection,
+    )
+
+
+def send_batch(connection, limit=None, attempts_allowed=None):
+    """
+    Claim en verstuur één batch wachtende berichten. Geeft (verzonden,
+    mislukt) terug; (0, 0) als er niets meer aan de beurt is.
+    """
+    limit = limit or batch_size()
+    attempts_allowed = attempts_allowed or max_attempts()
+    sent, failed = [], []
+
+    with transaction.atomic():
+        batch = list(
+            OutboxMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', available_at__lte=timezone.now())
+            .order_by('available_at', 'pk')[:limit]
+        )
+        reopen = False
+        for message in batch:
+            try:
+                if reopen:
+                    connection.open()
+                    reopen = False
+                connection.send_messages([_email(message, connection)])
+            except Exception as error:  # SMTP fouten, time-outs, geweigerde ontvanger, ...
+                now = timezone.now()
+                message.attempts += 1
+                message.last_error = f'{type(error).__name__}: {error}'[:ERROR_PREVIEW_LENGTH]
+                if message.attempts >= attempts_allowed:
+                    message.status = 'failed'
+                else:
+                    message.available_at = now + retry_delay(message.attempts)
+                failed.append(message)
+                # Connectie in onbekende toestand: opnieuw openen voor het volgende bericht
+                connection.close()
+                reopen = True
+            else:
+                sent.append(message.pk)
+
+        if sent:
+            OutboxMessage.objects.filter(pk__in=sent).update(
+                status='sent', sent_at=timezone.now(), last_error='',
+            )
+        if failed:
+            OutboxMessage.objects.bulk_update(
+                failed, ['attempts', 'last_error', 'status', 'available_at'],
+            )
+    return len(sent), len(failed)
+
+
+def drain(limit=None, attempts_allowed=None, connection=None):
+    """
+    Verstuur batches tot er niets meer aan de beurt is, over één connectie.
+    Geeft het totaal (verzonden, mislukt) terug.
+    """
+    connection = connection or get_connection()
+    total_sent = total_failed = 0
+    connection.open()
+    try:
+        while True:
+            sent, failed = send_batch(connection, limit, attempts_allowed)
+            total_sent += sent
+            total_failed += failed
+            if not sent and not failed:
+                break
+    finally:
+        connection.close()
+    return total_sent, total_failed
@@ -0,0 +1,120 @@
+"""
+Lokale placeholder afbeeldingen voor webinars zonder afbeelding
+
+Een SVG met een verloop in de kleuren van de categorie (afgeleid van
+Category.icon, zodat categorieën met hetzelfde icoon dezelfde kleuren
+krijgen), de titel en de categorienaam.
+
+Er wordt niets in de media storage geschreven: de view
+views.workshop_placeholder rendert de SVG. De URL bevat een hash van de
+inhoud (een gewijzigde titel geeft een nieuwe URL), dus de response is
+immutable en de view cachet de bytes onder die URL.
+"""
+import hashlib
+from xml.sax.saxutils import escape
+
+from django.urls import reverse
+
+
+# Formaten die de templates gebruiken (kaart, detail pagina); de view
+# weigert andere afmetingen
+PLACEHOLDER_SIZES = {(400, 220), (800, 450)}
+
+# Server-side cache van de bytes; de URL wijzigt nooit van inhoud
+PLACEHOLDER_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Verlopen (van, naar) in de huisstijl (zie --primary-* in style.css)
+BRAND_COLOURS = ('#014f67', '#008080')
+PALETTE = (
+    BRAND_COLOURS,
+    ('#1e40af', '#3b82f6'),
+    ('#0f766e', '#0ea5e9'),
+    ('#475569', '#94a3b8'),
+    ('#065f46', '#10b981'),
+    ('#9a3412', '#f59e0b'),
+    ('#5b21b6', '#8b5cf6'),
+    ('#9f1239', '#ef4444'),
+)
+
+FONT_FAMILY = "system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif"
+
+# Gemiddelde tekenbreedte t.o.v. de lettergrootte, om te kunnen afbreken
+CHAR_WIDTH = 0.56
+
+MAX_LINES = 3
+
+
+def colours_for(category):
+    """Verloop voor een categorie; zonder categorie de huisstijl"""
+    if category is None:
+        return BRAND_COLOURS
+    key = (category.icon or category.slug).encode()
+    return PALETTE[int(hashlib.md5(key).hexdigest(), 16) % len(PALETTE)]
+
+
+def wrap(text, max_chars, max_lines=MAX_LINES):
+    """Breek op woorden af; de laatste regel krijgt … als er meer is"""
+    lines, current = [], ''
+    for word in text.split():
+        candidate = f'{current} {word}'.strip()
+        if len(candidate) <= max_chars or not current:
+            current = candidate
+            continue
+        lines.append(current)
+        current = word
+    if current:
+        lines.append(current)
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1][:max_chars - 1].rstrip() + '…'
+    return [line[:max_chars] for line in lines]
+
+
+def render_svg(title, label, colours, width, height):
+    font_size = max(round(min(width / 16, height / 7)), 12)
+    lines = wrap(title, max(int(width * 0.84 / (font_size * CHAR_WIDTH)), 8))
+    line_height = round(font_size * 1.25)
+    first = round(height / 2 - (len(lines) - 1) * line_height / 2 + font_size * 0.35)
+    text = ''.join(
+        f'<tspan x="50%" y="{first + i * line_height}">{escape(line)}</tspan>'
+        for i, line in enumerate(lines)
+    )
+    caption = ''
+    if label:
+        caption = (
+            f'<text x="50%" y="{height - round(font_size * 0.9)}" fill="#fffbf0" fill-opacity=".75" '
+            f'font-size="{round(font_size * 0.6)}" text-anchor="middle" letter-spacing="1">'
+            f'{escape(label.upper())}</text>'
+        )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="{escape(FONT_FAMILY)}">'
+        f'<defs><linearGradient id="g" x1="0" y1="0" x2="1" y2="1">'
+        f'<stop offset="0" stop-color="{colours[0]}"/><stop offset="1" stop-color="{colours[1]}"/>'
+        f'</linearGradient></defs>'
+        f'<rect width="100%" height="100%" fill="url(#g)"/>'
+        f'<text fill="#fffbf0" font-size="{font_size}" font-weight="600" text-anchor="middle">{text}</text>'
+        f'{caption}</svg>'
+    )
+
+
+def placeholder_svg(workshop, width, height):
+    """De SVG van een webinar als bytes"""
+    category = workshop.category
+    return render_svg(
+        workshop.title,
+        category.name if category else '',
+        colours_for(category),
+        width,
+        height,
+    ).encode()
+
+
+def placeholder_digest(svg):
+    return hashlib.sha256(svg).hexdigest()[:16]
+
+
+def placeholder_url(workshop, width, height):
+    """URL van de placeholder, met een hash van de inhoud"""
+    digest = placeholder_digest(placeholder_svg(workshop, width, height))
+    return reverse('workshops:workshop_placeholder', args=[workshop.pk, width, height, digest])
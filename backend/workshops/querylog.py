@@ -0,0 +1,192 @@
+"""
+Slow query log en detectie van herhaalde queries (opt-in)
+
+QueryInspectionMiddleware hangt een connection.execute_wrapper rond elke
+request (QUERY_INSPECTION = True) en logt als JSON naar de logger
+'workshops.queries':
+
+- slow_query: queries trager dan SLOW_QUERY_MS;
+- duplicate_query: exact dezelfde SQL met dezelfde parameters, minstens
+  DUPLICATE_QUERY_THRESHOLD keer in één request;
+- similar_query: dezelfde SQL met andere parameters, minstens
+  SIMILAR_QUERY_THRESHOLD keer (typisch een N+1 patroon).
+
+Elke melding bevat de herkomst: het dichtste frame in de workshops code
+en, indien van toepassing, de template die aan het renderen was.
+`manage.py query_report <logbestand>` vat de meldingen samen.
+"""
+import json
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger('workshops.queries')
+
+# Frames in deze map tellen als herkomst, behalve de instrumentatie zelf
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SKIP_FILES = {
+    os.path.join(APP_DIR, 'querylog.py'),
+    os.path.join(APP_DIR, 'instrumentation.py'),
+}
+
+# Frames van deze module zijn (Node/)Template.render
+TEMPLATE_MODULE = os.path.join('django', 'template', 'base.py')
+
+SQL_PREVIEW_LENGTH = 500
+
+
+def find_origin():
+    """
+    (bestand:lijn functie, template) van de dichtste aanroeper in de app
+    en de template die op dat moment rendert. Loopt de frames zelf af
+    i.p.v. traceback.extract_stack(): er wordt geen broncode ingelezen.
+    """
+    frame = sys._getframe(1)
+    origin = template = None
+    while frame is not None and (origin is None or template is None):
+        code = frame.f_code
+        filename = code.co_filename
+        if template is None and code.co_name == 'render' and filename.endswith(TEMPLATE_MODULE):
+            # Template en Node hebben allebei een origin met de template naam
+            owner = frame.f_locals.get('self')
+            name = getattr(getattr(owner, 'origin', None), 'template_name', None)
+            if name:
+                template = str(name)
+        if origin is None and filename.startswith(APP_DIR) and filename not in SKIP_FILES:
+            origin = f'{os.path.relpath(filename, os.path.dirname(APP_DIR))}:{frame.f_lineno} {code.co_name}'
+        frame = frame.f_back
+    return origin, template
+
+
+class QueryInspector:
+    """Verzamelt de queries van één request"""
+
+    def __init__(self, slow_ms, duplicate_threshold, similar_threshold):
+        self.slow_ms = slow_ms
+        self.duplicate_threshold = duplicate_threshold
+        self.similar_threshold = similar_threshold
+        self.exact = defaultdict(int)
+        self.similar = defaultdict(lambda: [0, 0.0, None])  # aantal, ms, herkomst
+        self.slow = []
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.total += 1
+            self.inspect(sql, params, many, duration, context['connection'].alias)
+
+    def inspect(self, sql, params, many, duration, alias):
+        entry = self.similar[sql]
+        entry[0] += 1
+        entry[1] += duration
+        if not many:
+            self.exact[(sql, repr(params))] += 1
+
+        # Herkomst enkel bepalen als we ze nodig hebben: trage query of
+        # de eerste herhaling van deze SQL
+        slow = duration >= self.slow_ms
+        if slow or entry[0] == 2:
+            origin = find_origin()
+            entry[2] = entry[2] or origin
+        if slow:
+            self.slow.append({
+                'duration_ms': round(duration, 2),
+                'sql': sql[:SQL_PREVIEW_LENGTH],
+                'database': alias,
+                'origin': origin[0],
+                'template': origin[1],
+            })
+
+    def findings(self, view):
+        for record in self.slow:
+            yield {'event': 'slow_query', 'view': view, **record}
+
+        duplicated = defaultdict(int)
+        for (sql, _), count in self.exact.items():
+            if count >= self.duplicate_threshold:
+                duplicated[sql] = max(duplicated[sql], count)
+
+        for sql, (count, total_ms, origin) in self.similar.items():
+            origin, template = origin or (None, None)
+            if sql in duplicated:
+                yield {
+                    'event': 'duplicate_query', 'view': view, 'count': duplicated[sql],
+                    'total_ms': round(total_ms, 2), 'sql': sql[:SQL_PREVIEW_LENGTH],
+                    'origin': origin, 'template': template,
+                }
+            elif count >= self.similar_threshold:
+                yield {
+                    'event': 'similar_query', 'view': view, 'count': count,
+                    'total_ms': round(total_ms, 2), 'sql': sql[:SQL_PREVIEW_LENGTH],
+                    'origin': origin, 'template': template,
+                }
+
+
+class QueryInspectionMiddleware:
+    """Opt-in via QUERY_INSPECTION; zie de module docstring"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = QueryInspector(
+            slow_ms=getattr(settings, 'SLOW_QUERY_MS', 100),
+            duplicate_threshold=getattr(settings, 'DUPLICATE_QUERY_THRESHOLD', 2),
+            similar_threshold=getattr(settings, 'SIMILAR_QUERY_THRESHOLD', 5),
+        )
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(inspector))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else request.path
+        for finding in inspector.findings(view):
+            finding['path'] = request.path
+            finding['queries_in_request'] = inspector.total
+            logger.warning(json.dumps(finding, sort_keys=True))
+        return response
+
+
+def summarize(lines):
+    """
+    Groepeer JSON log regels per (event, view, herkomst, sql).
+    Geeft een lijst terug, meest impactvolle (totale ms) eerst.
+    """
+    groups = {}
+    for line in lines:
+        start = line.find('{')
+        if start < 0:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except ValueError:
+            continue
+        if record.get('event') not in ('slow_query', 'duplicate_query', 'similar_query'):
+            continue
+        key = (record['event'], record.get('view'), record.get('origin'), record.get('sql'))
+        group = groups.setdefault(key, {
+            'event': record['event'], 'view': record.get('view'), 'origin': record.get('origin'),
+            'template': record.get('template'), 'sql': record.get('sql'),
+            'occurrences': 0, 'queries': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+        })
+        duration = record.get('duration_ms', record.get('total_ms', 0.0))
+        group['occurrences'] += 1
+        group['queries'] += record.get('count', 1)
+        group['total_ms'] = round(group['total_ms'] + duration, 2)
+        group['max_ms'] = max(group['max_ms'], duration)
+    return sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)
@@ -0,0 +1,52 @@
+"""
+Race-vrije plaatsreservatie voor webinars
+
+Alle boekingen voor dezelfde webinar worden geserialiseerd op een row lock
+van de Workshop (select_for_update). De capaciteit wordt binnen die
+transactie opnieuw gecontroleerd, zodat gelijktijdige inschrijvingen nooit
+meer plaatsen kunnen innemen dan max_participants.
+"""
+from django.db import transaction
+
+from .models import Booking, Workshop
+
+
+class SeatsUnavailable(Exception):
+    """Er zijn niet genoeg vrije plaatsen meer voor deze boeking"""
+
+    def __init__(self, remaining):
+        self.remaining = remaining
+        if remaining <= 0:
+            message = 'Deze workshop is helaas volgeboekt.'
+        else:
+            message = f'Er zijn nog maar {remaining} plaatsen beschikbaar.'
+        super().__init__(message)
+
+
+def held_seats(workshop):
+    """
+    Aantal plaatsen bezet door openstaande en bevestigde boekingen; dezelfde
+    definitie als de catalogus (Workshop.with_availability) en refresh_capacity
+    """
+    return Booking.objects.filter(workshop=workshop).held_seats()
+
+
+def reserve_seats(booking):
+    """
+    Sla een nieuwe boeking op als er nog plaats is.
+
+    Lockt de webinar rij en controleert de capaciteit opnieuw binnen de
+    transactie; Booking.save() zet de status op 'full' zodra de laatste
+    plaats weg is. Gooit SeatsUnavailable als de boeking niet meer past.
+    """
+    with transaction.atomic():
+        workshop = Workshop.objects.select_for_update().get(pk=booking.workshop_id)
+
+        remaining = max(workshop.max_participants - held_seats(workshop), 0)
+        if workshop.status == 'full' or booking.number_of_participants > remaining:
+            raise SeatsUnavailable(0 if workshop.status == 'full' else remaining)
+
+        booking.workshop = workshop
+        booking.save()
+
+    return booking
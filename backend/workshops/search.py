@@ -0,0 +1,66 @@
+"""
+Full-text zoeken in de webinar catalogus (PostgreSQL)
+
+Workshop.search_vector bevat een gewogen tsvector met Nederlandse stemming:
+titel (A), korte beschrijving en categorie (B), beschrijving (C). De kolom
+heeft een GIN index en wordt bijgewerkt bij Workshop.save() en wanneer een
+categorie hernoemd wordt. Als de pg_trgm extensie beschikbaar is, vangt een
+trigram match op de titel tikfouten op.
+"""
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connections
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+# Taalconfiguratie voor stemming (de site draait in nl-be)
+SEARCH_CONFIG = 'dutch'
+
+_trigram_cache = {}
+
+
+def workshop_search_vector():
+    """Gewogen SearchVector expressie, bruikbaar in een UPDATE op Workshop"""
+    from .models import Category
+
+    category_name = Subquery(
+        Category.objects.filter(pk=OuterRef('category_id')).values('name')[:1]
+    )
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('short_description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(category_name, weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def trigram_available(using='default'):
+    """Check (eenmalig per proces) of pg_trgm geïnstalleerd is"""
+    if using not in _trigram_cache:
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_cache[using] = cursor.fetchone() is not None
+    return _trigram_cache[using]
+
+
+def search_workshops(queryset, query):
+    """
+    Filter een Workshop queryset op een zoekterm en annoteer search_rank.
+    Gebruikt websearch syntax ("exacte zin", -uitsluiten, OR).
+    """
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+    condition = Q(search_vector=search_query)
+    rank = Coalesce(
+        SearchRank(F('search_vector'), search_query), Value(0.0), output_field=FloatField()
+    )
+
+    if trigram_available(queryset.db):
+        condition |= Q(title__trigram_word_similar=query)
+        rank = rank + TrigramWordSimilarity(query, 'title')
+
+    return queryset.filter(condition).annotate(search_rank=rank)
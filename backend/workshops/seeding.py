@@ -0,0 +1,48 @@
+"""
+Hulpfuncties voor het (her)vullen van de database in bulk
+
+Gebruikt door populate_data en populate_newsletter. Alles gaat via
+bulk_create met ignore_conflicts/update_conflicts op een unieke sleutel,
+zodat de commands veilig opnieuw gedraaid kunnen worden.
+"""
+from itertools import islice
+
+
+# Rijen per INSERT statement
+SEED_BATCH_SIZE = 5000
+
+
+def batched(iterable, size=SEED_BATCH_SIZE):
+    """Lijsten van maximaal `size` elementen (itertools.batched vanaf Python 3.12)"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def bulk_insert(model, objects, size=SEED_BATCH_SIZE):
+    """
+    Voeg rijen toe en sla bestaande (zelfde unieke sleutel) over.
+    `objects` mag een generator zijn; er staat nooit meer dan één batch in het geheugen.
+    Geeft het aantal aangeboden rijen terug.
+    """
+    total = 0
+    for batch in batched(objects, size):
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+        total += len(batch)
+    return total
+
+
+def bulk_upsert(model, objects, unique_fields, update_fields, size=SEED_BATCH_SIZE):
+    """
+    Voeg rijen toe of werk bestaande bij (INSERT ... ON CONFLICT DO UPDATE).
+    Op PostgreSQL krijgen de objecten hun pk terug, ook bij een update.
+    """
+    saved = []
+    for batch in batched(objects, size):
+        saved.extend(model.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        ))
+    return saved
@@ -0,0 +1,78 @@
+"""
+Segmentatie van nieuwsbrief subscribers op interesses
+
+NewsletterSubscriber.interests is een JSON lijst met category ids, met een
+GIN index (jsonb_path_ops). Een segment zijn de actieve, bevestigde
+subscribers met minstens één van de gekozen categorieën; zonder categorieën
+is dat iedereen. Campagnes gebruiken dit via NewsletterCampaign.categories.
+
+Het aantal subscribers per segment wordt gecachet onder een generatie token
+dat vernieuwd wordt bij elke wijziging van een subscriber (signals.py en
+de bulk acties in de admin), zodat alle segmenten in één keer vervallen.
+De tellers per categorie (interesse filter in de admin) komen samen uit
+één GROUP BY query: interest_counts().
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .models import NewsletterSubscriber
+
+
+SEGMENT_GENERATION_KEY = 'workshops:segment_generation'
+
+
+def category_ids(categories):
+    """Gesorteerde, unieke ids van Category objecten of ids"""
+    return sorted({getattr(category, 'pk', category) for category in categories or ()})
+
+
+def segment(categories=None):
+    """Actieve, bevestigde subscribers met interesse in één van de categorieën"""
+    queryset = NewsletterSubscriber.objects.mailable()
+    ids = category_ids(categories)
+    return queryset.interested_in(ids) if ids else queryset
+
+
+def segment_generation():
+    generation = cache.get(SEGMENT_GENERATION_KEY)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.add(SEGMENT_GENERATION_KEY, generation, None)
+        generation = cache.get(SEGMENT_GENERATION_KEY, generation)
+    return generation
+
+
+def segment_count(categories=None):
+    """Aantal subscribers in een segment, uit de cache of berekend"""
+    ids = category_ids(categories)
+    key = f"workshops:segment_count:{segment_generation()}:{','.join(map(str, ids)) or 'all'}"
+    timeout = getattr(settings, 'SEGMENT_COUNT_CACHE_TIMEOUT', 300)
+    return cache.get_or_set(key, lambda: segment(ids).count(), timeout)
+
+
+def compute_interest_counts():
+    """{category id: aantal actieve, bevestigde subscribers} in één query"""
+    table = connection.ops.quote_name(NewsletterSubscriber._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT value, COUNT(*) FROM {table} "
+            "CROSS JOIN LATERAL jsonb_array_elements_text("
+            "CASE WHEN jsonb_typeof(interests) = 'array' THEN interests ELSE '[]'::jsonb END) AS value "
+            "WHERE is_active AND confirmed GROUP BY value"
+        )
+        return {int(value): count for value, count in cursor.fetchall() if value.isdigit()}
+
+
+def interest_counts():
+    """Aantal per categorie (segmenten van één categorie), uit de cache of berekend"""
+    key = f'workshops:interest_counts:{segment_generation()}'
+    timeout = getattr(settings, 'SEGMENT_COUNT_CACHE_TIMEOUT', 300)
+    return cache.get_or_set(key, compute_interest_counts, timeout)
+
+
+def invalidate_segment_counts():
+    """Laat alle gecachte segment tellers vervallen"""
+    cache.delete(SEGMENT_GENERATION_KEY)
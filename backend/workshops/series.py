@@ -0,0 +1,146 @@
+"""
+Webinars dupliceren en reeksen inplannen
+
+Alle kopieën worden in één bulk_create aangemaakt. Slugs worden
+deterministisch afgeleid van de bron-slug en de startdatum; bezette slugs
+worden in één query opgehaald in plaats van per kopie te controleren.
+De zoekindex wordt van de bron overgenomen, zodat er na de INSERT geen
+extra UPDATE nodig is.
+"""
+import calendar
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidate_page_cache
+from .models import Workshop
+from .stats import invalidate_site_stats
+
+
+RECURRENCE_CHOICES = [
+    ('weekly', 'Wekelijks'),
+    ('biweekly', 'Om de twee weken'),
+    ('monthly', 'Maandelijks'),
+]
+
+# Bovengrens voor één reeks (een volledig schooljaar wekelijks)
+MAX_OCCURRENCES = 52
+
+# Ruimte voor '-jjjj-mm-dd-NN' achter de bron-slug
+SLUG_SUFFIX_LENGTH = 16
+
+# Velden die een kopie niet van de bron overneemt
+RESET_FIELDS = {
+    'id': None,
+    'status': 'upcoming',
+    'featured': False,
+    'confirmed_seats': 0,
+    'meeting_url': '',
+    'meeting_id': '',
+    'meeting_password': '',
+}
+
+
+def add_months(value, months):
+    """Verschuif een datetime met N maanden; dag 31 wordt de laatste dag van de maand"""
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def shift(value, rule, step):
+    """
+    Datum van de step-de herhaling volgens de regel. Er wordt in lokale
+    tijd gerekend, zodat een sessie om 19u ook na de zomertijd om 19u valt.
+    """
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    if rule == 'weekly':
+        return value + timedelta(weeks=step)
+    if rule == 'biweekly':
+        return value + timedelta(weeks=2 * step)
+    if rule == 'monthly':
+        # Altijd vanaf de bron rekenen, anders schuift 31 jan -> 28 feb -> 28 mrt
+        return add_months(value, step)
+    raise ValueError(f'Onbekende herhaling: {rule}')
+
+
+def _base_slug(workshop):
+    return workshop.slug[:Workshop._meta.get_field('slug').max_length - SLUG_SUFFIX_LENGTH]
+
+
+def _taken_slugs(bases):
+    """Alle bestaande slugs die met één van de bases beginnen, in één query"""
+    condition = Q()
+    for base in set(bases):
+        condition |= Q(slug__startswith=base)
+    return set(Workshop.objects.filter(condition).values_list('slug', flat=True))
+
+
+def _unique_slug(base, start, taken):
+    slug = f'{base}-{start:%Y-%m-%d}'
+    candidate, counter = slug, 2
+    while candidate in taken:
+        candidate = f'{slug}-{counter}'
+        counter += 1
+    taken.add(candidate)
+    return candidate
+
+
+def _copy(source, start, title, taken):
+    copy = Workshop(**{
+        field.attname: getattr(source, field.attname)
+        for field in Workshop._meta.concrete_fields
+    })
+    for name, value in RESET_FIELDS.items():
+        setattr(copy, name, value)
+    copy.title = title
+    copy.start_datetime = start
+    copy.end_datetime = start + (source.end_datetime - source.start_datetime)
+    copy.slug = _unique_slug(_base_slug(source), start, taken)
+    return copy
+
+
+def _create(copies):
+    created = Workshop.objects.bulk_create(copies)
+    # bulk_create stuurt geen post_save signalen
+    invalidate_site_stats()
+    invalidate_page_cache()
+    return created
+
+
+def duplicate_workshops(workshops, rule='weekly', title_suffix=' (Kopie)'):
+    """
+    Maak van elke webinar één kopie, één herhaling later ingepland.
+    Geeft de nieuwe (opgeslagen) webinars terug.
+    """
+    workshops = list(workshops)
+    if not workshops:
+        return []
+    taken = _taken_slugs(_base_slug(workshop) for workshop in workshops)
+    return _create([
+        _copy(
+            workshop,
+            shift(workshop.start_datetime, rule, 1),
+            f'{workshop.title}{title_suffix}',
+            taken,
+        )
+        for workshop in workshops
+    ])
+
+
+def generate_series(source, rule, occurrences):
+    """
+    Plan een reeks van `occurrences` sessies na de bronwebinar in.
+    De titel blijft gelijk; elke sessie krijgt een eigen slug op datum.
+    """
+    if occurrences < 1:
+        return []
+    taken = _taken_slugs([_base_slug(source)])
+    return _create([
+        _copy(source, shift(source.start_datetime, rule, step), source.title, taken)
+        for step in range(1, occurrences + 1)
+    ])
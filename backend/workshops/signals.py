@@ -0,0 +1,70 @@
+"""
+Signal handlers voor de workshops app
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_page_cache
+from .models import Booking, Category, InhouseTrainingPage, NewsletterSubscriber, Review, Workshop
+from .segments import invalidate_segment_counts
+from .stats import invalidate_site_stats
+
+
+@receiver(post_delete, sender=Booking)
+def release_booking_seats(sender, instance, **kwargs):
+    """Verwijderde boekingen geven hun plaatsen vrij (teller en 'full' status)"""
+    instance.release_seat_claim()
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_search_vectors(sender, instance, **kwargs):
+    """De categorienaam zit in de zoekindex van elke webinar in die categorie"""
+    Workshop.objects.filter(category=instance).update_search_vector()
+
+
+@receiver(post_delete, sender=Category)
+def refresh_uncategorized_search_vectors(sender, instance, **kwargs):
+    """Webinars van een verwijderde categorie verliezen de categorienaam"""
+    Workshop.objects.filter(category__isnull=True).update_search_vector()
+
+
+@receiver(post_save, sender=Workshop)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Workshop)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Booking)
+def invalidate_stats_cache(sender, **kwargs):
+    """
+    Hero tellers opnieuw berekenen na elke wijziging. Pas na de COMMIT:
+    anders kan een gelijktijdige request de oude tellers opnieuw cachen.
+    """
+    transaction.on_commit(invalidate_site_stats)
+
+
+@receiver(post_save, sender=Workshop)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=InhouseTrainingPage)
+@receiver(post_delete, sender=Workshop)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=InhouseTrainingPage)
+def invalidate_public_pages(sender, **kwargs):
+    """
+    Gecachte catalogus pagina's tonen o.a. vrije plaatsen en reviews.
+    Pas na de COMMIT, zie invalidate_stats_cache.
+    """
+    transaction.on_commit(invalidate_page_cache)
+
+
+@receiver(post_save, sender=NewsletterSubscriber)
+@receiver(post_delete, sender=NewsletterSubscriber)
+def invalidate_segments(sender, **kwargs):
+    """Segment tellers (campagnes, admin) opnieuw berekenen"""
+    invalidate_segment_counts()
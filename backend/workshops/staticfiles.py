@@ -0,0 +1,73 @@
+"""
+Statische bestanden en uploads rechtstreeks vanuit het Django proces
+
+StaticFilesMiddleware is WhiteNoise, uitgebreid met MEDIA_ROOT:
+
+- STATIC_ROOT (na collectstatic) wordt bij het opstarten één keer gescand;
+  met CompressedManifestStaticFilesStorage (APP_SERVER=gunicorn) hebben de
+  bestanden een hash in de naam (Cache-Control: immutable, 10 jaar) en een
+  voorgecomprimeerde .gz variant die volgens Accept-Encoding geserveerd wordt.
+- Uploads in MEDIA_ROOT worden bij de eerste request opgezocht en daarna
+  uit het geheugen geserveerd, met MEDIA_CACHE_MAX_AGE. Django's storage
+  overschrijft nooit een bestaande naam, dus een URL wijzigt niet van inhoud.
+  Image renditions hebben een hash van de inhoud in hun pad en zijn dus
+  immutable.
+
+In DEBUG zoekt WhiteNoise de bestanden bij elke request op (autorefresh) en
+via de staticfiles finders, zodat collectstatic lokaal niet nodig is.
+"""
+import os
+from urllib.parse import urlparse
+
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+from .images import RENDITION_DIR
+
+
+# Mappen in MEDIA_ROOT met een hash van de inhoud in elke bestandsnaam
+IMMUTABLE_MEDIA_DIRS = (RENDITION_DIR,)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise voor STATIC_ROOT plus de uploads in MEDIA_ROOT"""
+
+    def __init__(self, get_response=None, settings=settings):
+        # Vóór super().__init__: die roept add_cache_headers al aan
+        self.media_prefix = ensure_leading_trailing_slash(urlparse(settings.MEDIA_URL).path)
+        self.media_max_age = getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60 * 24 * 30)
+        super().__init__(get_response, settings)
+        # Niet scannen (kan groot zijn), enkel registreren voor find_file()
+        media_root = os.path.abspath(settings.MEDIA_ROOT).rstrip(os.path.sep) + os.path.sep
+        self.directories.append((media_root, self.media_prefix))
+
+    def __call__(self, request):
+        path = request.path_info
+        if path.startswith(self.media_prefix):
+            return self.serve_media(request, path)
+        return super().__call__(request)
+
+    def serve_media(self, request, path):
+        static_file = self.files.get(path)
+        if static_file is None:
+            static_file = self.find_file(path)
+            if static_file is None:
+                return self.get_response(request)
+            self.files[path] = static_file
+        try:
+            return self.serve(static_file, request)
+        except FileNotFoundError:
+            # Intussen verwijderd, bv. afbeelding vervangen in de admin
+            del self.files[path]
+            return self.get_response(request)
+
+    def add_cache_headers(self, headers, path, url):
+        if url.startswith(self.media_prefix):
+            name = url[len(self.media_prefix):]
+            if name.startswith(tuple(f'{directory}/' for directory in IMMUTABLE_MEDIA_DIRS)):
+                headers['Cache-Control'] = f'max-age={self.FOREVER}, public, immutable'
+            else:
+                headers['Cache-Control'] = f'max-age={self.media_max_age}, public'
+        else:
+            super().add_cache_headers(headers, path, url)
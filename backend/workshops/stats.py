@@ -0,0 +1,40 @@
+"""
+Site-brede statistieken (hero tellers) met caching
+
+De tellers worden samen berekend en in Django's cache framework bewaard.
+Signals in signals.py maken de cache ongeldig zodra een Workshop,
+Category, Review of Booking wijzigt.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Booking, Category, Review, Workshop
+
+
+SITE_STATS_CACHE_KEY = 'workshops:site_stats'
+
+
+def compute_site_stats():
+    """Bereken alle tellers (zonder cache)"""
+    workshop_stats = Workshop.objects.visible().aggregate(
+        total_workshops=Count('id'),
+        total_instructors=Count('instructor_name', distinct=True),
+    )
+    return {
+        **workshop_stats,
+        'total_categories': Category.objects.count(),
+        'total_reviews': Review.objects.filter(is_approved=True).count(),
+        'total_participants': Booking.objects.filter(status='confirmed').count(),
+    }
+
+
+def get_site_stats():
+    """Haal de tellers uit de cache, of bereken en bewaar ze"""
+    timeout = getattr(settings, 'SITE_STATS_CACHE_TIMEOUT', 300)
+    return cache.get_or_set(SITE_STATS_CACHE_KEY, compute_site_stats, timeout)
+
+
+def invalidate_site_stats():
+    """Verwijder de gecachte tellers, ze worden bij de volgende request herberekend"""
+    cache.delete(SITE_STATS_CACHE_KEY)
@@ -0,0 +1,85 @@
+"""
+Template tags voor responsive webinar afbeeldingen
+
+    {% load workshop_images %}
+    {% responsive_image workshop sizes="(min-width: 992px) 33vw, 100vw" css_class="workshop-card-img" %}
+    {% placeholder_image workshop 400 220 css_class="workshop-card-img" %}
+"""
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..images import FALLBACK_FORMAT, MIME_TYPES, preferred_formats, srcset
+from ..placeholders import placeholder_url
+
+
+register = template.Library()
+
+# Breedte van de src fallback voor browsers zonder srcset
+FALLBACK_WIDTH = 640
+
+
+@register.simple_tag
+def responsive_image(workshop, sizes='100vw', css_class='', loading='lazy', style=''):
+    """
+    <picture> met een srcset per formaat (AVIF/WebP, JPEG als fallback),
+    afmetingen tegen layout shift en de wazige placeholder als achtergrond.
+    Nog niet verwerkte afbeeldingen: het origineel; geen afbeelding: niets.
+    loading="eager" voor afbeeldingen boven de vouw (krijgt ook fetchpriority).
+    """
+    if not workshop.image:
+        return ''
+
+    priority = format_html(' fetchpriority="high"') if loading == 'eager' else ''
+    renditions = workshop.image_renditions or {}
+    fallback = renditions.get(FALLBACK_FORMAT)
+    if not fallback:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="{}" loading="{}" decoding="async"{}>',
+            workshop.image.url, workshop.title, css_class, style, loading, priority,
+        )
+
+    storage = workshop.image.storage
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (MIME_TYPES[file_format], srcset(renditions, file_format, storage), sizes)
+            for file_format in preferred_formats(renditions) if file_format != FALLBACK_FORMAT
+        ),
+    )
+    src = next((name for width, name in fallback if width >= FALLBACK_WIDTH), fallback[-1][1])
+    placeholder = ''
+    if workshop.image_placeholder:
+        placeholder = f'background: url({workshop.image_placeholder}) center / cover no-repeat; '
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" '
+        'class="{}" style="{}{}" loading="{}" decoding="async"{} '
+        'onload="this.style.backgroundImage=\'none\'"></picture>',
+        sources,
+        storage.url(src),
+        srcset(renditions, FALLBACK_FORMAT, storage),
+        sizes,
+        workshop.image_width,
+        workshop.image_height,
+        workshop.title,
+        css_class,
+        placeholder,
+        style,
+        loading,
+        priority,
+    )
+
+
+@register.simple_tag
+def placeholder_image(workshop, width, height, css_class='', loading='lazy', style=''):
+    """Lokale SVG placeholder (zie placeholders.py) voor een webinar zonder afbeelding"""
+    return format_html(
+        '<img src="{}" width="{}" height="{}" alt="{}" class="{}" style="{}" loading="{}" decoding="async">',
+        placeholder_url(workshop, width, height),
+        width,
+        height,
+        workshop.title,
+        css_class,
+        style,
+        loading,
+    )
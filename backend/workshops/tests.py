@@ -1,8 +1,44 @@
-from django.test import TestCase
+import csv
+import importlib
+import json
+import os
+import tempfile
+import zipfile
+from io import BytesIO, StringIO
+from xml.etree import ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipUnless
+from django.test import (
+    LiveServerTestCase, RequestFactory, TestCase, TransactionTestCase, override_settings,
+)
 from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Sum
+from django.template import Context, Origin, Template
+from django.templatetags.static import static
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils import timezone
-from datetime import timedelta
-from .models import Category, Workshop, Booking, Review
+from datetime import date, datetime, timedelta
+from PIL import Image
+from .models import (
+    Category, Workshop, Booking, Review, NewsletterSubscriber, InhouseTrainingPage, OutboxMessage,
+    NewsletterCampaign, CampaignDelivery,
+)
+from .cache import invalidate_page_cache, page_generation
+from .reservations import SeatsUnavailable, reserve_seats
+from .series import generate_series
+from .stats import get_site_stats
+from . import (
+    campaigns, conditional, exports, images, instrumentation, loadtest, outbox, placeholders, querylog,
+    segments, staticfiles, stats, views,
+)
 
 
 class CategoryModelTest(TestCase):
@@ -32,8 +68,6 @@ class WorkshopModelTest(TestCase):
             start_datetime=timezone.now() + timedelta(days=7),
             end_datetime=timezone.now() + timedelta(days=7, hours=3),
             duration_hours=3.0,
-            location='Test Locatie',
-            city='Gent',
             max_participants=10,
             min_participants=3,
             price=50.00,
@@ -72,7 +106,6 @@ class BookingModelTest(TestCase):
             start_datetime=timezone.now() + timedelta(days=7),
             end_datetime=timezone.now() + timedelta(days=7, hours=3),
             duration_hours=3.0,
-            location='Test Locatie',
             max_participants=10,
             price=50.00,
             instructor_name='Test Instructeur'
@@ -93,8 +126,1746 @@ class BookingModelTest(TestCase):
         self.assertEqual(self.booking.total_price, 100.00)
     
     def test_booking_reference_generated(self):
-        self.assertTrue(self.booking.booking_reference.startswith('WS'))
-        self.assertEqual(len(self.booking.booking_reference), 10)  # WS + 8 characters
+        self.assertTrue(self.booking.booking_reference.startswith('WB'))
+        self.assertEqual(len(self.booking.booking_reference), 10)  # WB + 8 characters
+
+
+class SeatCounterTest(TestCase):
+    def setUp(self):
+        self.workshop = Workshop.objects.create(
+            title='Teller Webinar',
+            slug='teller-webinar',
+            description='Webinar voor de plaatsenteller',
+            start_datetime=timezone.now() + timedelta(days=7),
+            end_datetime=timezone.now() + timedelta(days=7, hours=2),
+            duration_hours=2.0,
+            max_participants=10,
+            price=25.00,
+            instructor_name='Test Instructeur'
+        )
+
+    def make_booking(self, **kwargs):
+        data = {
+            'workshop': self.workshop,
+            'number_of_participants': 2,
+            'first_name': 'Test',
+            'last_name': 'User',
+            'email': 'test@example.com',
+            'phone': '0123456789',
+            'total_price': 50.00,
+        }
+        data.update(kwargs)
+        return Booking.objects.create(**data)
+
+    def test_confirmed_booking_increments_counter(self):
+        self.make_booking(status='confirmed', number_of_participants=3)
+        self.make_booking(status='pending')
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.confirmed_seats, 3)
+        # Openstaande boekingen houden ook plaatsen vast
+        self.assertEqual(self.workshop.available_spots, 5)
+
+    def test_status_and_size_changes_update_counter(self):
+        booking = self.make_booking(status='pending')
+        booking.status = 'confirmed'
+        booking.save()
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.confirmed_seats, 2)
+
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.number_of_participants = 5
+        booking.save()
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.confirmed_seats, 5)
+
+        booking.status = 'cancelled'
+        booking.save()
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.confirmed_seats, 0)
+
+    def test_delete_releases_seats(self):
+        booking = self.make_booking(status='confirmed', number_of_participants=4)
+        self.make_booking(status='confirmed', number_of_participants=1)
+        booking.delete()
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.confirmed_seats, 1)
+
+        Booking.objects.all().delete()
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.confirmed_seats, 0)
+
+    def test_available_spots_needs_no_queries(self):
+        self.make_booking(status='confirmed')
+        workshop = Workshop.objects.with_availability().get(pk=self.workshop.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(workshop.available_spots, 8)
+            self.assertFalse(workshop.is_full)
+
+    def test_rebuild_command_repairs_drift(self):
+        self.make_booking(status='confirmed', number_of_participants=3)
+        Workshop.objects.update(confirmed_seats=9)
+        call_command('rebuild_seat_counters', stdout=StringIO())
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.confirmed_seats, 3)
+
+
+def make_webinar(slug='reservatie-webinar', max_participants=10, **kwargs):
+    data = {
+        'title': 'Reservatie Webinar',
+        'slug': slug,
+        'description': 'Webinar voor reservaties',
+        'start_datetime': timezone.now() + timedelta(days=7),
+        'end_datetime': timezone.now() + timedelta(days=7, hours=2),
+        'duration_hours': 2.0,
+        'max_participants': max_participants,
+        'price': 25.00,
+        'instructor_name': 'Test Instructeur',
+    }
+    data.update(kwargs)
+    return Workshop.objects.create(**data)
+
+
+def new_booking(workshop, participants=1, email='test@example.com'):
+    return Booking(
+        workshop=workshop,
+        number_of_participants=participants,
+        first_name='Test',
+        last_name='User',
+        email=email,
+        phone='0123456789',
+        total_price=workshop.price * participants,
+    )
+
+
+class ReservationTest(TestCase):
+    def setUp(self):
+        self.workshop = make_webinar(max_participants=5)
+
+    def test_pending_bookings_hold_seats(self):
+        reserve_seats(new_booking(self.workshop, 3))
+        with self.assertRaises(SeatsUnavailable) as ctx:
+            reserve_seats(new_booking(self.workshop, 3))
+        self.assertEqual(ctx.exception.remaining, 2)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_last_seat_flips_status_to_full(self):
+        reserve_seats(new_booking(self.workshop, 5))
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.status, 'full')
+        with self.assertRaises(SeatsUnavailable):
+            reserve_seats(new_booking(self.workshop, 1))
+
+    def test_released_pending_seats_reopen_workshop(self):
+        booking = reserve_seats(new_booking(self.workshop, 5))
+        # Catalogus en reservatie tellen dezelfde plaatsen
+        self.assertEqual(Workshop.objects.with_availability().get(pk=self.workshop.pk).available_spots, 0)
+
+        booking.status = 'cancelled'
+        booking.save()
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.status, 'upcoming')
+        self.assertEqual(self.workshop.available_spots, 5)
+
+        booking = reserve_seats(new_booking(self.workshop, 5))
+        booking.delete()
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.status, 'upcoming')
+        reserve_seats(new_booking(self.workshop, 5))
+
+    def test_booking_view_creates_booking(self):
+        response = self.client.post(
+            reverse('workshops:workshop_booking', args=[self.workshop.slug]),
+            {
+                'name': 'Jan Janssens',
+                'email': 'jan@example.com',
+                'phone': '0470 12 34 56',
+                'num_participants': 2,
+                'accept_terms': 'on',
+            },
+        )
+        booking = Booking.objects.get()
+        self.assertRedirects(
+            response,
+            reverse('workshops:booking_confirmation', args=[booking.booking_reference]),
+        )
+        self.assertEqual(booking.status, 'pending')
+        self.assertEqual(booking.number_of_participants, 2)
+
+
+class BookingTransitionTest(TestCase):
+    def setUp(self):
+        self.workshop = make_webinar(max_participants=4)
+        self.other = make_webinar(slug='ander-webinar', max_participants=4)
+        self.untouched = make_webinar(slug='los-webinar', max_participants=4)
+        for i in range(4):
+            reserve_seats(new_booking(self.workshop, email=f'w{i}@example.com'))
+        reserve_seats(new_booking(self.other, email='o@example.com'))
+
+    def test_confirm_sets_timestamps_and_full_status(self):
+        updated = Booking.objects.filter(workshop=self.workshop).transition('confirmed')
+        self.assertEqual(updated, 4)
+        self.assertFalse(Booking.objects.filter(workshop=self.workshop, confirmed_at__isnull=True).exists())
+        self.workshop.refresh_from_db()
+        self.assertEqual((self.workshop.confirmed_seats, self.workshop.status), (4, 'full'))
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.confirmed_seats, self.other.status), (0, 'upcoming'))
+
+    def test_cancel_frees_seats_and_keeps_confirmed_at(self):
+        Booking.objects.filter(workshop=self.workshop).transition('confirmed')
+        booking = Booking.objects.filter(workshop=self.workshop).first()
+        confirmed_at = booking.confirmed_at
+        Booking.objects.filter(pk=booking.pk).transition('cancelled')
+        booking.refresh_from_db()
+        self.assertEqual((booking.status, booking.confirmed_at), ('cancelled', confirmed_at))
+        self.assertIsNotNone(booking.cancelled_at)
+        self.workshop.refresh_from_db()
+        self.assertEqual((self.workshop.confirmed_seats, self.workshop.status), (3, 'upcoming'))
+
+    def test_cancelled_webinar_keeps_its_status(self):
+        Workshop.objects.filter(pk=self.workshop.pk).update(status='cancelled')
+        Booking.objects.filter(workshop=self.workshop).transition('confirmed')
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.status, 'cancelled')
+
+    def test_transition_invalidates_caches_on_commit(self):
+        cache.clear()
+        get_site_stats()
+        generation = page_generation()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Booking.objects.filter(workshop=self.workshop).transition('confirmed')
+        self.assertIn(invalidate_page_cache, callbacks)
+        self.assertNotEqual(page_generation(), generation)
+        self.assertEqual(get_site_stats()['total_participants'], 4)
+
+        # Niets gewijzigd: geen invalidatie
+        with self.captureOnCommitCallbacks() as callbacks:
+            Booking.objects.filter(workshop=self.workshop).transition('confirmed')
+        self.assertEqual(callbacks, [])
+
+    def test_batches_use_constant_queries(self):
+        Booking.objects.bulk_create([
+            Booking(workshop=self.untouched, number_of_participants=1, first_name='B', last_name='B',
+                    email=f'b{i}@example.com', phone='0', total_price=1, booking_reference=f'BULK{i:05d}')
+            for i in range(2500)
+        ])
+        # savepoint, lock, pks, 3 batches, herberekening, release
+        with self.assertNumQueries(8):
+            updated = Booking.objects.filter(workshop=self.untouched).transition('confirmed', batch_size=1000)
+        self.assertEqual(updated, 2500)
+        self.untouched.refresh_from_db()
+        self.assertEqual((self.untouched.confirmed_seats, self.untouched.status), (2500, 'full'))
+
+    def test_admin_actions_use_transition(self):
+        self.client.force_login(User.objects.create_superuser('boeker', 'b@example.com', 'pass'))
+        pks = list(Booking.objects.filter(workshop=self.workshop).values_list('pk', flat=True))
+        self.client.post(reverse('admin:workshops_booking_changelist'),
+                         {'action': 'confirm_bookings', '_selected_action': pks})
+        self.workshop.refresh_from_db()
+        self.assertEqual(self.workshop.status, 'full')
+        self.client.post(reverse('admin:workshops_booking_changelist'),
+                         {'action': 'cancel_bookings', '_selected_action': pks[:1]})
+        self.workshop.refresh_from_db()
+        self.assertEqual((self.workshop.confirmed_seats, self.workshop.status), (3, 'upcoming'))
+
+
+@skipUnless(connection.features.has_select_for_update, 'Vereist row locking (PostgreSQL)')
+class ConcurrentReservationLoadTest(TransactionTestCase):
+    """Honderden gelijktijdige boekingen op een webinar met 50 plaatsen"""
+
+    attempts = 300
+    workers = 30
+
+    def test_no_overbooking_under_concurrency(self):
+        workshop = make_webinar(slug='drukke-webinar', max_participants=50)
+
+        def attempt(i):
+            try:
+                reserve_seats(new_booking(workshop, 1 + i % 2, email=f'user{i}@example.com'))
+                return True
+            except SeatsUnavailable:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(attempt, range(self.attempts)))
+
+        held = Booking.objects.filter(workshop=workshop).aggregate(
+            total=Sum('number_of_participants')
+        )['total']
+        workshop.refresh_from_db()
+        self.assertEqual(held, 50)
+        self.assertEqual(Booking.objects.count(), sum(results))
+        self.assertEqual(workshop.status, 'full')
+
+
+class CatalogueQuerysetTest(TestCase):
+    def test_with_availability_annotates_remaining_spots(self):
+        workshop = make_webinar(max_participants=4)
+        Booking.objects.create(
+            workshop=workshop, number_of_participants=3, first_name='A', last_name='B',
+            email='a@example.com', phone='0123', total_price=75, status='confirmed',
+        )
+        annotated = Workshop.objects.with_availability().get(pk=workshop.pk)
+        self.assertEqual(annotated.booked_seats, 3)
+        self.assertEqual(annotated.remaining_spots, 1)
+        self.assertEqual(annotated.available_spots, 1)
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_list_view_query_count_is_constant(self):
+        def render_list():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('workshops:workshop_list'))
+            self.assertEqual(response.status_code, 200)
+            return len(ctx.captured_queries)
+
+        InhouseTrainingPage.get_instance()
+        make_webinar(slug='webinar-0')
+        render_list()  # vult de stats en fragment caches
+        baseline = render_list()
+        for i in range(1, 12):
+            make_webinar(slug=f'webinar-{i}')
+        render_list()
+        self.assertEqual(render_list(), baseline)
+
+
+class WorkshopSearchTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Productiviteit', slug='productiviteit')
+        self.excel = make_webinar(
+            slug='chatgpt-excel', title='ChatGPT en Excel', category=self.category,
+            description='Formules en draaitabellen automatiseren met AI',
+        )
+        self.prompt = make_webinar(
+            slug='prompt-engineering', title='Prompt Engineering',
+            description='Betere prompts schrijven voor Excel en Word',
+        )
+
+    def test_search_vector_only_updated_for_indexed_fields(self):
+        workshop = Workshop.objects.get(pk=self.excel.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            workshop.featured = True
+            workshop.save()
+        updates = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        workshop.title = 'Automatiseren met Copilot'
+        workshop.save()
+        self.assertEqual(list(Workshop.objects.search('copilot')), [workshop])
+
+    def test_trigram_migration_survives_missing_privileges(self):
+        migration = importlib.import_module('workshops.migrations.0009_workshop_search_vector')
+        schema_editor = mock.Mock(connection=connection)
+        # Een geweigerde CREATE (hier een fout in de SQL) breekt de transactie niet af
+        schema_editor.execute.side_effect = lambda sql: connection.cursor().execute('CREATE EXTENSON pg_trgm')
+        migration.enable_trigram_search(None, schema_editor)
+        self.assertEqual(Workshop.objects.filter(pk=self.excel.pk).count(), 1)
+
+    def test_dutch_stemming_matches_word_forms(self):
+        results = Workshop.objects.search('automatisering')
+        self.assertEqual(list(results), [self.excel])
+
+    def test_title_ranks_above_description(self):
+        results = Workshop.objects.search('excel').order_by('-search_rank')
+        self.assertEqual(list(results), [self.excel, self.prompt])
+
+    def test_category_rename_updates_index(self):
+        self.category.name = 'Kantoortoepassingen'
+        self.category.save()
+        self.assertEqual(list(Workshop.objects.search('kantoortoepassingen')), [self.excel])
+
+    def test_list_view_orders_by_relevance(self):
+        response = self.client.get(reverse('workshops:workshop_list') + '?search=excel')
+        self.assertEqual(list(response.context['workshops']), [self.excel, self.prompt])
+
+
+class SiteStatsCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.workshop = make_webinar(instructor_name='Sofie')
+        make_webinar(slug='tweede-webinar', instructor_name='Sofie')
+
+    def test_stats_are_cached(self):
+        with self.assertNumQueries(4):
+            stats = get_site_stats()
+        self.assertEqual(stats['total_workshops'], 2)
+        self.assertEqual(stats['total_instructors'], 1)
+        with self.assertNumQueries(0):
+            get_site_stats()
+
+    def test_model_changes_invalidate_stats(self):
+        get_site_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Nieuw', slug='nieuw')
+        self.assertEqual(get_site_stats()['total_categories'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(
+                workshop=self.workshop, number_of_participants=1, first_name='A', last_name='B',
+                email='a@example.com', phone='0123', total_price=25, status='confirmed',
+            )
+        self.assertEqual(get_site_stats()['total_participants'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workshop.delete()
+        self.assertEqual(get_site_stats()['total_workshops'], 1)
+
+    def test_invalidation_waits_for_commit(self):
+        get_site_stats()
+        with self.captureOnCommitCallbacks() as callbacks:
+            reserve_seats(new_booking(self.workshop, 1))
+            # Binnen de transactie blijven de gecachte tellers staan
+            with self.assertNumQueries(0):
+                get_site_stats()
+        self.assertIn(stats.invalidate_site_stats, callbacks)
+        for callback in callbacks:
+            callback()
+        with self.assertNumQueries(4):
+            get_site_stats()
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        InhouseTrainingPage.get_instance()
+        self.workshop = make_webinar()
+        self.list_url = reverse('workshops:workshop_list')
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url)
+        self.assertContains(response, 'Reservatie Webinar')
+
+    def test_cache_key_uses_normalized_filters(self):
+        self.client.get(self.list_url + '?search=Excel&utm_source=mail')
+        with self.assertNumQueries(0):
+            self.client.get(self.list_url + '?search=++excel&page=1')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.list_url + '?search=excel&sort=price_low')
+        self.assertGreater(len(ctx.captured_queries), 0)
+
+    def test_model_changes_invalidate_pages(self):
+        self.client.get(self.list_url)
+        self.workshop.title = 'Nieuwe Titel'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workshop.save()
+        self.assertContains(self.client.get(self.list_url), 'Nieuwe Titel')
+
+    def test_invalidation_waits_for_commit(self):
+        generation = page_generation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            reserve_seats(new_booking(self.workshop, 1))
+            # Een request tijdens de transactie cachet onder de oude generatie
+            self.assertEqual(page_generation(), generation)
+        self.assertIn(invalidate_page_cache, callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(page_generation(), generation)
+
+    def test_review_actions_invalidate_after_commit(self):
+        user = User.objects.create_superuser('moderator', 'm@example.com', 'pass')
+        review = Review.objects.create(
+            workshop=self.workshop, user=user, rating=5, title='Top', comment='Goed', is_approved=False,
+        )
+        self.client.force_login(user)
+        generation = page_generation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(reverse('admin:workshops_review_changelist'),
+                             {'action': 'approve_reviews', '_selected_action': [review.pk]})
+            self.assertEqual(page_generation(), generation)
+        self.assertIn(invalidate_page_cache, callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(page_generation(), generation)
+
+    def test_requests_with_messages_bypass_cache(self):
+        self.client.get(self.list_url)
+        self.workshop.status = 'full'
+        self.workshop.save()
+        response = self.client.get(
+            reverse('workshops:workshop_booking', args=[self.workshop.slug]), follow=True
+        )
+        self.assertContains(response, 'volgeboekt')
+        # De pagina met het bericht mag niet in de cache terechtkomen
+        self.assertNotContains(self.client.get(response.request['PATH_INFO']), 'volgeboekt')
+
+    def test_authenticated_users_bypass_cache(self):
+        user = User.objects.create_user('lezer', password='pass')
+        self.client.force_login(user)
+        self.client.get(self.list_url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.list_url)
+        self.assertGreater(len(ctx.captured_queries), 0)
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        InhouseTrainingPage.get_instance()
+        self.category = Category.objects.create(name='Productiviteit', slug='productiviteit')
+        self.workshop = make_webinar(category=self.category, max_participants=10)
+        self.list_url = reverse('workshops:workshop_list')
+
+    def test_category_sidebar_skips_query_when_cached(self):
+        self.client.get(self.list_url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.list_url)
+        self.assertFalse(any('active_workshop_count' in q['sql'] for q in ctx.captured_queries))
+
+    def test_booking_refreshes_card_seat_count(self):
+        self.assertContains(self.client.get(self.list_url), '10 vrij')
+        Booking.objects.create(
+            workshop=self.workshop, number_of_participants=3, first_name='A', last_name='B',
+            email='a@example.com', phone='0123', total_price=75, status='confirmed',
+        )
+        self.assertContains(self.client.get(self.list_url), '7 vrij')
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_unknown_category_values_share_one_fragment(self):
+        def fragments():
+            return [key for key in cache._cache if 'template.cache.category_options' in key]
+
+        for value in ('', 'bestaat-niet', 'x' * 50, '%3Cscript%3E'):
+            self.client.get(self.list_url, {'category': value})
+        self.assertEqual(len(fragments()), 1)
+
+        response = self.client.get(self.list_url, {'category': 'productiviteit'})
+        self.assertRegex(response.content.decode(), r'value="productiviteit"\s+selected')
+        self.assertEqual(len(fragments()), 2)
+
+    def test_category_rename_refreshes_cards(self):
+        self.client.get(self.list_url)
+        self.category.name = 'Kantoor'
+        self.category.save()
+        self.assertContains(self.client.get(self.list_url), 'Kantoor')
+
+
+class InhouseTrainingPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_instance_is_served_without_queries(self):
+        page = InhouseTrainingPage.get_instance()
+        self.assertIn('Inhouse Trainingen op Maat', page.rendered_content)
+        with self.assertNumQueries(0):
+            self.assertEqual(InhouseTrainingPage.get_instance().banner_title, page.banner_title)
+
+    def test_shared_cache_serves_other_processes(self):
+        InhouseTrainingPage.get_instance()
+        InhouseTrainingPage._local = None  # ander proces: lege lokale kopie
+        with self.assertNumQueries(0):
+            InhouseTrainingPage.get_instance()
+
+    def test_admin_save_invalidates_instance(self):
+        page = InhouseTrainingPage.get_instance()
+        page.banner_title = 'Nieuwe banner'
+        page.content = '<h1>Nieuw</h1>'
+        with self.captureOnCommitCallbacks(execute=True):
+            page.save()
+            # Tot de COMMIT blijft de gecachte instance staan
+            self.assertIsNotNone(cache.get(InhouseTrainingPage.VERSION_CACHE_KEY))
+        self.assertIsNone(cache.get(InhouseTrainingPage.VERSION_CACHE_KEY))
+        fresh = InhouseTrainingPage.get_instance()
+        self.assertEqual(fresh.banner_title, 'Nieuwe banner')
+        self.assertEqual(fresh.rendered_content, '<h1>Nieuw</h1>')
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        InhouseTrainingPage.get_instance()
+        self.workshop = make_webinar()
+        self.list_url = reverse('workshops:workshop_list')
+        self.detail_url = reverse('workshops:workshop_detail', args=[self.workshop.slug])
+
+    def test_unchanged_pages_return_304(self):
+        for url in (self.list_url, self.detail_url, reverse('workshops:inhouse_training')):
+            response = self.client.get(url)
+            self.assertTrue(response.has_header('Last-Modified'))
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304, url)
+
+    def test_booking_changes_etag(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                workshop=self.workshop, number_of_participants=1, first_name='A', last_name='B',
+                email='a@example.com', phone='0123', total_price=25, status='confirmed',
+            )
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        etag = self.client.get(self.detail_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_filters_get_their_own_etag(self):
+        etag = self.client.get(self.list_url)['ETag']
+        response = self.client.get(self.list_url + '?sort=price_high', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_detail_validators_use_one_query(self):
+        request = RequestFactory().get(self.detail_url)
+        request.user = mock.Mock(is_authenticated=False)
+        request._messages = mock.MagicMock(__len__=lambda self: 0)
+        with self.assertNumQueries(1):
+            conditional.detail_etag(request, self.workshop.slug)
+            conditional.detail_last_modified(request, self.workshop.slug)
+
+    def test_validators_follow_related_content(self):
+        # Zonder COMMIT blijft het generatie token gelijk: enkel timestamps tellen
+        category = Category.objects.create(name='Kantoor', slug='kantoor')
+        Workshop.objects.filter(pk=self.workshop.pk).update(category=category)
+        related = make_webinar(slug='gerelateerd', category=category)
+        etag, _ = conditional._detail_validators(self.workshop.slug)
+        related.title = 'Nieuwe titel'
+        related.save()
+        changed, _ = conditional._detail_validators(self.workshop.slug)
+        self.assertNotEqual(changed, etag)
+        category.name = 'Bureau'
+        category.save()
+        self.assertNotEqual(conditional._detail_validators(self.workshop.slug)[0], changed)
+
+        request = RequestFactory().get(self.list_url)
+        etag, _ = conditional._catalogue_validators(request)
+        Workshop.objects.filter(pk=related.pk).adjust_confirmed_seats(1)
+        self.assertNotEqual(conditional._catalogue_validators(request)[0], etag)
+
+    def test_authenticated_users_get_no_validators(self):
+        self.client.force_login(User.objects.create_user('lezer', password='pass'))
+        self.assertFalse(self.client.get(self.detail_url).has_header('ETag'))
+
+
+class WebinarSeriesTest(TestCase):
+    def setUp(self):
+        self.source = make_webinar(
+            slug='excel-basis',
+            title='Excel basis',
+            start_datetime=timezone.make_aware(datetime(2026, 1, 31, 19, 0)),
+            end_datetime=timezone.make_aware(datetime(2026, 1, 31, 21, 0)),
+            meeting_url='https://teams.example.com/excel',
+            featured=True,
+        )
+        self.source.refresh_from_db()
+
+    def local_starts(self, sessions):
+        return [timezone.localtime(s.start_datetime) for s in sessions]
+
+    def test_series_is_one_insert(self):
+        with self.assertNumQueries(2):  # bezette slugs + INSERT
+            sessions = generate_series(self.source, 'weekly', 40)
+        self.assertEqual(len(sessions), 40)
+        self.assertEqual(Workshop.objects.filter(title=self.source.title).count(), 41)
+        copy = Workshop.objects.get(pk=sessions[0].pk)
+        self.assertEqual((copy.status, copy.featured, copy.meeting_url), ('upcoming', False, ''))
+        self.assertEqual(copy.end_datetime - copy.start_datetime, timedelta(hours=2))
+        self.assertEqual(Workshop.objects.search('excel').count(), 41)
+
+    def test_local_time_survives_daylight_saving(self):
+        starts = self.local_starts(generate_series(self.source, 'biweekly', 6))
+        self.assertEqual({start.hour for start in starts}, {19})
+        self.assertEqual(starts[0].date(), date(2026, 2, 14))
+
+    def test_monthly_clamps_to_end_of_month(self):
+        starts = self.local_starts(generate_series(self.source, 'monthly', 3))
+        self.assertEqual([s.date() for s in starts], [date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)])
+
+    def test_slugs_are_deterministic_and_unique(self):
+        first = generate_series(self.source, 'weekly', 2)
+        second = generate_series(self.source, 'weekly', 2)
+        self.assertEqual([w.slug for w in first], ['excel-basis-2026-02-07', 'excel-basis-2026-02-14'])
+        self.assertEqual([w.slug for w in second], ['excel-basis-2026-02-07-2', 'excel-basis-2026-02-14-2'])
+
+    def test_admin_actions(self):
+        self.client.force_login(User.objects.create_superuser('planner', 'p@example.com', 'pass'))
+        url = reverse('admin:workshops_workshop_changelist')
+        form = self.client.post(url, {'action': 'create_series', '_selected_action': [self.source.pk]})
+        self.assertContains(form, 'Reeks aanmaken')
+        self.client.post(url, {
+            'action': 'create_series', '_selected_action': [self.source.pk],
+            'apply': '1', 'rule': 'weekly', 'occurrences': 4,
+        })
+        self.assertEqual(Workshop.objects.count(), 5)
+        other = make_webinar(slug='word-basis')
+        self.client.post(url, {'action': 'duplicate_webinars', '_selected_action': [self.source.pk, other.pk]})
+        self.assertEqual(Workshop.objects.filter(title__endswith='(Kopie)').count(), 2)
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        NewsletterSubscriber.objects.bulk_create([
+            NewsletterSubscriber(email=f'lid{i}@example.com', first_name=f'Lid {i}', is_active=i % 2 == 0)
+            for i in range(300)
+        ])
+        workshop = make_webinar(title='Excel & "Macro\'s"')
+        reserve_seats(new_booking(workshop, 2, email='boeker@example.com'))
+
+    def read_xlsx(self, content):
+        with zipfile.ZipFile(BytesIO(content)) as workbook:
+            sheet = ElementTree.fromstring(workbook.read('xl/worksheets/sheet1.xml'))
+        ns = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        return [
+            [''.join(cell.itertext()) for cell in row.findall('x:c', ns)]
+            for row in sheet.iterfind('.//x:row', ns)
+        ]
+
+    def test_csv_streams_in_chunks(self):
+        spec = exports.EXPORTS['newsletter']
+        with mock.patch.object(exports, 'FLUSH_SIZE', 1024):
+            chunks = list(exports.export_chunks(NewsletterSubscriber.objects.all(), spec, ['email', 'is_active']))
+        self.assertGreater(len(chunks), 5)
+        lines = b''.join(chunks).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], 'E-mailadres;Actief')
+        self.assertEqual(lines[1], 'lid0@example.com;ja')
+        self.assertEqual(len(lines), 301)
+
+    def test_xlsx_export(self):
+        spec = exports.EXPORTS['bookings']
+        content = b''.join(exports.export_chunks(
+            Booking.objects.all(), spec, ['workshop', 'number_of_participants', 'status'], 'xlsx',
+        ))
+        self.assertEqual(self.read_xlsx(content), [
+            ['Webinar', 'Deelnemers', 'Status'],
+            ['Excel & "Macro\'s"', '2', 'pending'],
+        ])
+
+    def test_csv_neutralises_formulas(self):
+        Booking.objects.update(first_name='=HYPERLINK("http://evil.example","klik")', phone='+32 470 12 34 56')
+        spec = exports.EXPORTS['bookings']
+        content = b''.join(exports.export_chunks(
+            Booking.objects.all(), spec, ['first_name', 'phone', 'number_of_participants'],
+        )).decode('utf-8-sig')
+        row = next(csv.reader(content.splitlines()[1:], delimiter=';'))
+        self.assertEqual(row, ['\'=HYPERLINK("http://evil.example","klik")', "'+32 470 12 34 56", '2'])
+
+        # XLSX cellen zijn inline tekst, daar wordt niets uitgevoerd
+        content = b''.join(exports.export_chunks(Booking.objects.all(), spec, ['first_name'], 'xlsx'))
+        self.assertEqual(self.read_xlsx(content)[1], ['=HYPERLINK("http://evil.example","klik")'])
+
+    def test_admin_action_streams_selected_columns(self):
+        self.client.force_login(User.objects.create_superuser('export', 'e@example.com', 'pass'))
+        url = reverse('admin:workshops_newslettersubscriber_changelist')
+        pks = list(NewsletterSubscriber.objects.values_list('pk', flat=True)[:3])
+        form = self.client.post(url, {'action': 'export_selected', '_selected_action': pks})
+        self.assertContains(form, 'Exporteren')
+        response = self.client.post(url, {
+            'action': 'export_selected', '_selected_action': pks, 'apply': '1',
+            'columns': ['first_name', 'email'], 'file_format': 'csv',
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="nieuwsbrief-', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], 'E-mailadres;Voornaam')
+        self.assertEqual(len(lines), 4)
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('export_data', 'newsletter', '--active-only', '--columns', 'email', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 151)
+        with self.assertRaises(CommandError):
+            call_command('export_data', 'bookings', '--columns', 'onbekend', stdout=StringIO())
+
+
+class PopulateCommandTest(TestCase):
+    def populate(self, *args):
+        call_command('populate_data', *args, stdout=StringIO())
+
+    def counts(self):
+        return [model.objects.count() for model in (Category, Workshop, User, Booking, Review)]
+
+    def test_populate_data_is_idempotent(self):
+        self.populate()
+        first = self.counts()
+        self.populate()
+        self.assertEqual(self.counts(), first)
+        self.assertEqual(first[:3], [7, 10, 6])
+        self.assertEqual(Workshop.objects.filter(status='completed').count(), 4)
+        self.assertTrue(Workshop.objects.search('copilot').exists())
+        for workshop in Workshop.objects.all():
+            confirmed = workshop.bookings.filter(status='confirmed').aggregate(
+                total=Sum('number_of_participants'))['total'] or 0
+            self.assertEqual(workshop.confirmed_seats, confirmed)
+
+    def test_scale_adds_synthetic_data_in_batches(self):
+        with CaptureQueriesContext(connection) as small:
+            self.populate()
+        base_bookings = Booking.objects.count()
+        with CaptureQueriesContext(connection) as large:
+            self.populate('--scale', '4')
+        self.assertEqual(Workshop.objects.count(), 40)
+        self.assertEqual(Booking.objects.count(), base_bookings + 30 * 100)
+        self.assertLess(len(large), len(small) + 10)
+
+    def test_populate_newsletter(self):
+        call_command('populate_newsletter', stdout=StringIO())
+        call_command('populate_newsletter', '--scale', '3', stdout=StringIO())
+        self.assertEqual(NewsletterSubscriber.objects.count(), 8 + 200)
+        self.assertEqual(NewsletterSubscriber.objects.get(email='pieter.claes@skynet.be').is_active, False)
+
+
+@skipUnless(connection.features.has_select_for_update, 'Vereist row locking (PostgreSQL)')
+class LoadTestCommandTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.webinars = [make_webinar(slug=f'load-{i}', max_participants=50) for i in range(2)]
+
+    def test_report_and_cleanup(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'loadtest.json')
+            out = StringIO()
+            call_command('loadtest', '-c', '3', '-n', '2', '--output', path, stdout=out)
+            with open(path) as handle:
+                report = json.load(handle)
+            call_command('loadtest', '-c', '1', '-n', '1', '--compare', path, stdout=out)
+        self.assertEqual(report['totals']['funnels_completed'], 6)
+        for endpoint in loadtest.FUNNEL:
+            data = report['endpoints'][endpoint]
+            self.assertEqual(data['requests'], 6)
+            self.assertEqual(set(data['latency_ms']), {'p50', 'p95', 'p99', 'mean', 'max'})
+            self.assertGreater(data['queries']['mean'], 0)
+        self.assertEqual(report['endpoints']['booking_post']['status_codes'], {'302': 6})
+        self.assertIn('Vergelijking', out.getvalue())
+        # Testboekingen en hun outbox mails worden opgeruimd en de tellers kloppen weer
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(OutboxMessage.objects.exists())
+        self.assertEqual(Workshop.objects.filter(status='full').count(), 0)
+
+    def test_persistent_connections_are_reused(self):
+        slugs = [webinar.slug for webinar in self.webinars]
+        # Alle threads delen dezelfde settings_dict van de 'default' connectie
+        with mock.patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 0}):
+            fresh = loadtest.run_load_test(concurrency=2, iterations=2, slugs=slugs, warmup=0)
+        with mock.patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 60}):
+            reused = loadtest.run_load_test(concurrency=2, iterations=2, slugs=slugs, warmup=0)
+        loadtest.cleanup_bookings()
+        self.assertEqual(fresh['meta']['conn_max_age'], 0)
+        # Zonder hergebruik een connectie per request met queries, anders één per thread
+        self.assertGreater(fresh['totals']['connections_opened'], 10)
+        self.assertEqual(reused['totals']['connections_opened'], 2)
+        self.assertRegex(loadtest.compare_reports(fresh, reused)[0], r'connecties \d+ -> 2$')
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual([loadtest.percentile(values, p) for p in (50, 95, 99)], [50, 95, 99])
+        self.assertEqual(loadtest.percentile([7], 99), 7)
+
+
+class HttpLoadTest(LiveServerTestCase):
+    def setUp(self):
+        cache.clear()
+        self.webinar = make_webinar(slug='http-load', max_participants=50)
+
+    def test_funnel_over_http(self):
+        report = loadtest.run_load_test(
+            concurrency=2, iterations=1, slugs=[self.webinar.slug], warmup=0,
+            base_url=self.live_server_url,
+        )
+        loadtest.cleanup_bookings()
+        self.assertEqual(report['meta']['target'], self.live_server_url)
+        self.assertEqual(report['totals']['funnels_completed'], 2)
+        self.assertEqual(report['endpoints']['booking_post']['status_codes'], {'302': 2})
+        # Queries en connecties gebeuren in het server proces
+        self.assertIsNone(report['endpoints']['detail']['queries'])
+        self.assertIsNone(report['totals']['connections_opened'])
+        self.assertIn('queries ? -> ?', loadtest.compare_reports(report, report)[1])
+
+
+@override_settings(PERF_SAMPLE_RATE=1)
+class PerformanceInstrumentationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        InhouseTrainingPage.get_instance()
+        instrumentation.registry.reset()
+        self.workshop = make_webinar()
+        self.list_url = reverse('workshops:workshop_list')
+
+    def timing(self, response):
+        return dict(
+            (part.split(';')[0], part) for part in response['Server-Timing'].split(', ')
+        )
+
+    def test_server_timing_header(self):
+        timing = self.timing(self.client.get(self.list_url))
+        self.assertRegex(timing['sql'], r'sql;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertNotEqual(timing['tpl'], 'tpl;dur=0.0;desc="templates"')
+        # Tweede keer uit de page cache: geen queries, wel cache hits
+        timing = self.timing(self.client.get(self.list_url))
+        self.assertIn('desc="0 queries"', timing['sql'])
+        self.assertNotIn('desc="0 hits', timing['cache'])
+
+    def test_registry_collects_views_and_queries(self):
+        for _ in range(3):
+            self.client.get(reverse('workshops:workshop_detail', args=[self.workshop.slug]))
+        report = instrumentation.registry.snapshot()
+        views = {row['view']: row for row in report['views']}
+        detail = views['workshops:workshop_detail']
+        self.assertEqual(detail['requests'], 3)
+        self.assertEqual(sum(detail['histogram'].values()), 3)
+        self.assertTrue(report['slow_queries'])
+
+    def test_report_is_staff_only(self):
+        url = reverse('workshops:performance_report')
+        self.client.get(self.list_url)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user('staff', password='pass', is_staff=True))
+        report = self.client.get(url).json()
+        self.assertIn('workshops:workshop_list', [row['view'] for row in report['views']])
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_disabled_by_default(self):
+        self.assertFalse(self.client.get(self.list_url).has_header('Server-Timing'))
+
+
+class QueryInspectionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        InhouseTrainingPage.get_instance()
+        self.workshop = make_webinar()
+        self.list_url = reverse('workshops:workshop_list')
+
+    def inspect(self, **thresholds):
+        inspector = querylog.QueryInspector(**{
+            'slow_ms': 10_000, 'duplicate_threshold': 2, 'similar_threshold': 3, **thresholds,
+        })
+        self.enterContext(connection.execute_wrapper(inspector))
+        return inspector
+
+    def test_duplicate_and_similar_queries(self):
+        inspector = self.inspect()
+        for _ in range(2):
+            list(Workshop.objects.filter(pk=self.workshop.pk))
+        for pk in range(3):
+            list(Category.objects.filter(pk=pk))
+        findings = {f['event']: f for f in inspector.findings('test')}
+        self.assertEqual(set(findings), {'duplicate_query', 'similar_query'})
+        self.assertEqual(findings['duplicate_query']['count'], 2)
+        self.assertEqual(findings['similar_query']['count'], 3)
+        self.assertIn('workshops_category', findings['similar_query']['sql'])
+        self.assertRegex(
+            findings['duplicate_query']['origin'],
+            r'^workshops/tests\.py:\d+ test_duplicate_and_similar_queries$',
+        )
+
+    def test_origin_includes_rendering_template(self):
+        inspector = self.inspect(slow_ms=0)
+        template = Template(
+            '{% for workshop in workshops %}{{ workshop.category.name }}{% endfor %}',
+            origin=Origin('test', template_name='workshops/test_lijst.html'),
+        )
+        template.render(Context({'workshops': Workshop.objects.all()}))
+        self.assertTrue(inspector.slow)
+        self.assertEqual(
+            {record['template'] for record in inspector.slow}, {'workshops/test_lijst.html'}
+        )
+        self.assertTrue(all(
+            record['origin'].startswith('workshops/tests.py:') for record in inspector.slow
+        ))
+
+    @override_settings(QUERY_INSPECTION=True, SLOW_QUERY_MS=0)
+    def test_middleware_logs_findings(self):
+        with self.assertLogs('workshops.queries', 'WARNING') as logs:
+            self.client.get(self.list_url)
+        records = [json.loads(line.split(':', 2)[2]) for line in logs.output]
+        self.assertIn('slow_query', {record['event'] for record in records})
+        self.assertTrue(all(record['view'] == 'workshops:workshop_list' for record in records))
+        self.assertTrue(all(record['queries_in_request'] >= 1 for record in records))
+
+    def test_disabled_by_default(self):
+        with self.assertNoLogs('workshops.queries'):
+            self.client.get(self.list_url)
+
+    def test_report_summarizes_log(self):
+        records = [
+            {'event': 'slow_query', 'view': 'a', 'origin': 'x', 'sql': 'SELECT 1', 'duration_ms': 120.0},
+            {'event': 'slow_query', 'view': 'a', 'origin': 'x', 'sql': 'SELECT 1', 'duration_ms': 180.0},
+            {'event': 'similar_query', 'view': 'b', 'origin': 'y', 'sql': 'SELECT 2', 'count': 40,
+             'total_ms': 20.0},
+        ]
+        lines = ['2026-01-01 10:00:00,000 ' + json.dumps(record) for record in records]
+        lines.append('geen json')
+        groups = querylog.summarize(lines)
+        self.assertEqual([group['sql'] for group in groups], ['SELECT 1', 'SELECT 2'])
+        self.assertEqual(groups[0]['occurrences'], 2)
+        self.assertEqual(groups[0]['total_ms'], 300.0)
+        self.assertEqual(groups[0]['max_ms'], 180.0)
+        self.assertEqual(groups[1]['queries'], 40)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False) as handle:
+            handle.write('\n'.join(lines))
+        self.addCleanup(os.remove, handle.name)
+        out = StringIO()
+        call_command('query_report', handle.name, '--json', stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), groups)
+        with self.assertRaises(CommandError):
+            call_command('query_report', handle.name + '.ontbreekt')
+
+
+class StaticFilesTest(TestCase):
+    def setUp(self):
+        self.media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root, MEDIA_CACHE_MAX_AGE=3600))
+        self.write_media('workshops/poster.png', b'png')
+
+    def write_media(self, name, content):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as handle:
+            handle.write(content)
+        return path
+
+    def test_media_is_served_with_cache_headers(self):
+        response = self.client.get('/media/workshops/poster.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'png')
+        self.assertEqual(response['Cache-Control'], 'max-age=3600, public')
+
+        # Uploads na het opstarten worden gevonden, verwijderde niet meer
+        self.write_media('workshops/nieuw.png', b'new')
+        self.assertEqual(self.client.get('/media/workshops/nieuw.png').status_code, 200)
+        os.remove(os.path.join(self.media_root, 'workshops/poster.png'))
+        self.assertEqual(self.client.get('/media/workshops/poster.png').status_code, 404)
+        self.assertEqual(self.client.get('/media/../config/settings.py').status_code, 404)
+
+    def test_compressed_manifest_assets(self):
+        static_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(
+            DEBUG=False,
+            STATIC_ROOT=static_root,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+            },
+        ))
+        call_command('collectstatic', interactive=False, verbosity=0)
+        url = static('workshops/css/style.css')
+        self.assertRegex(url, r'/static/workshops/css/style\.[0-9a-f]{12}\.css$')
+        self.assertTrue(os.path.exists(os.path.join(static_root, url[len('/static/'):] + '.gz')))
+
+        middleware = staticfiles.StaticFilesMiddleware(lambda request: None)
+        request = RequestFactory().get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        response = middleware(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    @override_settings(APP_SERVER='gunicorn')
+    def test_serve_command_starts_gunicorn(self):
+        shared = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': self.media_root,
+        }}
+        with override_settings(CACHES=shared), mock.patch('os.execv') as execv:
+            call_command('serve', '--skip-collectstatic', '--workers', '3', stdout=StringIO())
+        command = execv.call_args[0][1]
+        self.assertEqual(command[1:4], ['-m', 'gunicorn', 'config.wsgi:application'])
+        self.assertEqual(command[-2:], ['--workers', '3'])
+        self.assertTrue(command[command.index('--config') + 1].endswith('gunicorn.conf.py'))
+
+    @override_settings(APP_SERVER='gunicorn')
+    def test_serve_command_requires_shared_cache_for_workers(self):
+        # De test settings gebruiken de lokale memory cache
+        with mock.patch('os.execv') as execv:
+            with self.assertRaises(ImproperlyConfigured):
+                call_command('serve', '--skip-collectstatic', '--workers', '2', stdout=StringIO())
+            execv.assert_not_called()
+            call_command('serve', '--skip-collectstatic', '--workers', '1', stdout=StringIO())
+            execv.assert_called_once()
+
+    @override_settings(APP_SERVER='uwsgi')
+    def test_serve_command_rejects_unknown_server(self):
+        with self.assertRaises(CommandError):
+            call_command('serve')
+
+
+class ImageRenditionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        InhouseTrainingPage.get_instance()
+        self.media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+
+    def upload(self, size=(1000, 600), mode='RGB', file_format='PNG'):
+        buffer = BytesIO()
+        Image.effect_noise(size, 60).convert(mode).save(buffer, file_format)
+        return SimpleUploadedFile(f'poster.{file_format.lower()}', buffer.getvalue())
+
+    def test_upload_builds_renditions(self):
+        upload = self.upload()
+        content = upload.read()
+        workshop = make_webinar(image=upload)
+        self.assertEqual((workshop.image_width, workshop.image_height), (1000, 600))
+        self.assertTrue(workshop.image_placeholder.startswith('data:image/jpeg;base64,'))
+        self.assertLess(len(workshop.image_placeholder), 1000)
+
+        workshop.refresh_from_db()
+        renditions = workshop.image_renditions
+        self.assertEqual(images.preferred_formats(renditions)[-1], 'jpeg')
+        self.assertEqual([width for width, _ in renditions['jpeg']], [320, 480, 640, 960, 1000])
+        # Het origineel is gewoon bewaard, de renditions zijn veel kleiner
+        original = workshop.image.size
+        card = [name for width, name in renditions['jpeg'] if width == 480][0]
+        self.assertLess(workshop.image.storage.size(card) * 3, original)
+        with Image.open(workshop.image.storage.path(card)) as image:
+            self.assertEqual(image.size, (480, 288))
+
+        # Zelfde inhoud: dezelfde renditions, niets opnieuw weggeschreven
+        again = make_webinar(slug='kopie', image=SimpleUploadedFile('ander.png', content))
+        self.assertEqual(again.image_renditions, renditions)
+
+    def test_small_and_transparent_images(self):
+        workshop = make_webinar(image=self.upload(size=(300, 200), mode='RGBA'))
+        self.assertEqual(
+            {file_format: [w for w, _ in sizes] for file_format, sizes in workshop.image_renditions.items()},
+            {file_format: [300] for file_format in images.rendition_formats()},
+        )
+
+    def test_other_saves_and_removal(self):
+        workshop = make_webinar(image=self.upload())
+        with mock.patch.object(images, 'build_renditions') as build:
+            workshop.title = 'Nieuwe titel'
+            workshop.save()
+            build.assert_not_called()
+        workshop.image = None
+        workshop.save(update_fields=['image'])
+        workshop.refresh_from_db()
+        self.assertEqual(workshop.image_renditions, {})
+        self.assertIsNone(workshop.image_width)
+
+    def test_replaced_renditions_are_deleted_on_commit(self):
+        content = self.upload().read()
+        workshop = make_webinar(image=SimpleUploadedFile('poster.png', content))
+        shared = make_webinar(slug='zelfde-poster', image=SimpleUploadedFile('kopie.png', content))
+        old = os.path.join(self.media_root, *images.rendition_dirs(workshop.image_renditions).pop().split('/'))
+        with self.captureOnCommitCallbacks(execute=True):
+            workshop.image = self.upload()
+            workshop.save()
+            self.assertTrue(os.listdir(old))
+        # Nog in gebruik door een andere webinar
+        self.assertTrue(os.listdir(old))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            shared.image = None
+            shared.save()
+        self.assertFalse(os.path.exists(old))
+        new = images.rendition_dirs(workshop.image_renditions).pop()
+        self.assertTrue(os.listdir(os.path.join(self.media_root, *new.split('/'))))
+
+    def test_template_tag(self):
+        workshop = make_webinar(image=self.upload())
+        html = Template(
+            '{% load workshop_images %}{% responsive_image workshop sizes="50vw" css_class="kaart" %}'
+        ).render(Context({'workshop': workshop}))
+        self.assertIn('<picture>', html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('width="1000" height="600"', html)
+        self.assertRegex(html, r'srcset="/media/workshops/renditions/\w+/320w\.jpg 320w, ')
+        self.assertIn('background: url(data:image/jpeg;base64,', html)
+        if 'webp' in images.rendition_formats():
+            self.assertIn('<source type="image/webp"', html)
+
+        # Nog niet verwerkt: origineel, zonder afbeelding: niets
+        workshop.image_renditions = {}
+        html = Template(
+            '{% load workshop_images %}{% responsive_image workshop loading="eager" %}'
+        ).render(Context({'workshop': workshop}))
+        self.assertIn(f'src="{workshop.image.url}"', html)
+        self.assertIn('fetchpriority="high"', html)
+        workshop.image = None
+        self.assertEqual(Template(
+            '{% load workshop_images %}{% responsive_image workshop %}'
+        ).render(Context({'workshop': workshop})), '')
+
+    def test_catalogue_uses_renditions(self):
+        workshop = make_webinar(image=self.upload())
+        response = self.client.get(reverse('workshops:workshop_list'))
+        self.assertContains(response, '/media/workshops/renditions/')
+        self.assertNotContains(response, f'src="{workshop.image.url}"')
+
+    def test_backfill_command(self):
+        workshop = make_webinar(image=self.upload())
+        Workshop.objects.filter(pk=workshop.pk).update(image_renditions={}, image_width=None)
+        out = StringIO()
+        call_command('build_image_renditions', stdout=out)
+        workshop.refresh_from_db()
+        self.assertEqual(workshop.image_width, 1000)
+        self.assertTrue(workshop.image_renditions)
+        self.assertIn('1 webinar(s)', out.getvalue())
+        # Al verwerkt: niets te doen
+        call_command('build_image_renditions', stdout=out)
+        self.assertIn('voor 0 webinar(s)', out.getvalue())
+
+
+class PlaceholderImageTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        InhouseTrainingPage.get_instance()
+        self.media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+        self.category = Category.objects.create(name='Data & AI', slug='data-ai', icon='bi-cpu')
+        self.workshop = make_webinar(title='Excel <macro\'s> voor beginners', category=self.category)
+
+    def test_url_follows_content(self):
+        url = placeholders.placeholder_url(self.workshop, 400, 220)
+        self.assertRegex(url, rf'/workshop/{self.workshop.pk}/placeholder/400x220/[0-9a-f]{{16}}\.svg$')
+        svg = self.client.get(url).content.decode()
+        root = ElementTree.fromstring(svg)
+        self.assertEqual(root.get('width'), '400')
+        self.assertIn('Excel &lt;macro\'s&gt;', svg)
+        self.assertIn('DATA &amp; AI', svg)
+        for colour in placeholders.colours_for(self.category):
+            self.assertIn(colour, svg)
+
+        # Zelfde inhoud: zelfde URL; andere titel of grootte: nieuwe URL
+        self.assertEqual(placeholders.placeholder_url(self.workshop, 400, 220), url)
+        self.assertNotEqual(placeholders.placeholder_url(self.workshop, 800, 450), url)
+        self.workshop.title = 'Andere titel'
+        self.workshop.save()
+        current = placeholders.placeholder_url(self.workshop, 400, 220)
+        self.assertNotEqual(current, url)
+        # Een onbekende of verouderde digest verwijst door naar de huidige URL
+        stale = url.rsplit('/', 1)[0] + '/' + '0' * 16 + '.svg'
+        self.assertRedirects(self.client.get(stale), current)
+
+    def test_view_is_cached_and_immutable(self):
+        url = placeholders.placeholder_url(self.workshop, 800, 450)
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(url.replace('800x450', '4000x4000')).status_code, 404)
+
+    def test_rendering_writes_nothing_to_storage(self):
+        url = reverse('workshops:workshop_detail', args=[self.workshop.slug])
+        with mock.patch.object(default_storage, 'exists') as exists, \
+                mock.patch.object(default_storage, 'save') as save:
+            self.assertContains(self.client.get(url), '/placeholder/800x450/')
+            self.assertContains(self.client.get(reverse('workshops:workshop_list')), '/placeholder/400x220/')
+        exists.assert_not_called()
+        save.assert_not_called()
+
+    def test_colours_follow_category_icon(self):
+        same_icon = Category(name='Andere', slug='andere', icon='bi-cpu')
+        self.assertEqual(placeholders.colours_for(same_icon), placeholders.colours_for(self.category))
+        self.assertEqual(placeholders.colours_for(None), placeholders.BRAND_COLOURS)
+
+    def test_long_titles_are_wrapped(self):
+        lines = placeholders.wrap(' '.join(['woord'] * 40), 20)
+        self.assertEqual(len(lines), placeholders.MAX_LINES)
+        self.assertTrue(lines[-1].endswith('…'))
+        self.assertTrue(all(len(line) <= 20 for line in lines))
+
+    def test_pages_use_local_placeholder(self):
+        for url in (
+            reverse('workshops:workshop_list'),
+            reverse('workshops:workshop_detail', args=[self.workshop.slug]),
+        ):
+            response = self.client.get(url)
+            self.assertNotContains(response, 'via.placeholder.com')
+            self.assertContains(response, f'/workshop/{self.workshop.pk}/placeholder/')
+
+
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.workshop = make_webinar(max_participants=5)
+
+    def book(self, participants=2):
+        return self.client.post(
+            reverse('workshops:workshop_booking', args=[self.workshop.slug]),
+            {
+                'name': 'Jan Janssens',
+                'email': 'jan@example.com',
+                'phone': '0470 12 34 56',
+                'num_participants': participants,
+                'accept_terms': 'on',
+            },
+        )
+
+    def test_booking_writes_outbox_without_sending(self):
+        self.book()
+        booking = Booking.objects.get()
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.booking, booking)
+        self.assertEqual(message.to, 'jan@example.com')
+        self.assertEqual(message.status, 'pending')
+        self.assertIn(booking.booking_reference, message.subject)
+        self.assertIn(self.workshop.title, message.body)
+        self.assertEqual(mail.outbox, [])
+
+    def test_failed_reservation_leaves_no_message(self):
+        self.book(participants=5)
+        self.book(participants=1)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_drain_sends_batches_over_one_connection(self):
+        for i in range(5):
+            reserve_seats(new_booking(self.workshop, 1))
+        for booking in Booking.objects.all():
+            outbox.enqueue_booking_received(booking)
+
+        backend = mail.get_connection()
+        with mock.patch.object(backend, 'open', wraps=backend.open) as opened:
+            self.assertEqual(outbox.drain(limit=2, connection=backend), (5, 0))
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(OutboxMessage.objects.exclude(status='sent').exists())
+        self.assertFalse(OutboxMessage.objects.filter(sent_at__isnull=True).exists())
+        # Niets meer te doen
+        self.assertEqual(outbox.drain(), (0, 0))
+
+    def test_failures_back_off_and_give_up(self):
+        message = outbox.enqueue('test', 'jan@example.com', 'Onderwerp', 'Tekst')
+        backend = mail.get_connection()
+        failing = mock.patch.object(backend, 'send_messages', side_effect=OSError('Connection refused'))
+
+        with failing:
+            self.assertEqual(outbox.drain(connection=backend, attempts_allowed=2), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'pending')
+        self.assertEqual(message.attempts, 1)
+        self.assertIn('Connection refused', message.last_error)
+        self.assertGreater(message.available_at, timezone.now() + timedelta(seconds=30))
+
+        # Nog niet aan de beurt
+        self.assertEqual(outbox.drain(connection=backend), (0, 0))
+
+        OutboxMessage.objects.update(available_at=timezone.now())
+        with failing:
+            outbox.drain(connection=backend, attempts_allowed=2)
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'failed')
+        self.assertEqual(message.attempts, 2)
+
+        self.assertEqual(outbox.retry_delay(1), timedelta(seconds=outbox.RETRY_BASE_SECONDS))
+        self.assertEqual(outbox.retry_delay(2), timedelta(seconds=outbox.RETRY_BASE_SECONDS * 2))
+        self.assertEqual(outbox.retry_delay(30), timedelta(seconds=outbox.RETRY_MAX_SECONDS))
+
+    def test_failure_reopens_connection_for_next_message(self):
+        for i in range(3):
+            outbox.enqueue('test', f'persoon{i}@example.com', 'Onderwerp', 'Tekst')
+        backend = mail.get_connection()
+        send = backend.send_messages
+        calls = []
+
+        def flaky(messages):
+            calls.append(messages[0].to[0])
+            if len(calls) == 1:
+                raise OSError('Server disconnected')
+            return send(messages)
+
+        with mock.patch.object(backend, 'send_messages', side_effect=flaky), \
+                mock.patch.object(backend, 'open', wraps=backend.open) as opened:
+            self.assertEqual(outbox.drain(connection=backend), (2, 1))
+        self.assertEqual(opened.call_count, 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_command_once(self):
+        self.book()
+        out = StringIO()
+        call_command('process_outbox', '--once', stdout=out)
+        self.assertIn('1 verzonden', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['jan@example.com'])
+        self.assertEqual(OutboxMessage.objects.get().status, 'sent')
+
+
+class NewsletterCampaignTest(TestCase):
+    def setUp(self):
+        NewsletterSubscriber.objects.bulk_create([
+            NewsletterSubscriber(
+                email=f'lezer{i}@example.com', first_name=f'Lezer{i}', last_name='Test',
+                is_active=True, confirmed=True,
+            )
+            for i in range(23)
+        ] + [
+            NewsletterSubscriber(email='inactief@example.com', is_active=False, confirmed=True),
+            NewsletterSubscriber(email='onbevestigd@example.com', is_active=True, confirmed=False),
+        ])
+        self.campaign = NewsletterCampaign.objects.create(
+            name='Maart', subject='Nieuws voor {{ first_name }}', body='Dag {{ name }} ({{ email }})',
+        )
+
+    def test_sends_personalised_mail_to_active_confirmed_subscribers(self):
+        campaigns.send_campaign(self.campaign, size=5, rate=0, connections=3)
+        self.assertEqual(len(mail.outbox), 23)
+        recipients = sorted(message.to[0] for message in mail.outbox)
+        self.assertNotIn('inactief@example.com', recipients)
+        self.assertNotIn('onbevestigd@example.com', recipients)
+        message = next(m for m in mail.outbox if m.to == ['lezer3@example.com'])
+        self.assertEqual(message.subject, 'Nieuws voor Lezer3')
+        self.assertEqual(message.body, 'Dag Lezer3 Test (lezer3@example.com)')
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sent')
+        self.assertEqual((self.campaign.sent_count, self.campaign.failed_count), (23, 0))
+        self.assertEqual(self.campaign.deliveries.filter(status='sent').count(), 23)
+        self.assertIsNotNone(self.campaign.finished_at)
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        def interrupt(campaign):
+            if campaign.sent_count >= 10:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            campaigns.send_campaign(self.campaign, size=5, rate=0, progress=interrupt)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sending')
+        self.assertEqual(self.campaign.sent_count, 10)
+        self.assertEqual(len(mail.outbox), 10)
+
+        campaigns.send_campaign(self.campaign, size=5, rate=0)
+        self.assertEqual(len(mail.outbox), 23)
+        self.assertEqual(len({message.to[0] for message in mail.outbox}), 23)
+        self.assertEqual(CampaignDelivery.objects.count(), 23)
+
+    def test_failed_deliveries_are_recorded_and_retried(self):
+        send = mail.backends.locmem.EmailBackend.send_messages
+
+        def flaky(backend, messages):
+            if messages[0].to[0] in ('lezer2@example.com', 'lezer7@example.com'):
+                raise OSError('Mailbox unavailable')
+            return send(backend, messages)
+
+        with mock.patch.object(mail.backends.locmem.EmailBackend, 'send_messages', flaky):
+            campaigns.send_campaign(self.campaign, size=10, rate=0)
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.sent_count, self.campaign.failed_count), (21, 2))
+        failed = self.campaign.deliveries.get(email='lezer2@example.com')
+        self.assertEqual(failed.status, 'failed')
+        self.assertIn('Mailbox unavailable', failed.error)
+
+        campaigns.retry_failed(self.campaign, rate=0)
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.sent_count, self.campaign.failed_count), (23, 0))
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.attempts, failed.error), ('sent', 2, ''))
+        self.assertEqual(len(mail.outbox), 23)
+
+    def test_connections_are_opened_once(self):
+        opened = []
+        original = mail.backends.locmem.EmailBackend.open
+
+        def counting_open(backend):
+            opened.append(backend)
+            return original(backend)
+
+        with mock.patch.object(mail.backends.locmem.EmailBackend, 'open', counting_open):
+            campaigns.send_campaign(self.campaign, size=4, rate=0, connections=2)
+        self.assertEqual(len(opened), 2)
+
+    def test_rate_limiter(self):
+        now = [100.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(round(seconds, 3))
+            now[0] += seconds
+
+        limiter = campaigns.RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+        for _ in range(5):
+            limiter.wait()
+        self.assertEqual(slept, [0.25, 0.25, 0.25, 0.25])
+        campaigns.RateLimiter(0, sleep=slept.append).wait()
+        self.assertEqual(len(slept), 4)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('send_campaign', str(self.campaign.pk), '--batch-size', '7', '--rate', '0', stdout=out)
+        self.assertIn('23 verzonden', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('send_campaign', str(self.campaign.pk), stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('send_campaign', '999999', stdout=StringIO())
+
+
+class SegmentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.excel = Category.objects.create(name='Excel', slug='excel')
+        self.data = Category.objects.create(name='Data', slug='data')
+        self.ai = Category.objects.create(name='AI', slug='ai')
+        NewsletterSubscriber.objects.bulk_create([
+            NewsletterSubscriber(email='excel@example.com', interests=[self.excel.pk]),
+            NewsletterSubscriber(email='beide@example.com', interests=[self.excel.pk, self.data.pk], confirmed=True),
+            NewsletterSubscriber(email='data@example.com', interests=[self.data.pk], confirmed=True),
+            NewsletterSubscriber(email='geen@example.com', confirmed=True),
+            NewsletterSubscriber(email='weg@example.com', interests=[self.data.pk], confirmed=True, is_active=False),
+        ])
+        NewsletterSubscriber.objects.filter(email='excel@example.com').update(confirmed=True)
+
+    def emails(self, queryset):
+        return sorted(queryset.values_list('email', flat=True))
+
+    def test_segment_query(self):
+        self.assertEqual(
+            self.emails(segments.segment([self.excel])),
+            ['beide@example.com', 'excel@example.com'],
+        )
+        self.assertEqual(
+            self.emails(segments.segment([self.excel.pk, self.data.pk])),
+            ['beide@example.com', 'data@example.com', 'excel@example.com'],
+        )
+        self.assertEqual(self.emails(segments.segment([self.ai])), [])
+        self.assertEqual(segments.segment().count(), 4)
+        self.assertEqual(NewsletterSubscriber.objects.interested_in([]).count(), 0)
+
+    def test_segment_uses_gin_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = NewsletterSubscriber.objects.interested_in([self.data]).explain()
+        self.assertIn('subscriber_interests_gin', plan)
+
+    def test_counts_are_cached_and_invalidated(self):
+        self.assertEqual(segments.segment_count([self.data, self.excel]), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(segments.segment_count([self.excel.pk, self.data.pk]), 3)
+
+        NewsletterSubscriber.objects.create(email='nieuw@example.com', interests=[self.data.pk], confirmed=True)
+        self.assertEqual(segments.segment_count([self.data, self.excel]), 4)
+        self.assertEqual(segments.segment_count(), 5)
+
+    def test_campaign_sends_to_segment(self):
+        campaign = NewsletterCampaign.objects.create(name='Data', subject='Nieuws', body='Dag {{ name }}')
+        campaign.categories.set([self.data])
+        campaigns.send_campaign(campaign, rate=0)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['beide@example.com', 'data@example.com'])
+
+    def test_admin_form_and_filter(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'geheim')
+        self.client.force_login(admin_user)
+        subscriber = NewsletterSubscriber.objects.get(email='geen@example.com')
+        url = reverse('admin:workshops_newslettersubscriber_change', args=[subscriber.pk])
+        response = self.client.get(url)
+        self.assertContains(response, 'type="checkbox" name="interests"')
+
+        response = self.client.post(url, {
+            'email': subscriber.email, 'first_name': '', 'last_name': '',
+            'is_active': 'on', 'confirmed': 'on', 'interests': [str(self.ai.pk), str(self.excel.pk)],
+        })
+        self.assertEqual(response.status_code, 302)
+        subscriber.refresh_from_db()
+        self.assertEqual(subscriber.interests, sorted([self.ai.pk, self.excel.pk]))
+
+        response = self.client.get(
+            reverse('admin:workshops_newslettersubscriber_changelist'), {'interest': self.excel.pk}
+        )
+        self.assertEqual(response.context['cl'].result_count, 3)
+        self.assertContains(response, 'Excel (3 actief)')
+        self.assertContains(response, 'AI (1 actief)')
+
+        response = self.client.get(
+            reverse('admin:workshops_newslettersubscriber_changelist'), {'interest': 'abc'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+    def test_interest_counts_in_one_query(self):
+        NewsletterSubscriber.objects.filter(email='geen@example.com').update(interests={'geen': 'lijst'})
+        with self.assertNumQueries(1):
+            counts = segments.interest_counts()
+        self.assertEqual(counts, {self.excel.pk: 2, self.data.pk: 2})
+        with self.assertNumQueries(0):
+            segments.interest_counts()
+
+
+class CatalogueFactory:
+    """
+    Bouwt snel grote datasets op met bulk_create (geen save() per rij).
+    grow_to() vult incrementeel aan, zodat één test meerdere groottes kan meten.
+    """
+
+    bookings_per_webinar = 3
+
+    def __init__(self):
+        self.webinars = 0
+        self.start = timezone.now() + timedelta(days=30)
+
+    def grow_to(self, size):
+        if size <= self.webinars:
+            return
+        categories = self._ensure_categories(size // 50 + 3)
+        webinars = Workshop.objects.bulk_create([
+            Workshop(
+                title=f'Webinar {i}',
+                slug=f'webinar-{i}',
+                description='Gegenereerde webinar voor query budget tests',
+                short_description='Gegenereerde webinar',
+                category=categories[i % len(categories)],
+                start_datetime=self.start + timedelta(hours=i),
+                end_datetime=self.start + timedelta(hours=i + 2),
+                duration_hours=2,
+                max_participants=50,
+                price=25,
+                instructor_name=f'Instructeur {i % 20}',
+                status='active',
+            )
+            for i in range(self.webinars, size)
+        ])
+        Booking.objects.bulk_create([
+            Booking(
+                workshop=webinar,
+                number_of_participants=1,
+                first_name='Test',
+                last_name=f'Deelnemer {j}',
+                email=f'deelnemer{webinar.pk}-{j}@example.com',
+                phone='0123456789',
+                total_price=25,
+                status='confirmed' if j % 2 == 0 else 'pending',
+                booking_reference=f'QB{webinar.pk:06d}{j:02d}',
+            )
+            for webinar in webinars
+            for j in range(self.bookings_per_webinar)
+        ])
+        NewsletterSubscriber.objects.bulk_create([
+            NewsletterSubscriber(email=f'lezer{i}@example.com', confirmed=True)
+            for i in range(self.webinars, size)
+        ])
+        created = Workshop.objects.filter(pk__in=[w.pk for w in webinars])
+        created.rebuild_confirmed_seats()
+        created.update_search_vector()
+        self._add_reviews(webinars[0], size // 10)
+        self.webinars = size
+
+    def _ensure_categories(self, count):
+        existing = Category.objects.count()
+        Category.objects.bulk_create([
+            Category(name=f'Categorie {i}', slug=f'categorie-{i}')
+            for i in range(existing, count)
+        ])
+        return list(Category.objects.order_by('pk'))
+
+    def _add_reviews(self, webinar, count):
+        users = User.objects.bulk_create([
+            User(username=f'reviewer-{webinar.pk}-{i}', first_name='Review', last_name=str(i))
+            for i in range(count)
+        ])
+        Review.objects.bulk_create([
+            Review(workshop=webinar, user=user, rating=4, title='Goed', comment='Leerrijk')
+            for user in users
+        ])
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class QueryBudgetTestCase(TestCase):
+    """
+    Controleert dat views een vast maximum aan SQL queries gebruiken,
+    ongeacht hoeveel webinars, boekingen en reviews er in de database staan.
+    De page cache staat uit: we meten de kost van een cache miss.
+    """
+
+    sizes = (10, 200, 2000)
+
+    def setUp(self):
+        cache.clear()
+        InhouseTrainingPage.get_instance()
+        self.factory = CatalogueFactory()
+
+    def assertQueryBudget(self, budget, request):
+        """Voer request() uit bij elke datasetgrootte en vergelijk met het budget"""
+        counts = []
+        for size in self.sizes:
+            self.factory.grow_to(size)
+            request()  # opwarmen (fragment caches vullen)
+            with CaptureQueriesContext(connection) as ctx:
+                request()
+            counts.append(len(ctx.captured_queries))
+            with self.subTest(size=size):
+                self.assertLessEqual(
+                    counts[-1], budget,
+                    '\n'.join(q['sql'][:150] for q in ctx.captured_queries),
+                )
+        self.assertEqual(len(set(counts)), 1, f'Aantal queries groeit met de data: {counts}')
+
+    def get_ok(self, url):
+        def request():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return response
+        return request
+
+
+class PublicViewQueryBudgetTest(QueryBudgetTestCase):
+    def test_workshop_list(self):
+        self.assertQueryBudget(5, self.get_ok(reverse('workshops:workshop_list')))
+
+    def test_workshop_list_filtered(self):
+        url = reverse('workshops:workshop_list') + '?search=Webinar&category=categorie-1&sort=price_low'
+        self.assertQueryBudget(5, self.get_ok(url))
+
+    def test_workshop_detail(self):
+        self.factory.grow_to(self.sizes[0])
+        url = reverse('workshops:workshop_detail', args=['webinar-0'])
+        self.assertQueryBudget(6, self.get_ok(url))
+
+    def test_homepage(self):
+        # homepage heeft (nog) geen template: evalueer enkel de context
+        def render_context(request, template_name, context):
+            for value in context.values():
+                list(value) if hasattr(value, 'model') else value
+            return mock.Mock(status_code=200)
+
+        request = RequestFactory().get('/')
+        with mock.patch.object(views, 'render', side_effect=render_context):
+            self.assertQueryBudget(2, lambda: views.homepage(request))
+
+    def test_about(self):
+        self.assertQueryBudget(0, self.get_ok(reverse('workshops:about')))
+
+    def test_workshop_booking_get(self):
+        self.factory.grow_to(self.sizes[0])
+        url = reverse('workshops:workshop_booking', args=['webinar-1'])
+        self.assertQueryBudget(2, self.get_ok(url))
+
+    def test_workshop_booking_post(self):
+        self.factory.grow_to(self.sizes[0])
+        url = reverse('workshops:workshop_booking', args=['webinar-1'])
+        counter = iter(range(10000))
+
+        def request():
+            response = self.client.post(url, {
+                'name': 'Jan Janssens',
+                'email': f'jan{next(counter)}@example.com',
+                'phone': '0470123456',
+                'num_participants': 1,
+                'accept_terms': 'on',
+            })
+            self.assertEqual(response.status_code, 302)
+
+        # Inclusief de INSERT van de ontvangstmail in de outbox
+        self.assertQueryBudget(11, request)
+
+    def test_booking_confirmation(self):
+        self.factory.grow_to(self.sizes[0])
+        reference = Booking.objects.values_list('booking_reference', flat=True).first()
+        url = reverse('workshops:booking_confirmation', args=[reference])
+        self.assertQueryBudget(3, self.get_ok(url))
+
+
+class AdminChangelistQueryBudgetTest(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = User.objects.create_superuser('budget-admin', 'admin@example.com', 'pass')
+        self.client.force_login(admin)
+
+    def test_workshop_changelist(self):
+        self.assertQueryBudget(9, self.get_ok(reverse('admin:workshops_workshop_changelist')))
+
+    def test_workshop_changelist_sorted_by_participants(self):
+        url = reverse('admin:workshops_workshop_changelist') + '?o=6'
+        self.assertQueryBudget(9, self.get_ok(url))
+
+    def test_booking_changelist(self):
+        self.assertQueryBudget(8, self.get_ok(reverse('admin:workshops_booking_changelist')))
+
+    def test_category_changelist(self):
+        self.assertQueryBudget(6, self.get_ok(reverse('admin:workshops_category_changelist')))
+
+    def test_newslettersubscriber_changelist(self):
+        # Inclusief de categorieën van de interesse filter (tellers uit de cache)
+        self.assertQueryBudget(9, self.get_ok(reverse('admin:workshops_newslettersubscriber_changelist')))
 
 
 # Voeg meer tests toe voor:
@@ -10,6 +10,13 @@ urlpatterns = [
     # Workshop detail
     path('workshop/<slug:slug>/', views.WorkshopDetailView.as_view(), name='workshop_detail'),
     
+    # SVG placeholder voor webinars zonder afbeelding
+    path(
+        'workshop/<int:pk>/placeholder/<int:width>x<int:height>/<slug:digest>.svg',
+        views.workshop_placeholder,
+        name='workshop_placeholder',
+    ),
+    
     # Booking URLs
     path('workshop/<slug:slug>/boek/', views.workshop_booking, name='workshop_booking'),
     path('booking/bevestiging/<str:reference>/', views.booking_confirmation, name='booking_confirmation'),
@@ -25,4 +32,7 @@ urlpatterns = [
     
     # Inhouse Training
     path('inhouse-trainingen/', views.inhouse_training, name='inhouse_training'),
+    
+    # Performance rapport (enkel staff)
+    path('prestaties/', views.performance_report, name='performance_report'),
 ]
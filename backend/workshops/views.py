@@ -2,12 +2,44 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView
 from django.db.models import Q, Count
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control
 from django.utils import timezone
 from django.db import transaction
-from .models import Workshop, Category, Review, Booking, NewsletterSubscriber, InhouseTrainingPage
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from .models import Workshop, Category, Booking, NewsletterSubscriber, InhouseTrainingPage
 from .forms import BookingForm, NewsletterSubscribeForm
-
-
+from .outbox import enqueue_booking_received
+from .reservations import SeatsUnavailable, reserve_seats
+from .stats import get_site_stats
+from .cache import cache_public_page, page_generation
+from .placeholders import (
+    PLACEHOLDER_CACHE_TIMEOUT, PLACEHOLDER_SIZES, placeholder_digest, placeholder_svg, placeholder_url,
+)
+from . import conditional, instrumentation
+
+
+# Zoals de fragment caches in workshop_list.html
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+
+def category_slugs():
+    """Slugs van alle categorieën, gecachet per generatie van de catalogus"""
+    return cache.get_or_set(
+        f'workshops:category_slugs:{page_generation()}',
+        lambda: set(Category.objects.values_list('slug', flat=True)),
+        FRAGMENT_CACHE_TIMEOUT,
+    )
+
+
+@method_decorator(condition(
+    etag_func=conditional.catalogue_etag,
+    last_modified_func=conditional.catalogue_last_modified,
+), name='dispatch')
+@method_decorator(cache_public_page, name='dispatch')
 class WorkshopListView(ListView):
     """
     Lijst view voor alle workshops met filtering en zoeken
@@ -18,21 +50,13 @@ class WorkshopListView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
-        queryset = Workshop.objects.select_related('category').filter(
-            is_active=True
-        ).exclude(
-            status__in=['cancelled', 'completed']  # Verberg geannuleerde en afgelopen workshops
-        ).order_by('start_datetime')
+        # Verberg geannuleerde en afgelopen workshops, beschikbaarheid in SQL
+        queryset = Workshop.objects.for_catalogue().order_by('start_datetime')
 
-        # Search functionaliteit
+        # Search functionaliteit (full-text index, zie search.py)
         search_query = self.request.GET.get('search')
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(short_description__icontains=search_query) |
-                Q(category__name__icontains=search_query)
-            )
+            queryset = queryset.search(search_query)
 
         # Filter op categorie
         category_slug = self.request.GET.get('category')
@@ -44,9 +68,11 @@ class WorkshopListView(ListView):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
 
-        # Sorteer optie
-        sort = self.request.GET.get('sort', 'date')
-        if sort == 'price_low':
+        # Sorteer optie (bij zoeken standaard op relevantie)
+        sort = self.request.GET.get('sort') or ('relevance' if search_query else 'date')
+        if sort == 'relevance' and search_query:
+            queryset = queryset.order_by('-search_rank', 'start_datetime')
+        elif sort == 'price_low':
             queryset = queryset.order_by('price')
         elif sort == 'price_high':
             queryset = queryset.order_by('-price')
@@ -58,9 +84,10 @@ class WorkshopListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Voeg categorieën toe met aantal workshops (alleen actieve, niet-afgelopen)
-        categories = Category.objects.annotate(
-            workshop_count=Count(
+        # Voeg categorieën toe met aantal workshops (alleen actieve, niet-afgelopen).
+        # De queryset blijft lazy: bij een fragment cache hit wordt ze niet uitgevoerd.
+        context['categories'] = Category.objects.annotate(
+            active_workshop_count=Count(
                 'workshops',
                 filter=Q(
                     workshops__is_active=True
@@ -69,25 +96,17 @@ class WorkshopListView(ListView):
                 )
             )
         ).order_by('name')
+        context['catalogue_version'] = page_generation()
+        # Enkel bestaande slugs in de fragment cache key: een willekeurige
+        # ?category= mag geen nieuwe cache entries aanmaken
+        category_slug = self.request.GET.get('category')
+        context['selected_category'] = category_slug if category_slug in category_slugs() else ''
         
-        # Voeg custom property toe voor correcte count in template
-        for category in categories:
-            category.active_workshop_count = category.workshop_count
-        
-        context['categories'] = categories
-        
-        # Statistics voor hero section (alleen actieve, niet-afgelopen)
-        context['total_workshops'] = Workshop.objects.filter(
-            is_active=True
-        ).exclude(
-            status__in=['cancelled', 'completed']
-        ).count()
-        context['total_categories'] = Category.objects.count()
-        context['total_instructors'] = Workshop.objects.filter(
-            is_active=True
-        ).exclude(
-            status__in=['cancelled', 'completed']
-        ).values('instructor_name').distinct().count()
+        # Statistics voor hero section (alleen actieve, niet-afgelopen, gecached)
+        stats = get_site_stats()
+        context['total_workshops'] = stats['total_workshops']
+        context['total_categories'] = stats['total_categories']
+        context['total_instructors'] = stats['total_instructors']
         
         # Check of er filters actief zijn
         context['filter_active'] = any([
@@ -102,6 +121,11 @@ class WorkshopListView(ListView):
         return context
 
 
+@method_decorator(condition(
+    etag_func=conditional.detail_etag,
+    last_modified_func=conditional.detail_last_modified,
+), name='dispatch')
+@method_decorator(cache_public_page, name='dispatch')
 class WorkshopDetailView(DetailView):
     """
     Detail view voor een specifieke workshop
@@ -112,9 +136,8 @@ class WorkshopDetailView(DetailView):
     slug_field = 'slug'
 
     def get_queryset(self):
-        return Workshop.objects.select_related('category').prefetch_related(
-            'reviews__user',
-            'bookings'
+        return Workshop.objects.select_related('category').with_availability().prefetch_related(
+            'reviews__user'
         )
 
     def get_context_data(self, **kwargs):
@@ -135,14 +158,11 @@ class WorkshopDetailView(DetailView):
 
         # Gerelateerde workshops (zelfde categorie, andere workshops, niet afgelopen/geannuleerd)
         if workshop.category:
-            context['related_workshops'] = Workshop.objects.filter(
-                category=workshop.category,
-                is_active=True
+            context['related_workshops'] = Workshop.objects.for_catalogue().filter(
+                category=workshop.category
             ).exclude(
                 id=workshop.id
-            ).exclude(
-                status__in=['cancelled', 'completed']
-            ).select_related('category')[:3]
+            )[:3]
         else:
             context['related_workshops'] = []
 
@@ -150,16 +170,13 @@ class WorkshopDetailView(DetailView):
 
 
 # Function-based views voor simpele pagina's
+@cache_public_page
 def homepage(request):
     """
     Homepage met featured workshops en categorieën
     """
     # Featured workshops (upcoming en active, gesorteerd op datum, niet afgelopen/geannuleerd)
-    featured_workshops = Workshop.objects.filter(
-        is_active=True
-    ).exclude(
-        status__in=['cancelled', 'completed']
-    ).select_related('category').order_by('start_datetime')[:6]
+    featured_workshops = Workshop.objects.for_catalogue().order_by('start_datetime')[:6]
     
     # Alle categorieën met workshop count (alleen actieve, niet-afgelopen)
     categories = Category.objects.annotate(
@@ -173,15 +190,12 @@ def homepage(request):
         )
     ).order_by('name')
     
-    # Statistics (alleen actieve, niet-afgelopen)
+    # Statistics (alleen actieve, niet-afgelopen, gecached)
+    site_stats = get_site_stats()
     stats = {
-        'total_workshops': Workshop.objects.filter(
-            is_active=True
-        ).exclude(
-            status__in=['cancelled', 'completed']
-        ).count(),
-        'total_categories': categories.count(),
-        'total_reviews': Review.objects.filter(is_approved=True).count(),
+        'total_workshops': site_stats['total_workshops'],
+        'total_categories': site_stats['total_categories'],
+        'total_reviews': site_stats['total_reviews'],
     }
     
     context = {
@@ -197,25 +211,26 @@ def workshop_booking(request, slug):
     """
     Booking view voor een workshop (optie A - zonder login vereist)
     """
-    workshop = get_object_or_404(Workshop, slug=slug, is_active=True)
+    # Beschikbaarheid in SQL: het formulier en de template lezen available_spots
+    workshop = get_object_or_404(Workshop.objects.with_availability(), slug=slug, is_active=True)
     
     # Check of workshop nog boekbaar is
     if workshop.status == 'full':
         messages.error(request, 'Deze workshop is helaas volgeboekt.')
-        return redirect('workshop_detail', slug=slug)
+        return redirect('workshops:workshop_detail', slug=slug)
     
     if workshop.status == 'cancelled':
         messages.error(request, 'Deze workshop is geannuleerd.')
-        return redirect('workshop_detail', slug=slug)
+        return redirect('workshops:workshop_detail', slug=slug)
     
     if workshop.status == 'completed':
         messages.error(request, 'Deze workshop is al afgelopen.')
-        return redirect('workshop_detail', slug=slug)
+        return redirect('workshops:workshop_detail', slug=slug)
     
     # Check of workshop in het verleden is
     if workshop.start_datetime < timezone.now():
         messages.error(request, 'Deze workshop is al gestart of afgelopen.')
-        return redirect('workshop_detail', slug=slug)
+        return redirect('workshops:workshop_detail', slug=slug)
     
     if request.method == 'POST':
         form = BookingForm(request.POST, workshop=workshop)
@@ -256,8 +271,13 @@ def workshop_booking(request, slug):
                     booking.status = 'pending'
                     booking.payment_status = 'unpaid'
                     
-                    # Sla booking op (dit genereert automatisch booking_reference)
-                    booking.save()
+                    # Reserveer de plaatsen onder row lock en sla de booking op
+                    # (dit genereert automatisch booking_reference)
+                    reserve_seats(booking)
+
+                    # Ontvangstmail via de outbox: in dezelfde transactie,
+                    # verstuurd door manage.py process_outbox
+                    enqueue_booking_received(booking)
                     
                     # Success message
                     messages.success(
@@ -266,8 +286,14 @@ def workshop_booking(request, slug):
                     )
                     
                     # Redirect naar confirmation pagina
-                    return redirect('booking_confirmation', reference=booking.booking_reference)
+                    return redirect('workshops:booking_confirmation', reference=booking.booking_reference)
                     
+            except SeatsUnavailable as e:
+                # Iemand anders was net sneller: capaciteit opnieuw gecontroleerd in de transactie
+                messages.error(request, str(e))
+                workshop.refresh_from_db()
+                if workshop.status == 'full':
+                    return redirect('workshops:workshop_detail', slug=slug)
             except Exception as e:
                 messages.error(
                     request, 
@@ -314,18 +340,16 @@ def booking_confirmation(request, reference):
     return render(request, 'workshops/booking_confirmation.html', context)
 
 
+@cache_public_page
 def about(request):
     """
     Over Ons pagina
     """
+    stats = get_site_stats()
     context = {
-        'total_workshops': Workshop.objects.filter(
-            is_active=True
-        ).exclude(
-            status__in=['cancelled', 'completed']
-        ).count(),
-        'total_participants': Booking.objects.filter(status='confirmed').count(),
-        'total_reviews': Review.objects.filter(is_approved=True).count(),
+        'total_workshops': stats['total_workshops'],
+        'total_participants': stats['total_participants'],
+        'total_reviews': stats['total_reviews'],
     }
     return render(request, 'workshops/about.html', context)
 
@@ -389,6 +413,11 @@ def newsletter_subscribe(request):
     return render(request, 'workshops/newsletter_subscribe.html', context)
 
 
+@condition(
+    etag_func=conditional.inhouse_etag,
+    last_modified_func=conditional.inhouse_last_modified,
+)
+@cache_public_page
 def inhouse_training(request):
     """
     Inhouse Training pagina met bewerkbare HTML content
@@ -400,3 +429,39 @@ def inhouse_training(request):
         'page': page_content,
     }
     return render(request, 'workshops/inhouse_training.html', context)
+
+
+def workshop_placeholder(request, pk, width, height, digest):
+    """
+    SVG placeholder van een webinar zonder afbeelding (zie placeholders.py).
+    De digest in de URL maakt de response immutable; de bytes worden
+    gecachet onder de URL, een hit kost dus geen query.
+    """
+    if (width, height) not in PLACEHOLDER_SIZES:
+        raise Http404('Onbekend formaat')
+
+    key = f'workshops:placeholder:{pk}:{width}x{height}:{digest}'
+    svg = cache.get(key)
+    if svg is None:
+        workshop = get_object_or_404(Workshop.objects.select_related('category'), pk=pk, is_active=True)
+        svg = placeholder_svg(workshop, width, height)
+        if placeholder_digest(svg) != digest:
+            # Titel of categorie gewijzigd sinds de pagina gerenderd werd
+            return redirect(placeholder_url(workshop, width, height))
+        cache.set(key, svg, PLACEHOLDER_CACHE_TIMEOUT)
+
+    response = HttpResponse(svg, content_type='image/svg+xml')
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    return response
+
+
+@staff_member_required
+def performance_report(request):
+    """
+    Traagste views en queries van dit proces (zie instrumentation.py).
+    ?reset=1 leegt de vensters na het ophalen.
+    """
+    report = instrumentation.registry.snapshot()
+    if request.GET.get('reset'):
+        instrumentation.registry.reset()
+    return JsonResponse(report, json_dumps_params={'indent': 2})